@@ -3,8 +3,10 @@ from django.contrib import admin
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
+from mentions import host_health
 from mentions.models import (
     HCard,
+    HostHealth,
     OutgoingWebmentionStatus,
     PendingIncomingWebmention,
     PendingOutgoingContent,
@@ -205,6 +207,47 @@ class HCardAdmin(BaseAdmin):
     search_fields = ["name", "homepage"]
 
 
+@admin.register(HostHealth)
+class HostHealthAdmin(BaseAdmin):
+    list_display = [
+        "domain",
+        "latency",
+        "error_rate",
+        "consecutive_failures",
+        "last_success",
+        "last_failure",
+        "circuit_opened_at",
+    ]
+    list_filter = [
+        "circuit_opened_at",
+    ]
+    readonly_fields = [
+        "domain",
+        "latency",
+        "error_rate",
+        "consecutive_failures",
+        "last_success",
+        "last_failure",
+    ]
+    search_fields = [
+        "domain",
+    ]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        host_health.forget_host(obj.domain)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        host_health.forget_host(obj.domain)
+
+    def delete_queryset(self, request, queryset):
+        domains = list(queryset.values_list("domain", flat=True))
+        super().delete_queryset(request, queryset)
+        for domain in domains:
+            host_health.forget_host(domain)
+
+
 @admin.register(PendingIncomingWebmention)
 class PendingIncomingAdmin(BaseAdmin):
     list_filter = [
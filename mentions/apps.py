@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class MentionsConfig(AppConfig):
     name = "mentions"
+
+    def ready(self):
+        # Connect signal receivers.
+        from mentions import config, resolution_cache  # noqa: F401
+
+        if config.is_wagtail_installed():
+            from mentions.helpers.thirdparty.wagtail import route_cache
+
+            route_cache.connect_signals()
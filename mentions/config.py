@@ -4,7 +4,7 @@ from typing import Optional, Set
 from urllib.parse import urljoin
 
 from mentions import options
-from mentions.util import compatibility, get_domain
+from mentions.util import domain_in_set, get_domain
 
 log = logging.getLogger(__name__)
 
@@ -53,10 +53,10 @@ def accept_domain_incoming(
         return False
 
     if domains_allow:
-        return _domain_in_set(domain, domains_allow)
+        return domain_in_set(domain, domains_allow)
 
     if domains_deny:
-        return not _domain_in_set(domain, domains_deny)
+        return not domain_in_set(domain, domains_deny)
 
     return True
 
@@ -89,24 +89,9 @@ def accept_domain_outgoing(
         )
 
     if domains_deny:
-        return not _domain_in_set(domain, domains_deny)
+        return not domain_in_set(domain, domains_deny)
 
     if domains_allow:
-        return _domain_in_set(domain, domains_allow)
+        return domain_in_set(domain, domains_allow)
 
     return True
-
-
-def _domain_in_set(domain: str, domains: Set[str]) -> bool:
-    """Check if the given domain matches any of `domains`, allowing for wildcard `*.` prefix."""
-    for d in domains:
-        if d == domain:
-            return True
-
-        if d.startswith("*."):
-            root_domain = compatibility.removeprefix(d, "*.")
-            remaining_prefix = compatibility.removesuffix(domain, root_domain)
-            if remaining_prefix == "" or remaining_prefix.endswith("."):
-                return True
-
-    return False
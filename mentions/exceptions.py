@@ -88,6 +88,16 @@ class NotEnoughData(WebmentionsException):
     pass
 
 
+class RateLimited(WebmentionsException):
+    """Too many requests have been made to a remote host recently.
+
+    The request should be tried again after `retry_after` seconds."""
+
+    def __init__(self, *args, retry_after: float = 0):
+        super().__init__(*args)
+        self.retry_after = retry_after
+
+
 class OptionalDependency(WebmentionsException):
     """Attempted to use an optional dependency which is not installed."""
 
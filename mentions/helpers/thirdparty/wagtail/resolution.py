@@ -1,4 +1,4 @@
-from typing import Callable, Optional, Type
+from typing import Callable, Optional, Tuple, Type
 
 from django.apps import apps
 from django.http import HttpRequest
@@ -8,6 +8,10 @@ from mentions import config, contract, options
 from mentions.exceptions import BadUrlConfig, NoModelForUrlPath, OptionalDependency
 from mentions.helpers.resolution import get_model_for_url_by_helper
 from mentions.helpers.thirdparty.wagtail.proxy import RoutablePageMixin
+from mentions.helpers.thirdparty.wagtail.route_cache import (
+    cache_route,
+    get_cached_route,
+)
 from mentions.helpers.thirdparty.wagtail.util import get_annotation_from_viewfunc
 from mentions.helpers.types import MentionableImpl, ModelClass
 from mentions.models.mixins import MentionableMixin
@@ -34,18 +38,15 @@ def get_model_for_url_by_wagtail(match: ResolverMatch) -> MentionableMixin:
     if match.func != wagtail.views.serve:
         raise OptionalDependency("wagtail")
 
-    from wagtail.models.sites import get_site_for_hostname
-
-    site = get_site_for_hostname(options.domain_name(), None)
+    hostname = options.domain_name()
     path = match.args[0]
-    path_components = [component for component in path.split("/") if component]
 
-    dummy_request = HttpRequest()
-    dummy_request.method = "GET"
-    dummy_request.path = path
-    page, args, kwargs = site.root_page.localized.specific.route(
-        dummy_request, path_components
-    )
+    cached = get_cached_route(hostname, path)
+    if cached is not None:
+        page, args = cached
+    else:
+        page, args = _route(hostname, path)
+        cache_route(hostname, path, page, args)
 
     if isinstance(page, MentionableMixin):
         return page
@@ -69,6 +70,29 @@ def get_model_for_url_by_wagtail(match: ResolverMatch) -> MentionableMixin:
     return get_model_for_url_by_helper(model_class, view_args, view_kwargs)
 
 
+def _route(hostname: str, path: str) -> Tuple[object, tuple]:
+    """Walk the page tree of the site to find the page that serves path.
+
+    Returns:
+        (page, args) as returned by `Page.route`.
+
+    Raises:
+        Http404: If no page is found.
+    """
+    from wagtail.models.sites import get_site_for_hostname
+
+    site = get_site_for_hostname(hostname, None)
+    path_components = [component for component in path.split("/") if component]
+
+    dummy_request = HttpRequest()
+    dummy_request.method = "GET"
+    dummy_request.path = path
+    page, args, kwargs = site.root_page.localized.specific.route(
+        dummy_request, path_components
+    )
+    return page, args
+
+
 def autopage_page_resolver(
     model_class: ModelClass,
     lookup: dict,
@@ -0,0 +1,174 @@
+"""Remember which Wagtail page, and which `RoutablePageMixin` sub-view, each
+path is routed to.
+
+Routing a path with `Page.route` walks the page tree from the site root and
+costs several queries for each path segment. Cached routes are stored for
+`options.resolution_cache_ttl` seconds, and all of them are invalidated when
+any page is published, unpublished, moved or deleted."""
+
+import logging
+from typing import Callable, NamedTuple, Optional, Sequence, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete
+
+from mentions import options
+from mentions.util.cache import (
+    cache_key,
+    get_cache,
+    get_generation,
+    increment_generation,
+)
+
+__all__ = [
+    "CachedRoute",
+    "cache_route",
+    "connect_signals",
+    "forget_route",
+    "get_cached_route",
+]
+
+log = logging.getLogger(__name__)
+
+_NAMESPACE = "wagtail-route"
+
+
+class CachedRoute(NamedTuple):
+    """The page and args which were returned by `Page.route`.
+
+    For a `RoutablePageMixin` page, route_args is the sub-view that handles
+    the path: (view_func, view_args, view_kwargs)."""
+
+    page: object
+    route_args: Tuple
+
+
+def get_cached_route(site_hostname: str, path: str) -> Optional[CachedRoute]:
+    """Return the cached route for path, or None if it is not cached or the
+    page no longer exists."""
+    value = get_cache().get(_key(site_hostname, path))
+    if value is None:
+        return None
+
+    content_type_id, page_id, route_pattern, view_args, view_kwargs = value
+
+    page = None
+    try:
+        model_class = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model_class is not None:
+            page = model_class._default_manager.get(pk=page_id)
+    except ObjectDoesNotExist:
+        pass
+
+    if page is None:
+        forget_route(site_hostname, path)
+        return None
+
+    route_args = ()
+    if route_pattern:
+        view_func = _get_view_for_pattern(page, route_pattern)
+        if view_func is None:
+            forget_route(site_hostname, path)
+            return None
+        route_args = (view_func, list(view_args), dict(view_kwargs))
+
+    log.debug(f"Using cached wagtail route for '{path}': {value}")
+    return CachedRoute(page=page, route_args=route_args)
+
+
+def cache_route(site_hostname: str, path: str, page, route_args: Sequence) -> None:
+    """Remember the result of `page.route(...)` for path.
+
+    Args:
+        site_hostname: The hostname used to find the Wagtail site.
+        path: The routed path.
+        page: The page returned by `Page.route`.
+        route_args: The args returned by `Page.route`. For a
+                    `RoutablePageMixin` page this is (view_func, view_args, view_kwargs).
+    """
+    timeout = options.resolution_cache_ttl()
+    if not timeout or timeout <= 0:
+        return
+
+    route_pattern, view_args, view_kwargs = None, [], {}
+    if route_args:
+        view_func, view_args, view_kwargs = route_args
+        route_pattern = _get_pattern_for_view(page, view_func)
+
+        if route_pattern is None:
+            # Cannot be retrieved from the page class later.
+            return
+
+    content_type = ContentType.objects.get_for_model(page.__class__)
+    get_cache().set(
+        _key(site_hostname, path),
+        (content_type.id, page.pk, route_pattern, list(view_args), dict(view_kwargs)),
+        timeout=timeout,
+    )
+
+
+def forget_route(site_hostname: str, path: str) -> None:
+    get_cache().delete(_key(site_hostname, path))
+
+
+def connect_signals() -> None:
+    """Invalidate cached routes when the page tree changes.
+
+    Only called if Wagtail is installed."""
+    from wagtail.signals import page_published, page_unpublished, post_page_move
+
+    for signal in [page_published, page_unpublished, post_page_move, post_delete]:
+        signal.connect(_invalidate_routes, dispatch_uid="mentions_wagtail_routes")
+
+
+def _get_pattern_for_view(page, view_func: Callable) -> Optional[str]:
+    """Return an identifier for the `RoutablePageMixin` route of page which
+    calls view_func.
+
+    Routes are identified by their pattern rather than the name of view_func,
+    which may be wrapped, e.g. by `autopage_page_resolver`."""
+    func = getattr(view_func, "__func__", view_func)
+    for route in _get_subpage_urls(page):
+        if route.callback is func:
+            return _describe_pattern(route)
+
+    return None
+
+
+def _get_view_for_pattern(page, route_pattern: str) -> Optional[Callable]:
+    """Return the view for the route identified by `_get_pattern_for_view`,
+    bound to page as with `RoutablePageMixin.resolve_subpage`."""
+    for route in _get_subpage_urls(page):
+        if _describe_pattern(route) == route_pattern:
+            return route.callback.__get__(page, type(page))
+
+    return None
+
+
+def _get_subpage_urls(page) -> Sequence:
+    get_subpage_urls = getattr(type(page), "get_subpage_urls", None)
+    if get_subpage_urls is None:
+        return ()
+    return get_subpage_urls()
+
+
+def _describe_pattern(route) -> str:
+    # Path and regex patterns may have the same string representation.
+    return f"{type(route.pattern).__name__}:{route.pattern}"
+
+
+def _invalidate_routes(sender, instance, **kwargs):
+    from wagtail.models import Page
+
+    if isinstance(instance, Page):
+        increment_generation(_NAMESPACE)
+
+
+def _key(site_hostname: str, path: str) -> str:
+    return cache_key(
+        _NAMESPACE,
+        str(get_generation(_NAMESPACE)),
+        site_hostname or "",
+        path,
+    )
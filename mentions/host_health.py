@@ -0,0 +1,274 @@
+"""Track the health of remote hosts and stop making requests to those which
+are not responding.
+
+The result of each request made via `mentions.util.requests` is recorded in
+the cache for the target domain, and saved to a `HostHealth` instance when
+the circuit for that host is opened or closed, or at most once every
+`_SAVE_INTERVAL` seconds. Only network errors, such as timeouts or
+refused connections, count as failures: an error status code still means
+the host is responding.
+
+After `options.circuit_breaker_threshold` consecutive failures, the circuit
+for that host is opened and further requests fail immediately with
+`HostUnavailable`. After `options.circuit_breaker_cooldown` seconds, a single
+request is allowed through: if it succeeds the circuit is closed, otherwise
+it stays open for another cooldown period."""
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from requests import RequestException
+
+from mentions import options
+from mentions.models import HostHealth
+from mentions.util.cache import cache_key, get_cache
+from mentions.util.requests import HostUnavailable
+from mentions.util.url import get_domain
+
+__all__ = [
+    "amonitor",
+    "check_host",
+    "forget_host",
+    "get_host_health",
+    "monitor",
+    "record_result",
+]
+
+log = logging.getLogger(__name__)
+
+"""Weight given to the latest request when updating averages."""
+_SMOOTHING = 0.2
+
+"""Minimum time (in seconds) between saving the statistics for a host to the
+database, unless the circuit is opened or closed."""
+_SAVE_INTERVAL = 60
+
+"""How long the statistics for a host are kept in the cache. If they are
+lost, they are reloaded from the database."""
+_STATE_TIMEOUT = 60 * 60 * 24
+
+_NAMESPACE = "host-health"
+
+_FIELDS = (
+    "latency",
+    "error_rate",
+    "consecutive_failures",
+    "last_success",
+    "last_failure",
+    "circuit_opened_at",
+)
+
+
+def check_host(url: str, now=timezone.now) -> None:
+    """Raise HostUnavailable if requests to the host of url should be skipped.
+
+    If the cooldown period has passed, the circuit is half-open: the first
+    caller is allowed to make a request and the circuit is re-armed so that
+    other callers keep waiting until the result of that request is known."""
+    if not _is_enabled():
+        return
+
+    domain = get_domain(url)
+    if not domain:
+        return
+
+    state = _get_state(domain)
+    opened_at = state["circuit_opened_at"]
+    if opened_at is None:
+        return
+
+    if callable(now):
+        now = now()
+
+    cooldown = options.circuit_breaker_cooldown()
+    if now < opened_at + timedelta(seconds=cooldown):
+        raise HostUnavailable(f"Host '{domain}' is unavailable since {opened_at}")
+
+    is_trial = get_cache().add(
+        cache_key(_NAMESPACE, "trial", domain, opened_at.isoformat()),
+        True,
+        timeout=max(1, cooldown),
+    )
+
+    if not is_trial:
+        raise HostUnavailable(f"Host '{domain}' is unavailable since {opened_at}")
+
+    log.info(f"Trying unavailable host '{domain}' again.")
+    state["circuit_opened_at"] = now
+    _set_state(domain, state)
+
+
+def record_result(url: str, seconds: float, success: bool, now=timezone.now) -> None:
+    """Update the statistics for the host of url with the result of a request.
+
+    Statistics are kept in the cache. The `HostHealth` instance for the host
+    is only saved when the circuit is opened or closed, or if it has not been
+    saved for `_SAVE_INTERVAL` seconds."""
+    if not _is_enabled():
+        return
+
+    domain = get_domain(url)
+    if not domain:
+        return
+
+    if callable(now):
+        now = now()
+
+    state = _get_state(domain)
+    error = 0 if success else 1
+
+    if state["latency"] is None:
+        state["latency"] = seconds
+        state["error_rate"] = error
+    else:
+        state["latency"] = state["latency"] * (1 - _SMOOTHING) + seconds * _SMOOTHING
+        state["error_rate"] = (
+            state["error_rate"] * (1 - _SMOOTHING) + error * _SMOOTHING
+        )
+
+    if success:
+        state["consecutive_failures"] = 0
+        state["last_success"] = now
+        state["circuit_opened_at"] = None
+    else:
+        state["consecutive_failures"] += 1
+        state["last_failure"] = now
+        _maybe_open_circuit(domain, state, now)
+
+    if _should_save(state, now):
+        _save(domain, state, now)
+
+    _set_state(domain, state)
+
+
+def get_host_health(url: str) -> Optional[HostHealth]:
+    """Return the current statistics for the host of url, or None if no
+    requests to it have been recorded.
+
+    The returned instance may be more recent than the saved `HostHealth`."""
+    domain = get_domain(url)
+    if not domain:
+        return None
+
+    state = _get_state(domain)
+    if state["latency"] is None:
+        return None
+
+    return HostHealth(domain=domain, **{field: state[field] for field in _FIELDS})
+
+
+def forget_host(domain: str) -> None:
+    """Discard the cached statistics for domain so that they are reloaded
+    from its `HostHealth`, e.g. after it has been edited."""
+    get_cache().delete(_state_key(domain))
+
+
+@contextmanager
+def monitor(url: str):
+    """Check the host of url is available, then record the result of any
+    request made within the block.
+
+    Raises:
+        HostUnavailable: If requests to the host should be skipped.
+    """
+    check_host(url)
+
+    start = time.monotonic()
+    try:
+        yield
+    except RequestException:
+        record_result(url, time.monotonic() - start, success=False)
+        raise
+
+    record_result(url, time.monotonic() - start, success=True)
+
+
+@asynccontextmanager
+async def amonitor(url: str):
+    """Async version of `monitor`."""
+    await sync_to_async(check_host)(url)
+
+    start = time.monotonic()
+    try:
+        yield
+    except RequestException:
+        await sync_to_async(record_result)(url, time.monotonic() - start, success=False)
+        raise
+
+    await sync_to_async(record_result)(url, time.monotonic() - start, success=True)
+
+
+def _maybe_open_circuit(domain: str, state: dict, now) -> None:
+    if state["circuit_opened_at"] is not None:
+        return
+
+    if state["consecutive_failures"] < options.circuit_breaker_threshold():
+        return
+
+    state["circuit_opened_at"] = now
+    log.warning(
+        f"Host '{domain}' is not responding: requests will be skipped "
+        f"for {options.circuit_breaker_cooldown()} seconds."
+    )
+
+
+def _get_state(domain: str) -> dict:
+    """Return the statistics for domain from the cache, or from its
+    `HostHealth` if they are not cached."""
+    state = get_cache().get(_state_key(domain))
+    if state is not None:
+        return state
+
+    saved = HostHealth.objects.filter(domain=domain).values(*_FIELDS).first()
+    if saved is None:
+        state = {
+            **{field: None for field in _FIELDS},
+            "consecutive_failures": 0,
+            "saved_at": None,
+            "saved_circuit_opened_at": None,
+        }
+    else:
+        state = {
+            **saved,
+            "saved_at": timezone.now(),
+            "saved_circuit_opened_at": saved["circuit_opened_at"],
+        }
+
+    _set_state(domain, state)
+    return state
+
+
+def _set_state(domain: str, state: dict) -> None:
+    get_cache().set(_state_key(domain), state, timeout=_STATE_TIMEOUT)
+
+
+def _should_save(state: dict, now) -> bool:
+    if state["saved_at"] is None:
+        return True
+
+    if state["circuit_opened_at"] != state["saved_circuit_opened_at"]:
+        return True
+
+    return now >= state["saved_at"] + timedelta(seconds=_SAVE_INTERVAL)
+
+
+def _save(domain: str, state: dict, now) -> None:
+    HostHealth.objects.update_or_create(
+        domain=domain,
+        defaults={field: state[field] for field in _FIELDS},
+    )
+    state["saved_at"] = now
+    state["saved_circuit_opened_at"] = state["circuit_opened_at"]
+
+
+def _state_key(domain: str) -> str:
+    return cache_key(_NAMESPACE, domain)
+
+
+def _is_enabled() -> bool:
+    threshold = options.circuit_breaker_threshold()
+    return bool(threshold) and threshold > 0
@@ -1,6 +1,10 @@
 from django.core.management import BaseCommand
 
-from mentions.tasks.scheduling import handle_pending_webmentions
+from mentions.tasks.scheduling import (
+    DEFAULT_BATCH_SIZE,
+    PendingStats,
+    handle_pending_webmentions,
+)
 
 PENDING_TYPE_ALL = "all"
 PENDING_TYPE_INCOMING = "incoming"
@@ -17,7 +21,54 @@ class Command(BaseCommand):
             help=f"Only process incoming or outgoing pending webmention content. Default: {PENDING_TYPE_ALL}",
         )
 
-    def handle(self, pending_type, *args, **options):
+        only = parser.add_mutually_exclusive_group()
+        only.add_argument(
+            "--incoming-only",
+            action="store_true",
+            help="Only process incoming pending webmentions.",
+        )
+        only.add_argument(
+            "--outgoing-only",
+            action="store_true",
+            help="Only process outgoing pending webmention content.",
+        )
+
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of batches to process in parallel threads. Default: 1",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Number of objects to claim and process together. Default: {DEFAULT_BATCH_SIZE}",
+        )
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            default=None,
+            help="Stop starting new work after this many seconds. "
+            "Anything remaining is left for the next run.",
+        )
+
+    def handle(
+        self,
+        pending_type,
+        *args,
+        incoming_only: bool,
+        outgoing_only: bool,
+        workers: int,
+        batch_size: int,
+        max_seconds: float,
+        **options,
+    ):
+        if incoming_only:
+            pending_type = PENDING_TYPE_INCOMING
+        elif outgoing_only:
+            pending_type = PENDING_TYPE_OUTGOING
+
         incoming = pending_type == PENDING_TYPE_INCOMING
         outgoing = pending_type == PENDING_TYPE_OUTGOING
 
@@ -27,4 +78,27 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Checking for pending webmentions [{pending_type}]...")
 
-        handle_pending_webmentions(incoming=incoming, outgoing=outgoing)
+        stats = PendingStats()
+        handle_pending_webmentions(
+            incoming=incoming,
+            outgoing=outgoing,
+            workers=workers,
+            batch_size=batch_size,
+            max_seconds=max_seconds,
+            stats=stats,
+        )
+
+        self.write_stats(stats)
+
+    def write_stats(self, stats: PendingStats):
+        self.stdout.write(
+            f"Processed {stats.total_count} item(s) in {stats.total_seconds:.2f}s "
+            f"({stats.items_per_second:.2f}/s)"
+        )
+        for stage, seconds in stats.timings.items():
+            self.stdout.write(
+                f"- {stage}: {stats.counts[stage]} item(s) in {seconds:.2f}s"
+            )
+
+        if stats.is_incomplete:
+            self.stdout.write("Time limit reached: some items were left for next time.")
@@ -0,0 +1,75 @@
+"""A management command which processes pending webmentions until stopped."""
+import signal
+import threading
+
+from django.core.management import BaseCommand
+
+from mentions.tasks.scheduling import DEFAULT_BATCH_SIZE, PendingStats
+from mentions.tasks.worker import run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Process pending webmentions as they arrive. "
+        "Stops gracefully on SIGTERM or SIGINT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of batches to process in parallel threads. Default: 1",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Number of objects to claim and process together. Default: {DEFAULT_BATCH_SIZE}",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1,
+            help="Minimum delay (in seconds) between checks for pending webmentions. Default: 1",
+        )
+        parser.add_argument(
+            "--max-poll-interval",
+            type=float,
+            default=30,
+            help="Maximum delay (in seconds) between checks while idle. Default: 30",
+        )
+
+    def handle(
+        self,
+        *args,
+        workers: int,
+        batch_size: int,
+        poll_interval: float,
+        max_poll_interval: float,
+        **options,
+    ):
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write("Stopping after current work is finished...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        self.stdout.write("Waiting for pending webmentions...")
+        run_worker(
+            stop,
+            workers=workers,
+            batch_size=batch_size,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+            on_stats=self.write_stats,
+        )
+        self.stdout.write("Stopped.")
+
+    def write_stats(self, stats: PendingStats):
+        self.stdout.write(
+            f"Processed {stats.total_count} item(s) in {stats.total_seconds:.2f}s"
+        )
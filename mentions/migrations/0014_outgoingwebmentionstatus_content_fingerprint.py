@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mentions", "0013_webmention_has_been_read"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outgoingwebmentionstatus",
+            name="content_fingerprint",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Fingerprint of the source content around the link when it was last processed.",
+                max_length=64,
+                verbose_name="content fingerprint",
+            ),
+        ),
+    ]
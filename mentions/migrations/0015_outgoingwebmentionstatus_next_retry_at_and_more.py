@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:22
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_next_retry_at(apps, schema_editor):
+    """Previously, objects were eligible for retry once options.retry_interval
+    had passed since their last attempt."""
+    from mentions import options
+
+    interval = timedelta(seconds=options.retry_interval())
+
+    for model_name in ["OutgoingWebmentionStatus", "PendingIncomingWebmention"]:
+        model = apps.get_model("mentions", model_name)
+        model.objects.filter(
+            is_awaiting_retry=True,
+            last_retry_attempt__isnull=False,
+        ).update(next_retry_at=F("last_retry_attempt") + interval)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mentions", "0014_outgoingwebmentionstatus_content_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outgoingwebmentionstatus",
+            name="next_retry_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When this object will next be eligible for processing. If empty, it is eligible immediately.",
+                null=True,
+                verbose_name="next retry",
+            ),
+        ),
+        migrations.AddField(
+            model_name="pendingincomingwebmention",
+            name="next_retry_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When this object will next be eligible for processing. If empty, it is eligible immediately.",
+                null=True,
+                verbose_name="next retry",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="outgoingwebmentionstatus",
+            index=models.Index(
+                fields=["is_awaiting_retry", "next_retry_at"],
+                name="mentions_ows_retry_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pendingincomingwebmention",
+            index=models.Index(
+                fields=["is_awaiting_retry", "next_retry_at"],
+                name="mentions_pin_retry_idx",
+            ),
+        ),
+        migrations.RunPython(set_next_retry_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mentions", "0015_outgoingwebmentionstatus_next_retry_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outgoingwebmentionstatus",
+            name="lease_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="If set, this object is being processed by a worker and should not be claimed by another until this time.",
+                null=True,
+                verbose_name="lease expires",
+            ),
+        ),
+        migrations.AddField(
+            model_name="pendingincomingwebmention",
+            name="lease_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="If set, this object is being processed by a worker and should not be claimed by another until this time.",
+                null=True,
+                verbose_name="lease expires",
+            ),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mentions", "0016_outgoingwebmentionstatus_lease_expires_at_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HostHealth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, null=True, verbose_name="created at"
+                    ),
+                ),
+                (
+                    "domain",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="domain"
+                    ),
+                ),
+                (
+                    "latency",
+                    models.FloatField(
+                        default=0,
+                        editable=False,
+                        help_text="Recent average time (in seconds) taken to respond.",
+                        verbose_name="latency",
+                    ),
+                ),
+                (
+                    "error_rate",
+                    models.FloatField(
+                        default=0,
+                        editable=False,
+                        help_text="Recent proportion of requests which failed, from 0 to 1.",
+                        verbose_name="error rate",
+                    ),
+                ),
+                (
+                    "consecutive_failures",
+                    models.PositiveIntegerField(
+                        default=0, editable=False, verbose_name="consecutive failures"
+                    ),
+                ),
+                (
+                    "last_success",
+                    models.DateTimeField(
+                        blank=True,
+                        editable=False,
+                        null=True,
+                        verbose_name="last success",
+                    ),
+                ),
+                (
+                    "last_failure",
+                    models.DateTimeField(
+                        blank=True,
+                        editable=False,
+                        null=True,
+                        verbose_name="last failure",
+                    ),
+                ),
+                (
+                    "circuit_opened_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="If set, requests to this host are skipped until the cooldown period has passed. Clear this to allow requests immediately.",
+                        null=True,
+                        verbose_name="unavailable since",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "host health",
+                "verbose_name_plural": "host health",
+                "ordering": ["domain"],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:58
+
+from django.db import migrations, models
+
+
+def set_last_retry_delay(apps, schema_editor):
+    """Previously, the delay was derived from next_retry_at and last_retry_attempt."""
+    for model_name in ["OutgoingWebmentionStatus", "PendingIncomingWebmention"]:
+        model = apps.get_model("mentions", model_name)
+        pending = model.objects.filter(
+            is_awaiting_retry=True,
+            next_retry_at__isnull=False,
+            last_retry_attempt__isnull=False,
+        )
+        for obj in pending.iterator():
+            delay = (obj.next_retry_at - obj.last_retry_attempt).total_seconds()
+            model.objects.filter(pk=obj.pk).update(last_retry_delay=delay)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mentions", "0017_hosthealth"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outgoingwebmentionstatus",
+            name="last_retry_delay",
+            field=models.FloatField(
+                blank=True,
+                editable=False,
+                help_text="The delay (in seconds) that was scheduled after the latest failed attempt, if any.",
+                null=True,
+                verbose_name="last retry delay",
+            ),
+        ),
+        migrations.AddField(
+            model_name="pendingincomingwebmention",
+            name="last_retry_delay",
+            field=models.FloatField(
+                blank=True,
+                editable=False,
+                help_text="The delay (in seconds) that was scheduled after the latest failed attempt, if any.",
+                null=True,
+                verbose_name="last retry delay",
+            ),
+        ),
+        migrations.RunPython(set_last_retry_delay, migrations.RunPython.noop),
+    ]
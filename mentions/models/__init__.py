@@ -1,4 +1,5 @@
 from .hcard import HCard
+from .host_health import HostHealth
 from .outgoing_status import OutgoingWebmentionStatus
 from .pending import PendingIncomingWebmention, PendingOutgoingContent
 from .proxy import DashboardPermissionProxy
@@ -1,9 +1,15 @@
-from typing import Optional, Type
+import hashlib
+from functools import partial
+from typing import Optional, Tuple, Type
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
+from mentions import options
 from mentions.models.base import MentionsBaseModel
+from mentions.util.cache import LRUCache
 
 __all__ = [
     "HCard",
@@ -50,6 +56,13 @@ class HCard(MentionsBaseModel):
         verbose_name_plural = _("h-cards")
 
 
+"""Recently written HCards, keyed by the fields used to look them up.
+
+Each value is a tuple of (fingerprint, HCard) where fingerprint describes the
+content that was written."""
+_recent_hcards = LRUCache()
+
+
 def update_or_create_hcard(
     homepage: Optional[str],
     name: Optional[str],
@@ -61,8 +74,72 @@ def update_or_create_hcard(
     Ideally, homepage and name are used together.
 
     Otherwise, the order of precedence is [homepage, name, avatar].
+
+    If the same h-card content was recently written by this process, the
+    existing HCard is returned without updating it in the database.
     """
+    key = _get_cache_key(homepage, name, avatar)
+    fingerprint = _get_fingerprint(homepage, name, avatar, data)
+
+    cached = _recent_hcards.get(key)
+    if cached is not None and cached[0] == fingerprint:
+        # The HCard may have been deleted by another process.
+        if HCard.objects.filter(pk=cached[1].pk).exists():
+            return cached[1]
+
+        _recent_hcards.discard(lambda k, v: k == key)
+
+    hcard = _update_or_create_hcard(homepage, name, avatar, data)
+
+    if hcard is not None:
+        # Only remember the HCard once it is certain to exist in the database.
+        transaction.on_commit(
+            partial(
+                _recent_hcards.set,
+                key,
+                (fingerprint, hcard),
+                maxsize=options.hcard_cache_size(),
+            )
+        )
+
+    return hcard
+
+
+def _get_cache_key(
+    homepage: Optional[str],
+    name: Optional[str],
+    avatar: Optional[str],
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Return the values that are used to look up the HCard in the database."""
+    if homepage or name:
+        return homepage or None, name or None, None
+
+    return None, None, avatar or None
+
 
+def _get_fingerprint(
+    homepage: Optional[str],
+    name: Optional[str],
+    avatar: Optional[str],
+    data: str,
+) -> str:
+    content = "\n".join(x or "" for x in [homepage, name, avatar, data])
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+@receiver(post_save, sender=HCard)
+@receiver(post_delete, sender=HCard)
+def _forget_hcard(sender, instance: HCard, **kwargs):
+    """Changes made elsewhere must not be hidden by a cached HCard."""
+    _recent_hcards.discard(lambda key, value: value[1].pk == instance.pk)
+
+
+def _update_or_create_hcard(
+    homepage: Optional[str],
+    name: Optional[str],
+    avatar: Optional[str],
+    data: str,
+) -> Optional[HCard]:
     if homepage and name:
         return _update_first_or_create(
             HCard,
@@ -0,0 +1,67 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from mentions.models.base import MentionsBaseModel
+
+__all__ = [
+    "HostHealth",
+]
+
+
+class HostHealth(MentionsBaseModel):
+    """Recent statistics about requests made to a remote host.
+
+    Used by `mentions.host_health` to stop making requests to hosts which
+    are not responding."""
+
+    domain = models.CharField(
+        _("domain"),
+        max_length=255,
+        unique=True,
+    )
+    latency = models.FloatField(
+        _("latency"),
+        default=0,
+        editable=False,
+        help_text=_("Recent average time (in seconds) taken to respond."),
+    )
+    error_rate = models.FloatField(
+        _("error rate"),
+        default=0,
+        editable=False,
+        help_text=_("Recent proportion of requests which failed, from 0 to 1."),
+    )
+    consecutive_failures = models.PositiveIntegerField(
+        _("consecutive failures"),
+        default=0,
+        editable=False,
+    )
+    last_success = models.DateTimeField(
+        _("last success"),
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    last_failure = models.DateTimeField(
+        _("last failure"),
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    circuit_opened_at = models.DateTimeField(
+        _("unavailable since"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "If set, requests to this host are skipped until the cooldown "
+            "period has passed. Clear this to allow requests immediately."
+        ),
+    )
+
+    def __str__(self):
+        return f"HostHealth: {self.domain}"
+
+    class Meta:
+        ordering = ["domain"]
+        verbose_name = _("host health")
+        verbose_name_plural = _("host health")
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from typing import List, Sequence, cast
+
+from django.db import connections, transaction
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+
+from mentions import options
+
+
+class RetryableQuerySet(QuerySet):
+    def filter(self, *args, **kwargs) -> "RetryableQuerySet":
+        return cast(RetryableQuerySet, super().filter(*args, **kwargs))
+
+    def filter_awaiting_retry(self) -> "RetryableQuerySet":
+        return self.filter(is_awaiting_retry=True)
+
+    def filter_due_for_retry(self, now=timezone.now) -> "RetryableQuerySet":
+        """Objects for which `RetryableMixin.can_retry` would return True, in
+        the order they became due."""
+        if callable(now):
+            now = now()
+
+        return (
+            self.filter_awaiting_retry()
+            .filter(
+                Q(next_retry_at__isnull=True) | Q(next_retry_at__lte=now),
+                is_retry_successful=False,
+                retry_attempt_count__lt=options.max_retries(),
+            )
+            .order_by(F("next_retry_at").asc(nulls_first=True), "pk")
+        )
+
+    def filter_unleased(self, now=timezone.now) -> "RetryableQuerySet":
+        """Objects which are not currently claimed by `claim_for_retry`."""
+        if callable(now):
+            now = now()
+
+        return self.filter(
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now)
+        )
+
+    def claim_for_retry(self, pks: Sequence, now=timezone.now) -> List:
+        """Lease any objects from pks which are still due for retry and not
+        already leased, so that other workers will not process them.
+
+        Where the database supports it, rows are locked with
+        `SELECT ... FOR UPDATE SKIP LOCKED` while the lease is written so that
+        workers do not wait for each other. Otherwise, each lease is written
+        with a conditional update which only succeeds for one worker.
+
+        The lease is released by `mark_processing_failed`,
+        `mark_processing_successful` or `release_leases`, or expires after
+        `options.retry_lease_timeout` seconds.
+
+        Returns:
+            The claimed objects, in the same order as pks.
+        """
+        if callable(now):
+            now = now()
+
+        lease_expires_at = now + timedelta(seconds=options.retry_lease_timeout())
+        claimable = self.filter_due_for_retry(now=now).filter_unleased(now=now)
+        claimable = claimable.filter(pk__in=pks)
+
+        if connections[self.db].features.has_select_for_update_skip_locked:
+            with transaction.atomic(using=self.db):
+                claimed = list(
+                    claimable.select_for_update(skip_locked=True).values_list(
+                        "pk", flat=True
+                    )
+                )
+                self.filter(pk__in=claimed).update(lease_expires_at=lease_expires_at)
+
+        else:
+            claimed = [
+                pk
+                for pk in claimable.values_list("pk", flat=True)
+                if claimable.filter(pk=pk).update(lease_expires_at=lease_expires_at)
+            ]
+
+        objects = self.in_bulk(claimed)
+        return [objects[pk] for pk in pks if pk in objects]
+
+    def release_leases(self) -> int:
+        return self.update(lease_expires_at=None)
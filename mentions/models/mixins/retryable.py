@@ -1,13 +1,26 @@
+from datetime import timedelta
+from typing import Iterable
+
 from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from mentions import options
+from mentions.models.managers.retryable import RetryableQuerySet
+from mentions.util.backoff import get_retry_delay
 
 __all__ = [
     "RetryableMixin",
 ]
 
+_RESET_RETRIES = {
+    "retry_attempt_count": 0,
+    "is_awaiting_retry": True,
+    "is_retry_successful": False,
+    "next_retry_at": None,
+    "last_retry_delay": None,
+}
+
 
 class RetryableMixin(models.Model):
     """A mixin for models that need to track reprocessing attempts."""
@@ -15,6 +28,8 @@ class RetryableMixin(models.Model):
     class Meta:
         abstract = True
 
+    objects = RetryableQuerySet.as_manager()
+
     retry_attempt_count = models.PositiveSmallIntegerField(
         _("retry attempt count"),
         default=0,
@@ -40,6 +55,36 @@ class RetryableMixin(models.Model):
         help_text=_("Whether this object has been processed successfully."),
         editable=False,
     )
+    next_retry_at = models.DateTimeField(
+        _("next retry"),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "When this object will next be eligible for processing. If empty, "
+            "it is eligible immediately."
+        ),
+    )
+    last_retry_delay = models.FloatField(
+        _("last retry delay"),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "The delay (in seconds) that was scheduled after the latest failed "
+            "attempt, if any."
+        ),
+    )
+    lease_expires_at = models.DateTimeField(
+        _("lease expires"),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "If set, this object is being processed by a worker and should not "
+            "be claimed by another until this time."
+        ),
+    )
 
     def mark_processing_failed(self, save: bool = False, now=timezone.now) -> None:
         if callable(now):
@@ -49,6 +94,12 @@ class RetryableMixin(models.Model):
         self.last_retry_attempt = now
         self.is_awaiting_retry = self.retry_attempt_count < options.max_retries()
         self.is_retry_successful = False
+        self.lease_expires_at = None
+        self.next_retry_at = None
+        if self.is_awaiting_retry:
+            delay = get_retry_delay(self.retry_attempt_count, self.last_retry_delay)
+            self.next_retry_at = now + timedelta(seconds=delay)
+            self.last_retry_delay = delay
 
         if save:
             self.save()
@@ -61,12 +112,39 @@ class RetryableMixin(models.Model):
         self.last_retry_attempt = now
         self.is_awaiting_retry = False
         self.is_retry_successful = True
+        self.lease_expires_at = None
+        self.next_retry_at = None
+
+        if save:
+            self.save()
+
+    def defer_processing(
+        self,
+        seconds: float,
+        save: bool = False,
+        now=timezone.now,
+    ) -> None:
+        """Postpone processing without counting it as a failed attempt, e.g.
+        because the remote host is rate limited.
+
+        `last_retry_delay` is left alone so that backoff continues from the
+        latest failed attempt."""
+        if callable(now):
+            now = now()
+
+        self.is_awaiting_retry = True
+        self.is_retry_successful = False
+        self.lease_expires_at = None
+        self.next_retry_at = now + timedelta(seconds=seconds)
 
         if save:
             self.save()
 
     def can_retry(self, now=timezone.now) -> bool:
-        """Return True if awaiting_retry and enough time has passed since last_retry_attempt."""
+        """Return True if awaiting_retry and next_retry_at has passed.
+
+        `RetryableQuerySet.filter_due_for_retry` applies the same conditions
+        in the database."""
 
         if self.is_retry_successful:
             return False
@@ -77,23 +155,32 @@ class RetryableMixin(models.Model):
         if self.retry_attempt_count >= options.max_retries():
             return False
 
-        if self.last_retry_attempt is None:
+        if self.next_retry_at is None:
             return True
 
         if callable(now):
             now = now()
 
-        seconds_since_last = (now - self.last_retry_attempt).total_seconds()
-        return self.is_awaiting_retry and seconds_since_last >= options.retry_interval()
+        return now >= self.next_retry_at
 
     def reset_retries(self):
-        self.retry_attempt_count = 0
-        self.is_awaiting_retry = True
-        self.is_retry_successful = False
-        self.save(
-            update_fields=[
-                "retry_attempt_count",
-                "is_awaiting_retry",
-                "is_retry_successful",
-            ]
+        self._apply_reset_retries()
+        self.save(update_fields=list(_RESET_RETRIES.keys()))
+
+    @classmethod
+    def bulk_reset_retries(cls, instances: Iterable["RetryableMixin"]) -> None:
+        """Reset retry tracking for all the given instances with a single query."""
+        instances = list(instances)
+        if not instances:
+            return
+
+        for instance in instances:
+            instance._apply_reset_retries()
+
+        cls.objects.filter(pk__in=[instance.pk for instance in instances]).update(
+            **_RESET_RETRIES
         )
+
+    def _apply_reset_retries(self):
+        for field, value in _RESET_RETRIES.items():
+            setattr(self, field, value)
@@ -1,3 +1,5 @@
+from typing import Dict, Iterable
+
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -7,6 +9,7 @@ from mentions.models.mixins import RetryableMixin
 __all__ = [
     "OutgoingWebmentionStatus",
     "get_or_create_outgoing_webmention",
+    "get_or_create_outgoing_webmentions",
 ]
 
 
@@ -45,6 +48,15 @@ class OutgoingWebmentionStatus(RetryableMixin, MentionsBaseModel):
         _("successful"),
         default=False,
     )
+    content_fingerprint = models.CharField(
+        _("content fingerprint"),
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "Fingerprint of the source content around the link when it was last processed."
+        ),
+    )
 
     def __str__(self):
         return (
@@ -53,6 +65,12 @@ class OutgoingWebmentionStatus(RetryableMixin, MentionsBaseModel):
         )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["is_awaiting_retry", "next_retry_at"],
+                name="mentions_ows_retry_idx",
+            ),
+        ]
         ordering = ["-created_at"]
         verbose_name = _("outgoing webmention")
         verbose_name_plural = _("outgoing webmentions")
@@ -81,3 +99,52 @@ def get_or_create_outgoing_webmention(
         status.reset_retries()
 
     return status
+
+
+def get_or_create_outgoing_webmentions(
+    source_urlpath: str,
+    target_urls: Iterable[str],
+    reset_retries: bool = False,
+) -> Dict[str, OutgoingWebmentionStatus]:
+    """Get or create OutgoingWebmentionStatus instances for each of target_urls.
+
+    Equivalent to calling `get_or_create_outgoing_webmention` for each target
+    but uses a constant number of queries, regardless of the number of targets.
+
+    Returns:
+        A dictionary of target_url -> OutgoingWebmentionStatus.
+    """
+    target_urls = set(target_urls)
+    statuses = {}
+
+    # Follow default ordering so that the same instance is chosen as
+    # `get_or_create_outgoing_webmention` if there are duplicates.
+    for status in OutgoingWebmentionStatus.objects.filter(
+        source_url=source_urlpath,
+        target_url__in=target_urls,
+    ):
+        statuses.setdefault(status.target_url, status)
+
+    missing = sorted(target_urls - statuses.keys())
+    if missing:
+        created = OutgoingWebmentionStatus.objects.bulk_create(
+            [
+                OutgoingWebmentionStatus(source_url=source_urlpath, target_url=url)
+                for url in missing
+            ]
+        )
+
+        if any(status.pk is None for status in created):
+            # Some database backends do not return primary keys from bulk_create.
+            created = OutgoingWebmentionStatus.objects.filter(
+                source_url=source_urlpath,
+                target_url__in=missing,
+            )
+
+        for status in created:
+            statuses.setdefault(status.target_url, status)
+
+    if reset_retries:
+        OutgoingWebmentionStatus.bulk_reset_retries(statuses.values())
+
+    return statuses
@@ -40,6 +40,12 @@ class PendingIncomingWebmention(RetryableMixin, MentionsBaseModel):
                 name="unique_source_url_per_target_url",
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["is_awaiting_retry", "next_retry_at"],
+                name="mentions_pin_retry_idx",
+            ),
+        ]
         ordering = ["-created_at"]
         verbose_name = _("pending incoming webmention")
         verbose_name_plural = _("pending incoming webmentions")
@@ -18,7 +18,7 @@ WEBMENTIONS_USE_CELERY = True
 """
 
 import logging
-from typing import Callable, Dict, Iterable, Set, Union
+from typing import Callable, Dict, Iterable, Optional, Set, Union
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
@@ -27,9 +27,18 @@ import mentions
 
 __all__ = [
     "allow_self_mentions",
+    "async_concurrency",
     "auto_approve",
+    "cache_alias",
+    "circuit_breaker_cooldown",
+    "circuit_breaker_threshold",
+    "connect_timeout",
     "dashboard_public",
     "domain_name",
+    "endpoint_cache_ttl",
+    "endpoint_cache_ttl_not_found",
+    "endpoint_discovery_max_bytes",
+    "endpoint_discovery_use_head",
     "incoming_domains_allow",
     "incoming_domains_deny",
     "outgoing_domains_deny",
@@ -37,8 +46,26 @@ __all__ = [
     "outgoing_domains_tag_allow",
     "outgoing_domains_tag_deny",
     "get_config",
+    "hcard_cache_size",
+    "http_pool_connections",
+    "http_pool_maxsize",
+    "link_parser",
+    "max_response_bytes",
     "max_retries",
+    "outgoing_coalesce_window",
+    "outgoing_concurrency",
+    "outgoing_concurrency_per_host",
+    "rate_limit",
+    "rate_limit_burst",
+    "rate_limit_domains",
+    "read_timeout",
+    "resolution_cache_ttl",
+    "resolution_cache_ttl_not_found",
+    "response_deadline",
+    "retry_backoff",
     "retry_interval",
+    "retry_interval_max",
+    "retry_lease_timeout",
     "target_requires_model",
     "timeout",
     "url_scheme",
@@ -50,7 +77,12 @@ __all__ = [
 NAMESPACE = "WEBMENTIONS"
 SETTING_ALLOW_OUTGOING_DEFAULT = f"{NAMESPACE}_ALLOW_OUTGOING_DEFAULT"
 SETTING_ALLOW_SELF_MENTIONS = f"{NAMESPACE}_ALLOW_SELF_MENTIONS"
+SETTING_ASYNC_CONCURRENCY = f"{NAMESPACE}_ASYNC_CONCURRENCY"
 SETTING_AUTO_APPROVE = f"{NAMESPACE}_AUTO_APPROVE"
+SETTING_CACHE = f"{NAMESPACE}_CACHE"
+SETTING_CIRCUIT_BREAKER_COOLDOWN = f"{NAMESPACE}_CIRCUIT_BREAKER_COOLDOWN"
+SETTING_CIRCUIT_BREAKER_THRESHOLD = f"{NAMESPACE}_CIRCUIT_BREAKER_THRESHOLD"
+SETTING_CONNECT_TIMEOUT = f"{NAMESPACE}_CONNECT_TIMEOUT"
 SETTING_DASHBOARD_PUBLIC = f"{NAMESPACE}_DASHBOARD_PUBLIC"
 SETTING_DEFAULT_URL_PARAMETER_MAPPING = f"{NAMESPACE}_DEFAULT_URL_PARAMETER_MAPPING"
 SETTING_DOMAINS_INCOMING_ALLOW = f"{NAMESPACE}_DOMAINS_INCOMING_ALLOW"
@@ -59,9 +91,31 @@ SETTING_DOMAINS_OUTGOING_ALLOW = f"{NAMESPACE}_DOMAINS_OUTGOING_ALLOW"
 SETTING_DOMAINS_OUTGOING_DENY = f"{NAMESPACE}_DOMAINS_OUTGOING_DENY"
 SETTING_DOMAINS_OUTGOING_TAG_ALLOW = f"{NAMESPACE}_DOMAINS_OUTGOING_TAG_ALLOW"
 SETTING_DOMAINS_OUTGOING_TAG_DENY = f"{NAMESPACE}_DOMAINS_OUTGOING_TAG_DENY"
+SETTING_ENDPOINT_CACHE_TTL = f"{NAMESPACE}_ENDPOINT_CACHE_TTL"
+SETTING_ENDPOINT_CACHE_TTL_NOT_FOUND = f"{NAMESPACE}_ENDPOINT_CACHE_TTL_NOT_FOUND"
+SETTING_ENDPOINT_DISCOVERY_MAX_BYTES = f"{NAMESPACE}_ENDPOINT_DISCOVERY_MAX_BYTES"
+SETTING_ENDPOINT_DISCOVERY_USE_HEAD = f"{NAMESPACE}_ENDPOINT_DISCOVERY_USE_HEAD"
+SETTING_HCARD_CACHE_SIZE = f"{NAMESPACE}_HCARD_CACHE_SIZE"
+SETTING_HTTP_POOL_CONNECTIONS = f"{NAMESPACE}_HTTP_POOL_CONNECTIONS"
+SETTING_HTTP_POOL_MAXSIZE = f"{NAMESPACE}_HTTP_POOL_MAXSIZE"
 SETTING_INCOMING_TARGET_MODEL_REQUIRED = f"{NAMESPACE}_INCOMING_TARGET_MODEL_REQUIRED"
+SETTING_LINK_PARSER = f"{NAMESPACE}_LINK_PARSER"
+SETTING_MAX_RESPONSE_BYTES = f"{NAMESPACE}_MAX_RESPONSE_BYTES"
 SETTING_MAX_RETRIES = f"{NAMESPACE}_MAX_RETRIES"
+SETTING_OUTGOING_COALESCE_WINDOW = f"{NAMESPACE}_OUTGOING_COALESCE_WINDOW"
+SETTING_OUTGOING_CONCURRENCY = f"{NAMESPACE}_OUTGOING_CONCURRENCY"
+SETTING_OUTGOING_CONCURRENCY_PER_HOST = f"{NAMESPACE}_OUTGOING_CONCURRENCY_PER_HOST"
+SETTING_RATE_LIMIT = f"{NAMESPACE}_RATE_LIMIT"
+SETTING_RATE_LIMIT_BURST = f"{NAMESPACE}_RATE_LIMIT_BURST"
+SETTING_RATE_LIMIT_DOMAINS = f"{NAMESPACE}_RATE_LIMIT_DOMAINS"
+SETTING_READ_TIMEOUT = f"{NAMESPACE}_READ_TIMEOUT"
+SETTING_RESOLUTION_CACHE_TTL = f"{NAMESPACE}_RESOLUTION_CACHE_TTL"
+SETTING_RESOLUTION_CACHE_TTL_NOT_FOUND = f"{NAMESPACE}_RESOLUTION_CACHE_TTL_NOT_FOUND"
+SETTING_RESPONSE_DEADLINE = f"{NAMESPACE}_RESPONSE_DEADLINE"
+SETTING_RETRY_BACKOFF = f"{NAMESPACE}_RETRY_BACKOFF"
 SETTING_RETRY_INTERVAL = f"{NAMESPACE}_RETRY_INTERVAL"
+SETTING_RETRY_INTERVAL_MAX = f"{NAMESPACE}_RETRY_INTERVAL_MAX"
+SETTING_RETRY_LEASE_TIMEOUT = f"{NAMESPACE}_RETRY_LEASE_TIMEOUT"
 SETTING_TIMEOUT = f"{NAMESPACE}_TIMEOUT"
 SETTING_URL_SCHEME = f"{NAMESPACE}_URL_SCHEME"
 SETTING_USE_CELERY = f"{NAMESPACE}_USE_CELERY"
@@ -74,7 +128,12 @@ SETTING_DOMAIN_NAME = "DOMAIN_NAME"
 DEFAULTS = {
     SETTING_ALLOW_OUTGOING_DEFAULT: False,
     SETTING_ALLOW_SELF_MENTIONS: True,
+    SETTING_ASYNC_CONCURRENCY: 0,
     SETTING_AUTO_APPROVE: False,
+    SETTING_CACHE: "default",
+    SETTING_CIRCUIT_BREAKER_COOLDOWN: 60 * 10,
+    SETTING_CIRCUIT_BREAKER_THRESHOLD: 5,
+    SETTING_CONNECT_TIMEOUT: None,
     SETTING_DASHBOARD_PUBLIC: False,
     SETTING_DEFAULT_URL_PARAMETER_MAPPING: {"object_id": "id"},
     SETTING_DOMAIN_NAME: None,
@@ -84,9 +143,31 @@ DEFAULTS = {
     SETTING_DOMAINS_OUTGOING_DENY: None,
     SETTING_DOMAINS_OUTGOING_TAG_ALLOW: None,
     SETTING_DOMAINS_OUTGOING_TAG_DENY: None,
+    SETTING_ENDPOINT_CACHE_TTL: 60 * 60 * 24,
+    SETTING_ENDPOINT_CACHE_TTL_NOT_FOUND: 60 * 60 * 6,
+    SETTING_ENDPOINT_DISCOVERY_MAX_BYTES: 512 * 1024,
+    SETTING_ENDPOINT_DISCOVERY_USE_HEAD: True,
+    SETTING_HCARD_CACHE_SIZE: 1000,
+    SETTING_HTTP_POOL_CONNECTIONS: 10,
+    SETTING_HTTP_POOL_MAXSIZE: 4,
     SETTING_INCOMING_TARGET_MODEL_REQUIRED: False,
+    SETTING_LINK_PARSER: "html5lib",
+    SETTING_MAX_RESPONSE_BYTES: 5 * 1024 * 1024,
     SETTING_MAX_RETRIES: 5,
+    SETTING_OUTGOING_COALESCE_WINDOW: 0,
+    SETTING_OUTGOING_CONCURRENCY: 1,
+    SETTING_OUTGOING_CONCURRENCY_PER_HOST: 1,
+    SETTING_RATE_LIMIT: 0,
+    SETTING_RATE_LIMIT_BURST: 5,
+    SETTING_RATE_LIMIT_DOMAINS: None,
+    SETTING_READ_TIMEOUT: None,
+    SETTING_RESOLUTION_CACHE_TTL: 60 * 60,
+    SETTING_RESOLUTION_CACHE_TTL_NOT_FOUND: 60,
+    SETTING_RESPONSE_DEADLINE: 30,
+    SETTING_RETRY_BACKOFF: "fixed",
     SETTING_RETRY_INTERVAL: 60 * 10,
+    SETTING_RETRY_INTERVAL_MAX: 60 * 60 * 6,
+    SETTING_RETRY_LEASE_TIMEOUT: 60 * 30,
     SETTING_TIMEOUT: 10,
     SETTING_URL_SCHEME: "https",
     SETTING_USE_CELERY: True,
@@ -138,6 +219,17 @@ def allow_self_mentions() -> bool:
     return _get_attr(SETTING_ALLOW_SELF_MENTIONS)
 
 
+def async_concurrency() -> int:
+    """Return settings.WEBMENTIONS_ASYNC_CONCURRENCY.
+
+    The maximum number of objects in each batch of `manage.py pending_mentions`
+    that may be processed at the same time using asyncio. Network requests
+    are made with `httpx` if it is installed.
+
+    The default value of 0 processes each object in a batch in turn."""
+    return _get_attr(SETTING_ASYNC_CONCURRENCY)
+
+
 def auto_approve() -> bool:
     """Return settings.WEBMENTIONS_AUTO_APPROVE, or False if not set.
 
@@ -147,6 +239,46 @@ def auto_approve() -> bool:
     return _get_attr(SETTING_AUTO_APPROVE)
 
 
+def cache_alias() -> str:
+    """Return settings.WEBMENTIONS_CACHE.
+
+    The name of the entry in `settings.CACHES` that `django-wm` should use
+    for any data that is cached between tasks, such as the results of
+    webmention endpoint discovery.
+
+    If you run more than one worker process you should use a cache backend
+    that is shared between them, e.g. Redis or Memcached."""
+    return _get_attr(SETTING_CACHE)
+
+
+def circuit_breaker_cooldown() -> int:
+    """Return settings.WEBMENTIONS_CIRCUIT_BREAKER_COOLDOWN.
+
+    How long (in seconds) to skip requests to a host that is not responding,
+    see `WEBMENTIONS_CIRCUIT_BREAKER_THRESHOLD`. After this time a single
+    request is allowed: if it succeeds, requests to the host resume."""
+    return _get_attr(SETTING_CIRCUIT_BREAKER_COOLDOWN)
+
+
+def circuit_breaker_threshold() -> int:
+    """Return settings.WEBMENTIONS_CIRCUIT_BREAKER_THRESHOLD.
+
+    The number of consecutive network errors (e.g. timeouts or refused
+    connections) after which we stop making requests to a host for a while.
+    Skipped requests are treated as failed attempts and retried later, as
+    usual. Statistics for each host are available in the admin.
+
+    Set to 0 to disable."""
+    return _get_attr(SETTING_CIRCUIT_BREAKER_THRESHOLD)
+
+
+def connect_timeout() -> float:
+    """Return settings.WEBMENTIONS_CONNECT_TIMEOUT, or settings.WEBMENTIONS_TIMEOUT if not set.
+
+    Timeout (in seconds) for establishing a connection to a remote server."""
+    return _get_attr(SETTING_CONNECT_TIMEOUT) or timeout()
+
+
 def dashboard_public() -> bool:
     """Return settings.WEBMENTIONS_DASHBOARD_PUBLIC.
 
@@ -181,6 +313,79 @@ def domain_name() -> str:
     return _get_attr(SETTING_DOMAIN_NAME)
 
 
+def endpoint_cache_ttl() -> int:
+    """Return settings.WEBMENTIONS_ENDPOINT_CACHE_TTL.
+
+    How long (in seconds) the webmention endpoint of an outgoing target URL
+    should be remembered. While cached, sending a webmention to that target
+    does not require another request to discover its endpoint.
+
+    Set to 0 to disable caching of discovered endpoints."""
+    return _get_attr(SETTING_ENDPOINT_CACHE_TTL)
+
+
+def endpoint_cache_ttl_not_found() -> int:
+    """Return settings.WEBMENTIONS_ENDPOINT_CACHE_TTL_NOT_FOUND.
+
+    How long (in seconds) to remember that an outgoing target URL does not
+    have a webmention endpoint.
+
+    Set to 0 to disable caching of these negative results."""
+    return _get_attr(SETTING_ENDPOINT_CACHE_TTL_NOT_FOUND)
+
+
+def endpoint_discovery_max_bytes() -> int:
+    """Return settings.WEBMENTIONS_ENDPOINT_DISCOVERY_MAX_BYTES.
+
+    The maximum number of bytes that will be read from the body of an outgoing
+    target page while looking for its webmention endpoint. The body is parsed
+    as it is received and reading stops as soon as an endpoint is found.
+
+    If no endpoint is found within this limit, the target is treated as not
+    supporting webmentions."""
+    return _get_attr(SETTING_ENDPOINT_DISCOVERY_MAX_BYTES)
+
+
+def endpoint_discovery_use_head() -> bool:
+    """Return settings.WEBMENTIONS_ENDPOINT_DISCOVERY_USE_HEAD.
+
+    If True, endpoint discovery for an outgoing target starts with a HEAD
+    request. If the endpoint is advertised in the HTTP `Link` header then the
+    body of the target page does not need to be retrieved at all.
+
+    If False, a GET request is always used."""
+    return _get_attr(SETTING_ENDPOINT_DISCOVERY_USE_HEAD)
+
+
+def hcard_cache_size() -> int:
+    """Return settings.WEBMENTIONS_HCARD_CACHE_SIZE.
+
+    The number of recently seen h-cards to remember in each process. If an
+    incoming webmention includes an h-card which is identical to a remembered
+    one, the existing HCard is reused without writing to the database.
+
+    Set to 0 to disable."""
+    return _get_attr(SETTING_HCARD_CACHE_SIZE)
+
+
+def http_pool_connections() -> int:
+    """Return settings.WEBMENTIONS_HTTP_POOL_CONNECTIONS.
+
+    Connections to remote servers are kept open so they can be reused by
+    later requests. This is the number of different hosts for which
+    connections are kept."""
+    return _get_attr(SETTING_HTTP_POOL_CONNECTIONS)
+
+
+def http_pool_maxsize() -> int:
+    """Return settings.WEBMENTIONS_HTTP_POOL_MAXSIZE.
+
+    The maximum number of simultaneous connections to any single host. If
+    more requests are made at the same time, they will wait for an existing
+    connection to become available."""
+    return _get_attr(SETTING_HTTP_POOL_MAXSIZE)
+
+
 def incoming_domains_allow() -> Set[str]:
     """Return settings.WEBMENTIONS_DOMAINS_INCOMING_ALLOW.
 
@@ -227,6 +432,29 @@ def outgoing_domains_tag_deny() -> str:
     return _get_attr(SETTING_DOMAINS_OUTGOING_TAG_DENY)
 
 
+def link_parser() -> str:
+    """Return settings.WEBMENTIONS_LINK_PARSER.
+
+    The parser used to find links in your content when sending outgoing
+    webmentions. One of:
+    - `html5lib`: The default. Slowest but most tolerant of broken HTML.
+    - `lxml`: Much faster, requires `lxml` to be installed.
+    - `html.parser`: The parser built into Python.
+    - `stream`: Finds links in a single pass without building a document tree.
+
+    Changing this may cause webmentions to be resent for existing content as
+    the parsers may disagree about the text surrounding each link."""
+    return _get_attr(SETTING_LINK_PARSER)
+
+
+def max_response_bytes() -> int:
+    """Return settings.WEBMENTIONS_MAX_RESPONSE_BYTES.
+
+    The maximum size (in bytes) of a page we are willing to download when
+    verifying an incoming webmention. Larger sources are rejected."""
+    return _get_attr(SETTING_MAX_RESPONSE_BYTES)
+
+
 def max_retries() -> int:
     """Return settings.WEBMENTIONS_MAX_RETRIES.
 
@@ -235,6 +463,135 @@ def max_retries() -> int:
     return _get_attr(SETTING_MAX_RETRIES)
 
 
+def outgoing_coalesce_window() -> int:
+    """Return settings.WEBMENTIONS_OUTGOING_COALESCE_WINDOW.
+
+    Delay (in seconds) before processing outgoing webmentions for content that
+    has been saved. If the same content is saved again during this time, the
+    saves are combined into a single processing run which uses the latest
+    version of the content.
+
+    Only used if `celery` is enabled: without `celery`, content is always
+    combined until `manage.py pending_mentions` is run. The default value of
+    0 processes every save immediately."""
+    return _get_attr(SETTING_OUTGOING_COALESCE_WINDOW)
+
+
+def outgoing_concurrency() -> int:
+    """Return settings.WEBMENTIONS_OUTGOING_CONCURRENCY.
+
+    The maximum number of outgoing webmentions that may be processed at the
+    same time for a single piece of content. Each target requires up to two
+    network requests (endpoint discovery and submission) so allowing these to
+    run in parallel can greatly reduce the time taken to process content
+    that contains many links.
+
+    The default value of 1 processes each link in turn.
+
+    Any database queries made while processing in parallel will use their own
+    connection: make sure your database configuration allows this."""
+    return _get_attr(SETTING_OUTGOING_CONCURRENCY)
+
+
+def outgoing_concurrency_per_host() -> int:
+    """Return settings.WEBMENTIONS_OUTGOING_CONCURRENCY_PER_HOST.
+
+    The maximum number of outgoing webmentions that may be processed at the
+    same time for targets on the same domain. This is applied within the
+    limit of `WEBMENTIONS_OUTGOING_CONCURRENCY`."""
+    return _get_attr(SETTING_OUTGOING_CONCURRENCY_PER_HOST)
+
+
+def rate_limit() -> float:
+    """Return settings.WEBMENTIONS_RATE_LIMIT.
+
+    The maximum average number of requests per second that we will make to
+    any single host when sending or verifying webmentions. Work for a host
+    that has reached its limit is deferred and retried later.
+
+    The limit is shared by all workers which use the same cache, see
+    `WEBMENTIONS_CACHE`.
+
+    The default value of 0 disables rate limiting."""
+    return _get_attr(SETTING_RATE_LIMIT)
+
+
+def rate_limit_burst() -> int:
+    """Return settings.WEBMENTIONS_RATE_LIMIT_BURST.
+
+    The number of requests that may be made to a host in quick succession
+    before `WEBMENTIONS_RATE_LIMIT` is applied."""
+    return _get_attr(SETTING_RATE_LIMIT_BURST)
+
+
+def rate_limit_domains() -> Optional[Dict[str, float]]:
+    """Return settings.WEBMENTIONS_RATE_LIMIT_DOMAINS.
+
+    A dictionary of domain -> requests per second which overrides
+    `WEBMENTIONS_RATE_LIMIT` for particular domains. Domains may use a
+    wildcard `*.` prefix to include subdomains, e.g.
+    `{"*.example.org": 0.5, "fast.example.org": 0}`.
+
+    A value of 0 disables rate limiting for that domain."""
+    return _get_attr(SETTING_RATE_LIMIT_DOMAINS)
+
+
+def read_timeout() -> float:
+    """Return settings.WEBMENTIONS_READ_TIMEOUT, or settings.WEBMENTIONS_TIMEOUT if not set.
+
+    Timeout (in seconds) to wait for data from a remote server after the
+    connection has been established."""
+    return _get_attr(SETTING_READ_TIMEOUT) or timeout()
+
+
+def resolution_cache_ttl() -> int:
+    """Return settings.WEBMENTIONS_RESOLUTION_CACHE_TTL.
+
+    How long (in seconds) to remember which model instance one of your URLs
+    resolves to. This is used when receiving webmentions and by the `/get`
+    API. Cached results are discarded whenever a `MentionableMixin` instance
+    is saved or deleted.
+
+    Set to 0 to disable."""
+    return _get_attr(SETTING_RESOLUTION_CACHE_TTL)
+
+
+def resolution_cache_ttl_not_found() -> int:
+    """Return settings.WEBMENTIONS_RESOLUTION_CACHE_TTL_NOT_FOUND.
+
+    How long (in seconds) to remember that one of your URLs does not resolve
+    to a model instance.
+
+    Set to 0 to disable."""
+    return _get_attr(SETTING_RESOLUTION_CACHE_TTL_NOT_FOUND)
+
+
+def response_deadline() -> float:
+    """Return settings.WEBMENTIONS_RESPONSE_DEADLINE.
+
+    The maximum total time (in seconds) allowed for downloading a page.
+    Unlike `WEBMENTIONS_TIMEOUT`, which applies to each individual read, this
+    protects against servers which send a response very slowly.
+
+    Set to 0 to disable."""
+    return _get_attr(SETTING_RESPONSE_DEADLINE)
+
+
+def retry_backoff() -> str:
+    """Return settings.WEBMENTIONS_RETRY_BACKOFF.
+
+    How the delay between retries changes after each failed attempt. One of:
+    - `fixed`: The default. Always wait for `WEBMENTIONS_RETRY_INTERVAL`.
+    - `exponential`: Double the delay after each failed attempt.
+    - `decorrelated_jitter`: Choose a random delay of up to three times the
+      previous delay. This spreads out retries for items which failed at the
+      same time, e.g. when a popular server is unavailable.
+
+    `exponential` and `decorrelated_jitter` start at `WEBMENTIONS_RETRY_INTERVAL`
+    and are limited by `WEBMENTIONS_RETRY_INTERVAL_MAX`."""
+    return _get_attr(SETTING_RETRY_BACKOFF)
+
+
 def retry_interval() -> int:
     """Return settings.WEBMENTIONS_RETRY_INTERVAL.
 
@@ -252,6 +609,27 @@ def retry_interval() -> int:
     return _get_attr(SETTING_RETRY_INTERVAL)
 
 
+def retry_interval_max() -> int:
+    """Return settings.WEBMENTIONS_RETRY_INTERVAL_MAX.
+
+    The maximum delay (in seconds) between attempts when using an
+    `exponential` or `decorrelated_jitter` value for `WEBMENTIONS_RETRY_BACKOFF`."""
+    return _get_attr(SETTING_RETRY_INTERVAL_MAX)
+
+
+def retry_lease_timeout() -> int:
+    """Return settings.WEBMENTIONS_RETRY_LEASE_TIMEOUT.
+
+    When processing pending webmentions, each worker claims a batch of objects
+    so that other workers running at the same time will not process them too.
+    If a worker stops before finishing its batch, the claim expires after this
+    many seconds so that another worker can take over.
+
+    This should be longer than a worker needs to process a batch of 100
+    objects, which may require several network requests each."""
+    return _get_attr(SETTING_RETRY_LEASE_TIMEOUT)
+
+
 def target_requires_model() -> bool:
     """Return settings.WEBMENTIONS_INCOMING_TARGET_MODEL_REQUIRED.
 
@@ -265,7 +643,8 @@ def target_requires_model() -> bool:
 def timeout() -> float:
     """Return settings.WEBMENTIONS_TIMEOUT.
 
-    Timeout (in seconds) used for network requests when sending or verifying webmentions."""
+    Timeout (in seconds) used for network requests when sending or verifying webmentions.
+    """
     return _get_attr(SETTING_TIMEOUT)
 
 
@@ -281,7 +660,8 @@ def use_celery() -> bool:
     """Return settings.WEBMENTIONS_USE_CELERY, or True if not set.
 
     This setting enables/disables the use of `celery` for running tasks.
-    If disabled, user must run these tasks using `manage.py pending_mentions` management command."""
+    If disabled, user must run these tasks using `manage.py pending_mentions` management command.
+    """
     return _get_attr(SETTING_USE_CELERY)
 
 
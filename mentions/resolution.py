@@ -1,5 +1,5 @@
 import logging
-from typing import List, Type
+from typing import List, Optional, Type
 
 from django.apps import apps
 from django.conf import settings
@@ -19,6 +19,13 @@ from mentions.helpers.resolution import get_model_for_url_by_helper
 from mentions.helpers.thirdparty.wagtail import get_model_for_url_by_wagtail
 from mentions.models import SimpleMention, Webmention
 from mentions.models.mixins import MentionableMixin, QuotableMixin
+from mentions.resolution_cache import (
+    CachedResolution,
+    cache_resolution,
+    cache_resolution_not_found,
+    forget_resolution,
+    get_cached_resolution,
+)
 from mentions.util.url import get_urlpath
 
 log = logging.getLogger(__name__)
@@ -77,6 +84,50 @@ def get_model_for_url(url: str) -> MentionableMixin:
         NoModelForUrlPath: The ResolverMatch does not resolve to a model instance.
     """
     url_path = get_urlpath(url)
+
+    cached = get_cached_resolution(url_path)
+    if cached is not None:
+        obj = _get_cached_object(url_path, cached)
+        if obj is not None:
+            return obj
+
+    try:
+        obj = _resolve_model_for_url(url, url_path)
+    except (NoModelForUrlPath, TargetDoesNotExist) as e:
+        cache_resolution_not_found(url_path, e)
+        raise
+
+    cache_resolution(url_path, obj)
+    return obj
+
+
+def _get_cached_object(
+    url_path: str,
+    cached: CachedResolution,
+) -> Optional[MentionableMixin]:
+    """Return the model instance for a cached resolution.
+
+    Raises:
+        NoModelForUrlPath, TargetDoesNotExist: If that was the cached result.
+
+    Returns:
+        The cached model instance, or None if it no longer exists.
+    """
+    if cached.error is not None:
+        raise cached.error(f"Cached result for path={url_path}")
+
+    try:
+        content_type = ContentType.objects.get_for_id(cached.content_type_id)
+        model_class = content_type.model_class()
+        if model_class is not None:
+            return model_class._default_manager.get(pk=cached.object_id)
+    except ObjectDoesNotExist:
+        pass
+
+    forget_resolution(url_path)
+
+
+def _resolve_model_for_url(url: str, url_path: str) -> MentionableMixin:
     match = get_urlpattern_match(url_path)
     urlpattern_args = [*match.args]
     urlpattern_kwargs = {**match.kwargs}
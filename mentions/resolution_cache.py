@@ -0,0 +1,123 @@
+"""Remember which model instance, if any, each of our URL paths resolves to.
+
+Resolving a URL requires the URL resolver, a model lookup and at least one
+database query. Successful results are cached as a (content type, object id)
+pair for `options.resolution_cache_ttl` seconds. Paths which do not resolve
+to an instance are cached for `options.resolution_cache_ttl_not_found`
+seconds.
+
+Every cache key includes a generation number which is incremented whenever
+any `MentionableMixin` instance is saved or deleted, so a change to any
+target invalidates all cached results at once. This keeps results correct
+when an object is created for a path that was previously not found, or when
+its URL changes."""
+import logging
+from typing import NamedTuple, Optional, Type
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from mentions import options
+from mentions.exceptions import NoModelForUrlPath, TargetDoesNotExist
+from mentions.models.mixins import MentionableMixin
+from mentions.util.cache import (
+    cache_key,
+    get_cache,
+    get_generation,
+    increment_generation,
+)
+
+__all__ = [
+    "CachedResolution",
+    "cache_resolution",
+    "cache_resolution_not_found",
+    "forget_resolution",
+    "get_cached_resolution",
+]
+
+log = logging.getLogger(__name__)
+
+_NAMESPACE = "resolution"
+
+"""Exceptions which represent a URL path that does not resolve to a model instance."""
+_NOT_FOUND_ERRORS = {
+    NoModelForUrlPath.__name__: NoModelForUrlPath,
+    TargetDoesNotExist.__name__: TargetDoesNotExist,
+}
+
+
+class CachedResolution(NamedTuple):
+    """The cached result of resolving a URL path.
+
+    If the path resolved to a model instance, content_type_id and object_id
+    identify it. Otherwise, error is the exception that was raised."""
+
+    content_type_id: Optional[int] = None
+    object_id: Optional[int] = None
+    error: Optional[Type[Exception]] = None
+
+
+def get_cached_resolution(url_path: str) -> Optional[CachedResolution]:
+    """Return the cached result of resolving url_path, or None if not cached."""
+    value = get_cache().get(_key(url_path))
+    if value is None:
+        return None
+
+    log.debug(f"Using cached resolution for '{url_path}': {value}")
+    content_type_id, object_id, error_name = value
+    return CachedResolution(
+        content_type_id=content_type_id,
+        object_id=object_id,
+        error=_NOT_FOUND_ERRORS.get(error_name),
+    )
+
+
+def cache_resolution(url_path: str, obj: MentionableMixin) -> None:
+    """Remember that url_path resolves to obj."""
+    timeout = options.resolution_cache_ttl()
+    if not timeout or timeout <= 0:
+        return
+
+    content_type = ContentType.objects.get_for_model(obj.__class__)
+    get_cache().set(
+        _key(url_path),
+        (content_type.id, obj.pk, None),
+        timeout=timeout,
+    )
+
+
+def cache_resolution_not_found(url_path: str, error: Exception) -> None:
+    """Remember that url_path does not resolve to a model instance.
+
+    Args:
+        url_path: The path that was resolved.
+        error: The exception raised while resolving url_path. Only
+               `NoModelForUrlPath` and `TargetDoesNotExist` are cached.
+    """
+    error_name = error.__class__.__name__
+    if error_name not in _NOT_FOUND_ERRORS:
+        return
+
+    timeout = options.resolution_cache_ttl_not_found()
+    if not timeout or timeout <= 0:
+        return
+
+    get_cache().set(_key(url_path), (None, None, error_name), timeout=timeout)
+
+
+def forget_resolution(url_path: str) -> None:
+    """Remove any cached result for url_path, e.g. if the cached object no longer exists."""
+    get_cache().delete(_key(url_path))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def _invalidate_resolutions(sender, instance, **kwargs):
+    """Invalidate all cached results when any mentionable instance changes."""
+    if isinstance(instance, MentionableMixin):
+        increment_generation(_NAMESPACE)
+
+
+def _key(url_path: str) -> str:
+    return cache_key(_NAMESPACE, str(get_generation(_NAMESPACE)), url_path)
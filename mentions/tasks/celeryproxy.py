@@ -27,6 +27,13 @@ def _noop_shared_task(func, *args, **kwargs):
                 "settings.MENTION_USE_CELERY is False."
             )
 
+        def apply_async(self, *args, **kwargs):
+            raise NotImplementedError(
+                "Called apply_async() on shared_task but `celery` is not installed! "
+                "To disable Celery in `django-wm`, make sure "
+                "settings.MENTION_USE_CELERY is False."
+            )
+
         def __call__(self, *args, **kwargs):
             if options.use_celery():
                 log.warning("Celery is not installed!")
@@ -1 +1,5 @@
-from .process import process_incoming_webmention
+from .process import (
+    aprocess_incoming_webmentions_from_source,
+    process_incoming_webmention,
+    process_incoming_webmentions_from_source,
+)
@@ -1,2 +1,4 @@
-from .hcard import find_related_hcard, parse_hcard
+from .hcard import find_hcard, find_related_hcard, parse_hcard
+from .microformats import ParsedMicroformats, parse_microformats
 from .post_type import parse_post_type
+from .source import ParsedSource, find_possible_targets
@@ -1,17 +1,22 @@
 import json
 from functools import reduce
 from typing import List, Optional
+from urllib.parse import urljoin
 
-import mf2py
 from bs4 import Tag
 
 from mentions.exceptions import NotEnoughData
 from mentions.microformats import H_CARD, H_ENTRY, H_FEED
 from mentions.models import HCard
 from mentions.models.hcard import update_or_create_hcard
+from mentions.tasks.incoming.parsing.microformats import (
+    ParsedMicroformats,
+    parse_microformats,
+)
 
 __all__ = [
     "parse_hcard",
+    "find_hcard",
     "find_related_hcard",
 ]
 
@@ -30,6 +35,7 @@ LOGO = "logo"
 def parse_hcard(
     soup: Tag,
     recursive: bool = False,
+    base_url: Optional[str] = None,
 ) -> Optional[HCard]:
     """Create or update HCard using data from a BeautifulSoup document.
 
@@ -37,30 +43,62 @@ def parse_hcard(
 
     See https://github.com/microformats/mf2py"""
 
-    parser = mf2py.Parser(doc=soup)
-    parsed_data = parser.to_dict()
-    items = parsed_data.get("items", [])
-    return _find_hcard(items, recursive=recursive)
+    return find_hcard(
+        parse_microformats(soup),
+        recursive=recursive,
+        base_url=base_url,
+    )
+
+
+def find_hcard(
+    microformats: ParsedMicroformats,
+    recursive: bool = False,
+    base_url: Optional[str] = None,
+) -> Optional[HCard]:
+    """Create or update HCard using data that has already been parsed from a document.
 
+    Top-down search to find an h-card in the parsed items."""
+    return _find_hcard(microformats.items, recursive=recursive, base_url=base_url)
 
-def find_related_hcard(link: Tag) -> Optional[HCard]:
+
+def find_related_hcard(
+    link: Tag,
+    microformats: Optional[ParsedMicroformats] = None,
+    base_url: Optional[str] = None,
+) -> Optional[HCard]:
     """Try to find a post-specific h-card from a parent `h-entry` or `h-feed`.
 
-    Bottom-up search for the nearest related h-card."""
-    hentry = link.find_parent(class_=H_ENTRY)
-    if hentry:
-        hcard = parse_hcard(hentry, recursive=True)
-        if hcard:
-            return hcard
+    Bottom-up search for the nearest related h-card.
 
-    hfeed = link.find_parent(class_=H_FEED)
-    if hfeed:
-        hcard = parse_hcard(hfeed, recursive=True)
+    Args:
+        link: The link that mentions the target.
+        microformats: The result of `parse_microformats` for the document
+                      containing link. If the parent h-entry/h-feed was one of
+                      its containers, its item is reused instead of parsing
+                      that part of the document again.
+        base_url: Used to resolve relative URLs in the h-card.
+    """
+    for container_class in [H_ENTRY, H_FEED]:
+        container = link.find_parent(class_=container_class)
+        if not container:
+            continue
+
+        item = microformats.get_item(container) if microformats else None
+        if item is not None:
+            items = [item]
+        else:
+            items = parse_microformats(container).items
+
+        hcard = _find_hcard(items, recursive=True, base_url=base_url)
         if hcard:
             return hcard
 
 
-def _find_hcard(data: List[dict], recursive: bool = False) -> Optional[HCard]:
+def _find_hcard(
+    data: List[dict],
+    recursive: bool = False,
+    base_url: Optional[str] = None,
+) -> Optional[HCard]:
     """Find a useful `h-card` in parsed microformats data.
 
     Args:
@@ -68,6 +106,7 @@ def _find_hcard(data: List[dict], recursive: bool = False) -> Optional[HCard]:
         recursive: If True, traverse h-feed and h-entry containers to try
                    find embedded h-card.
                    If False, h-card will only be found at the top level.
+        base_url: Used to resolve relative URLs in the h-card.
     """
 
     fallback = []  # List of items that may contain an embedded h-card
@@ -77,7 +116,7 @@ def _find_hcard(data: List[dict], recursive: bool = False) -> Optional[HCard]:
 
         if H_CARD in _type:
             try:
-                hcard = _create_hcard(item)
+                hcard = _create_hcard(item, base_url)
                 if hcard:
                     return hcard
 
@@ -91,10 +130,13 @@ def _find_hcard(data: List[dict], recursive: bool = False) -> Optional[HCard]:
     if not recursive:
         return None
 
-    return _find_embedded_hcard(fallback)
+    return _find_embedded_hcard(fallback, base_url)
 
 
-def _find_embedded_hcard(items: List[dict]) -> Optional[HCard]:
+def _find_embedded_hcard(
+    items: List[dict],
+    base_url: Optional[str] = None,
+) -> Optional[HCard]:
     """Traverse `h-entry` and `h-feed` containers to find an `h-card`"""
 
     if not items:
@@ -105,13 +147,17 @@ def _find_embedded_hcard(items: List[dict]) -> Optional[HCard]:
         props = item.get(PROPERTIES)
 
         if AUTHOR in props:
-            return _find_hcard(props.get(AUTHOR))
+            return _find_hcard(props.get(AUTHOR), base_url=base_url)
 
         elif CHILDREN in item:
-            return _find_hcard(item.get(CHILDREN, []))
+            return _find_hcard(item.get(CHILDREN, []), base_url=base_url)
 
 
-def _create_hcard(data: dict) -> HCard:
+def _create_hcard(data: dict, base_url: Optional[str] = None) -> HCard:
+    """Create or update an HCard from a parsed h-card item.
+
+    Any relative URLs are resolved against base_url before anything is
+    written, so the HCard is saved at most once."""
     props = data.get(PROPERTIES)
     homepage = props.get(URL, [None])[0]
     name = props.get(NAME, [""])[0]
@@ -120,6 +166,10 @@ def _create_hcard(data: dict) -> HCard:
     if isinstance(avatar, dict):
         avatar = avatar.get("value", "")
 
+    if base_url:
+        homepage = _absolute_url(base_url, homepage)
+        avatar = _absolute_url(base_url, avatar)
+
     _json = json.dumps(data, sort_keys=True)
 
     _require_any_of([name, homepage])
@@ -132,6 +182,12 @@ def _create_hcard(data: dict) -> HCard:
     )
 
 
+def _absolute_url(base_url: str, url: Optional[str]) -> Optional[str]:
+    if url and isinstance(url, str):
+        return urljoin(base_url, url)
+    return url
+
+
 def _require_any_of(fields: List[str]):
     has_required_fields = (
         reduce(lambda acc, value: acc + 1 if value else acc, fields, 0) >= 1
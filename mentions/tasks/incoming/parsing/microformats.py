@@ -0,0 +1,97 @@
+from typing import Dict, Iterable, List, Optional
+
+import mf2py
+from bs4 import Tag
+
+__all__ = [
+    "ParsedMicroformats",
+    "parse_microformats",
+]
+
+# Key names for mf2py parsing output
+ITEMS = "items"
+CHILDREN = "children"
+ID = "id"
+PROPERTIES = "properties"
+TYPE = "type"
+
+_ELEMENT_ID_PREFIX = "__mentions-mf2-"
+
+
+class ParsedMicroformats:
+    """The microformats data parsed from a document.
+
+    Items parsed from the elements passed as `containers` to
+    `parse_microformats` can be retrieved with `get_item`, so that searches
+    within part of the document do not require parsing it again."""
+
+    def __init__(self, items: List[dict], elements: Dict[int, dict]):
+        self.items = items
+        self._elements = elements
+
+    def get_item(self, element: Tag) -> Optional[dict]:
+        """Return the item that was parsed from the given element, if any."""
+        return self._elements.get(id(element))
+
+
+def parse_microformats(soup: Tag, containers: Iterable[Tag] = ()) -> ParsedMicroformats:
+    """Parse all microformats data from soup with a single `mf2py.Parser`.
+
+    mf2py does not tell us which element each item came from, but it does
+    include the `id` attribute of the element. Each of the containers is
+    given a temporary unique id while parsing so that its item can be found
+    in the output. Original ids are restored afterwards, on both the
+    elements and the parsed items.
+
+    Args:
+        soup: The document, or part of a document, to parse.
+        containers: Elements within soup whose items should be retrievable
+                    via `ParsedMicroformats.get_item`.
+    """
+    original_ids = {}
+    elements = {}
+
+    for index, element in enumerate(containers):
+        element_id = f"{_ELEMENT_ID_PREFIX}{index}"
+        original_ids[element_id] = element.get(ID)
+        elements[element_id] = element
+        element[ID] = element_id
+
+    try:
+        items = mf2py.Parser(doc=soup).to_dict().get(ITEMS, [])
+    finally:
+        for element_id, element in elements.items():
+            original_id = original_ids[element_id]
+            if original_id is None:
+                del element[ID]
+            else:
+                element[ID] = original_id
+
+    items_by_element = {}
+    for item in _walk_items(items):
+        element_id = item.get(ID)
+        if element_id not in elements:
+            continue
+
+        items_by_element[id(elements[element_id])] = item
+        original_id = original_ids[element_id]
+        if original_id is None:
+            del item[ID]
+        else:
+            item[ID] = original_id
+
+    return ParsedMicroformats(items, items_by_element)
+
+
+def _walk_items(items: List[dict]) -> Iterable[dict]:
+    """Yield every item in the parsed tree, including nested children and
+    items that are the values of properties."""
+    for item in items:
+        if not isinstance(item, dict) or TYPE not in item:
+            continue
+
+        yield item
+        yield from _walk_items(item.get(CHILDREN, []))
+
+        for values in item.get(PROPERTIES, {}).values():
+            yield from _walk_items(values)
@@ -0,0 +1,145 @@
+from html import unescape
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import Tag
+
+from mentions.microformats import H_ENTRY, H_FEED
+from mentions.models import HCard
+from mentions.models.mixins import IncomingMentionType
+from mentions.tasks.incoming.parsing.hcard import find_hcard, find_related_hcard
+from mentions.tasks.incoming.parsing.microformats import (
+    ParsedMicroformats,
+    parse_microformats,
+)
+from mentions.tasks.incoming.parsing.post_type import parse_post_type
+from mentions.util import html_parser
+from mentions.util.html import find_links_in_soup
+from mentions.util.url import normalize_url
+
+__all__ = [
+    "ParsedSource",
+    "find_possible_targets",
+]
+
+
+def find_possible_targets(
+    html: str,
+    target_urls: Iterable[str],
+    source_url: str,
+) -> List[str]:
+    """Return the target_urls which might be linked in html, without parsing it.
+
+    This is a cheap, conservative check of the raw text which is used to avoid
+    parsing sources that clearly do not link to a target. Any target that is
+    returned still needs to be verified with `ParsedSource.find_link`.
+
+    A link from a different host must include the target host, whether it is
+    written as an absolute or scheme-relative URL, so the host and the path
+    of the target must both appear in the text. Links from the same host may
+    be relative to the current path, so those targets are always returned.
+
+    The text is unescaped and lowercased first so that character references
+    and differences in case do not hide a link.
+    """
+    text = unescape(html).lower()
+    source_host = (urlsplit(source_url).hostname or "").lower()
+
+    return [
+        target_url
+        for target_url in target_urls
+        if _may_contain_link(text, target_url, source_host)
+    ]
+
+
+def _may_contain_link(text: str, target_url: str, source_host: str) -> bool:
+    try:
+        parts = urlsplit(target_url.strip())
+        target_host = (parts.hostname or "").lower()
+    except ValueError:
+        return True
+
+    if target_host == source_host:
+        return True
+
+    if target_host not in text:
+        return False
+
+    path = parts.path.lower().rstrip("/")
+    return path in text
+
+
+class ParsedSource:
+    """An HTML source document which is parsed once and can then answer
+    questions about any number of target URLs.
+
+    Links are indexed by their normalized absolute URL so that finding the
+    link for a target does not require walking the document again.
+    Microformats are parsed at most once, when first needed."""
+
+    def __init__(self, html: str, source_url: str):
+        self.source_url = source_url
+        self.soup: Tag = html_parser(html)
+        self.links: Dict[str, Tag] = self._build_link_index()
+
+        self._microformats: Optional[ParsedMicroformats] = None
+        self._page_hcard: Optional[HCard] = None
+        self._page_hcard_is_parsed = False
+
+    def _build_link_index(self) -> Dict[str, Tag]:
+        """Map the normalized absolute URL of each link to the first `<a>`
+        tag which points to it."""
+        links = {}
+        for link in find_links_in_soup(self.soup):
+            url = normalize_url(urljoin(self.source_url, link["href"]))
+            links.setdefault(url, link)
+
+        return links
+
+    def get_microformats(self) -> ParsedMicroformats:
+        """Return the microformats data for the whole document.
+
+        Items from h-entry and h-feed containers are indexed so that
+        `find_related_hcard` can look them up instead of parsing again."""
+        if self._microformats is None:
+            self._microformats = parse_microformats(
+                self.soup,
+                containers=self.soup.find_all(class_=[H_ENTRY, H_FEED]),
+            )
+
+        return self._microformats
+
+    def find_link(self, target_url: str) -> Optional[Tag]:
+        """Return the first `<a>` tag which points to target_url, or None if
+        it is not linked."""
+        return self.links.get(normalize_url(target_url))
+
+    def get_post_type(self, link: Tag) -> Optional[IncomingMentionType]:
+        return parse_post_type(link)
+
+    def get_hcard(self, link: Tag) -> Optional[HCard]:
+        """Return the h-card most closely related to the given link.
+
+        The nearest h-entry or h-feed containing the link is checked first,
+        falling back to any top-level h-card on the page."""
+        hcard = find_related_hcard(
+            link,
+            self.get_microformats(),
+            base_url=self.source_url,
+        )
+        if hcard:
+            return hcard
+
+        return self.get_page_hcard()
+
+    def get_page_hcard(self) -> Optional[HCard]:
+        """Return the top-level h-card of the page, if any."""
+        if not self._page_hcard_is_parsed:
+            self._page_hcard = find_hcard(
+                self.get_microformats(),
+                recursive=False,
+                base_url=self.source_url,
+            )
+            self._page_hcard_is_parsed = True
+
+        return self._page_hcard
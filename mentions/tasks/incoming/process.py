@@ -1,7 +1,10 @@
-from typing import Optional, Set, Tuple, Union
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
+
+from asgiref.sync import sync_to_async
 
 from mentions import config, options
 from mentions.exceptions import (
+    RateLimited,
     RejectedByConfig,
     SourceDoesNotLink,
     SourceNotAccessible,
@@ -14,12 +17,16 @@ from mentions.tasks.celeryproxy import get_logger, shared_task
 from mentions.tasks.incoming.local import get_target_object
 from mentions.tasks.incoming.remote import (
     WebmentionMetadata,
+    aget_source_html,
+    get_metadata_for_targets,
     get_metadata_from_source,
     get_source_html,
 )
 
 __all__ = [
+    "aprocess_incoming_webmentions_from_source",
     "process_incoming_webmention",
+    "process_incoming_webmentions_from_source",
     "verify_webmention",
 ]
 
@@ -38,16 +45,12 @@ def process_incoming_webmention(
 ) -> Optional[Webmention]:
     log.info(f"Processing webmention '{source_url}' -> '{target_url}'")
 
-    allow_source_domain = config.accept_domain_incoming(
-        source_url,
-        domains_allow=domains_allow or options.incoming_domains_allow(),
-        domains_deny=domains_deny or options.incoming_domains_deny(),
-    )
-    if not allow_source_domain:
+    if not _accept_source(source_url, domains_allow, domains_deny):
         log.warning(
             f"Ignoring received webmention [{source_url} -> {target_url}]: "
             "Source domain is blocked by settings."
         )
+        _mark_rejected(source_url, [target_url])
         return
 
     try:
@@ -61,12 +64,23 @@ def process_incoming_webmention(
             f"Ignoring received webmention [{source_url} -> {target_url}]: "
             "target does not resolve to a mentionable model instance."
         )
+        _mark_rejected(source_url, [target_url])
+        return
+
+    except TargetWrongDomain:
+        # Already logged by _get_target_object.
+        _mark_rejected(source_url, [target_url])
         return
 
     except SourceNotAccessible:
         _save_for_retry(source_url, target_url, sent_by)
         return
 
+    except RateLimited as e:
+        log.info(f"Deferring webmention [{source_url} -> {target_url}]: {e}")
+        _save_for_retry(source_url, target_url, sent_by, retry_after=e.retry_after)
+        return
+
     status = Status()
     if not is_verified:
         status.warning(f"Source does not contain a link to '{target_url}'")
@@ -83,6 +97,159 @@ def process_incoming_webmention(
     )
 
 
+def process_incoming_webmentions_from_source(
+    source_url: str,
+    targets: Iterable[Tuple[str, str]],
+    domains_allow: Optional[Set[str]] = None,
+    domains_deny: Optional[Set[str]] = None,
+) -> Dict[str, Optional[Webmention]]:
+    """Process several webmentions which share the same source.
+
+    Equivalent to calling `process_incoming_webmention` for each target, but
+    the source is only retrieved and parsed once.
+
+    Args:
+        source_url: The URL of the page that mentions our content.
+        targets: (target_url, sent_by) for each of our URLs that the source
+                 claims to mention.
+
+    Returns:
+        A dictionary of target_url -> the created Webmention, or None if the
+        webmention was rejected or could not be processed yet.
+    """
+    targets = dict(targets)
+    log.info(f"Processing {len(targets)} webmentions from source '{source_url}'")
+
+    target_objects = _get_target_objects(
+        source_url, targets, domains_allow, domains_deny
+    )
+    if not target_objects:
+        return _empty_result(targets)
+
+    try:
+        response_html = get_source_html(source_url)
+    except (SourceNotAccessible, RateLimited) as e:
+        _save_targets_for_retry(source_url, targets, target_objects, e)
+        return _empty_result(targets)
+
+    return _create_webmentions_from_source(
+        source_url, targets, target_objects, response_html
+    )
+
+
+async def aprocess_incoming_webmentions_from_source(
+    source_url: str,
+    targets: Iterable[Tuple[str, str]],
+    domains_allow: Optional[Set[str]] = None,
+    domains_deny: Optional[Set[str]] = None,
+) -> Dict[str, Optional[Webmention]]:
+    """Async version of `process_incoming_webmentions_from_source`.
+
+    The source is retrieved with `aget_source_html`. Database access and
+    parsing are run via `sync_to_async`."""
+    targets = dict(targets)
+    log.info(f"Processing {len(targets)} webmentions from source '{source_url}'")
+
+    target_objects = await sync_to_async(_get_target_objects)(
+        source_url, targets, domains_allow, domains_deny
+    )
+    if not target_objects:
+        return _empty_result(targets)
+
+    try:
+        response_html = await aget_source_html(source_url)
+    except (SourceNotAccessible, RateLimited) as e:
+        await sync_to_async(_save_targets_for_retry)(
+            source_url, targets, target_objects, e
+        )
+        return _empty_result(targets)
+
+    return await sync_to_async(_create_webmentions_from_source)(
+        source_url, targets, target_objects, response_html
+    )
+
+
+def _get_target_objects(
+    source_url: str,
+    targets: Dict[str, str],
+    domains_allow: Optional[Set[str]],
+    domains_deny: Optional[Set[str]],
+) -> Dict[str, Optional[MentionableMixin]]:
+    """Return target_url -> target object for each of targets that may be
+    accepted. Pending webmentions for any others are removed."""
+    if not _accept_source(source_url, domains_allow, domains_deny):
+        log.warning(
+            f"Ignoring received webmentions from '{source_url}': "
+            "Source domain is blocked by settings."
+        )
+        _mark_rejected(source_url, targets)
+        return {}
+
+    target_objects = {}
+    for target_url in targets:
+        try:
+            target_objects[target_url] = _get_target_object(source_url, target_url)
+        except (RejectedByConfig, TargetWrongDomain):
+            _mark_rejected(source_url, [target_url])
+
+    return target_objects
+
+
+def _save_targets_for_retry(
+    source_url: str,
+    targets: Dict[str, str],
+    target_objects: Dict[str, Optional[MentionableMixin]],
+    error: Union[SourceNotAccessible, RateLimited],
+) -> None:
+    retry_after = None
+    if isinstance(error, RateLimited):
+        log.info(f"Deferring webmentions from '{source_url}': {error}")
+        retry_after = error.retry_after
+
+    for target_url in target_objects:
+        _save_for_retry(
+            source_url,
+            target_url,
+            targets[target_url],
+            retry_after=retry_after,
+        )
+
+
+def _create_webmentions_from_source(
+    source_url: str,
+    targets: Dict[str, str],
+    target_objects: Dict[str, Optional[MentionableMixin]],
+    response_html: str,
+) -> Dict[str, Optional[Webmention]]:
+    result = _empty_result(targets)
+    metadata = get_metadata_for_targets(response_html, target_objects, source_url)
+
+    for target_url, target_object in target_objects.items():
+        target_metadata = metadata[target_url]
+        is_verified = target_metadata is not None
+
+        status = Status()
+        if not is_verified:
+            status.warning(f"Source does not contain a link to '{target_url}'")
+
+        _mark_complete(source_url, target_url)
+        result[target_url] = _create_webmention(
+            source_url=source_url,
+            target_url=target_url,
+            sent_by=targets[target_url],
+            target_object=target_object,
+            verified=is_verified,
+            metadata=target_metadata,
+            notes=status,
+        )
+
+    return result
+
+
+def _empty_result(targets: Iterable[str]) -> Dict[str, Optional[Webmention]]:
+    return {target_url: None for target_url in targets}
+
+
 def verify_webmention(
     source_url: str,
     target_url: str,
@@ -90,6 +257,46 @@ def verify_webmention(
     """If the returned metadata is None, verification"""
     is_verified = False
 
+    target_object = _get_target_object(source_url, target_url)
+
+    try:
+        response_html = get_source_html(source_url)
+
+    except SourceNotAccessible:
+        raise
+
+    try:
+        metadata = get_metadata_from_source(response_html, target_url, source_url)
+        is_verified = True
+    except SourceDoesNotLink:
+        metadata = None
+
+    return is_verified, target_object, metadata
+
+
+def _accept_source(
+    source_url: str,
+    domains_allow: Optional[Set[str]],
+    domains_deny: Optional[Set[str]],
+) -> bool:
+    return config.accept_domain_incoming(
+        source_url,
+        domains_allow=domains_allow or options.incoming_domains_allow(),
+        domains_deny=domains_deny or options.incoming_domains_deny(),
+    )
+
+
+def _get_target_object(
+    source_url: str,
+    target_url: str,
+) -> Optional[MentionableMixin]:
+    """Resolve the model instance that is the target of a webmention, if any.
+
+    Raises:
+        TargetWrongDomain: If target_url does not point to our server.
+        RejectedByConfig: If target_url does not resolve to a model instance
+                          and `options.target_requires_model` is True.
+    """
     try:
         target_object = get_target_object(target_url)
 
@@ -109,19 +316,7 @@ def verify_webmention(
         )
         raise RejectedByConfig(f"No target_object found for url={target_url}")
 
-    try:
-        response_html = get_source_html(source_url)
-
-    except SourceNotAccessible:
-        raise
-
-    try:
-        metadata = get_metadata_from_source(response_html, target_url, source_url)
-        is_verified = True
-    except SourceDoesNotLink:
-        metadata = None
-
-    return is_verified, target_object, metadata
+    return target_object
 
 
 def _create_webmention(
@@ -156,8 +351,25 @@ def _mark_complete(source_url: str, target_url: str):
         pass
 
 
-def _save_for_retry(source_url: str, target_url: str, sent_by: str):
-    """In case of network errors, create or update PendingIncomingWebmention instance to retry later."""
+def _mark_rejected(source_url: str, target_urls: Iterable[str]):
+    """Rejected webmentions will never be accepted so there is no point
+    keeping them for retry."""
+    PendingIncomingWebmention.objects.filter(
+        source_url=source_url,
+        target_url__in=list(target_urls),
+    ).delete()
+
+
+def _save_for_retry(
+    source_url: str,
+    target_url: str,
+    sent_by: str,
+    retry_after: Optional[float] = None,
+):
+    """In case of network errors, create or update PendingIncomingWebmention instance to retry later.
+
+    If retry_after is set, processing is deferred for that many seconds
+    without counting as a failed attempt."""
     pending, _ = PendingIncomingWebmention.objects.get_or_create(
         target_url=target_url,
         source_url=source_url,
@@ -166,4 +378,7 @@ def _save_for_retry(source_url: str, target_url: str, sent_by: str):
         },
     )
 
-    pending.mark_processing_failed(save=True)
+    if retry_after is not None:
+        pending.defer_processing(retry_after, save=True)
+    else:
+        pending.mark_processing_failed(save=True)
@@ -1,20 +1,23 @@
 from dataclasses import dataclass
-from typing import Optional
-from urllib.parse import urljoin
+from typing import Dict, Iterable, Optional, Union
 
+from asgiref.sync import sync_to_async
+from requests import RequestException, Response
+
+from mentions import options
 from mentions.exceptions import SourceDoesNotLink, SourceNotAccessible
 from mentions.models import HCard
 from mentions.models.mixins import IncomingMentionType
-from mentions.tasks.incoming.parsing import (
-    find_related_hcard,
-    parse_hcard,
-    parse_post_type,
-)
-from mentions.util import html_parser, http_get
-from mentions.util.html import find_links_in_soup
+from mentions.tasks.incoming.parsing import ParsedSource, find_possible_targets
+from mentions.util import http_get
+from mentions.util.async_requests import AsyncResponse, ahttp_get
+from mentions.util.ratelimit import throttle
+from mentions.util.requests import get_deadline, is_html_content_type, read_text
 
 __all__ = [
+    "aget_source_html",
     "get_source_html",
+    "get_metadata_for_targets",
     "get_metadata_from_source",
     "WebmentionMetadata",
 ]
@@ -24,34 +27,79 @@ def get_source_html(source_url: str) -> str:
     """Confirm source exists as HTML and return its content.
 
     Verify that the source URL returns an HTML page with a successful
-    status code.
+    status code. The content is only downloaded if these checks pass, and
+    must not exceed `options.max_response_bytes` or take longer than
+    `options.response_deadline` to download.
 
     Args:
         source_url: The URL that mentions our content.
 
     Raises:
         SourceNotAccessible: If the `source_url` cannot be resolved, returns an error code, or
-                             is an unexpected content type.
+                             is an unexpected content type, or is too large.
+        RateLimited: If too many requests have been made to the source host
+                     recently, see `options.rate_limit`.
     """
+    throttle(source_url)
+    deadline = get_deadline()
+
+    try:
+        response = http_get(source_url, stream=True)
+    except Exception as e:
+        raise SourceNotAccessible(f"Requests error: {e}")
+
+    try:
+        _check_source_response(source_url, response)
 
+        return read_text(
+            response,
+            max_bytes=options.max_response_bytes(),
+            deadline=deadline,
+        )
+    except RequestException as e:
+        raise SourceNotAccessible(f"Requests error: {e}")
+    finally:
+        response.close()
+
+
+async def aget_source_html(source_url: str) -> str:
+    """Async version of `get_source_html`."""
+    await sync_to_async(throttle)(source_url)
     try:
-        response = http_get(source_url)
+        response = await ahttp_get(
+            source_url,
+            max_bytes=options.max_response_bytes(),
+            truncate=False,
+            deadline=get_deadline(),
+            html_only=True,
+        )
     except Exception as e:
         raise SourceNotAccessible(f"Requests error: {e}")
 
+    _check_source_response(source_url, response)
+    return response.text
+
+
+def _check_source_response(
+    source_url: str,
+    response: Union[Response, AsyncResponse],
+) -> None:
+    """Check the status code and headers of the response, before any content is read.
+
+    Raises:
+        SourceNotAccessible: If the response is an error or is not HTML.
+    """
     if response.status_code >= 300:
         raise SourceNotAccessible(
             f"Source '{source_url}' returned error code [{response.status_code}]"
         )
 
-    content_type = response.headers["content-type"]  # Case-insensitive
-    if "text/html" not in content_type:
+    content_type = response.headers.get("content-type")  # Case-insensitive
+    if not is_html_content_type(content_type):
         raise SourceNotAccessible(
             f"Source '{source_url}' returned unexpected content type: {content_type}"
         )
 
-    return response.text
-
 
 @dataclass
 class WebmentionMetadata:
@@ -69,42 +117,50 @@ def get_metadata_from_source(
     Raises:
         SourceDoesNotLink: If the `target_url` is not linked in the given html.
     """
+    metadata = get_metadata_for_targets(html, [target_url], source_url)[target_url]
 
-    soup = html_parser(html)
-    links = find_links_in_soup(soup)
-
-    for link in links:
-        absolute_url = urljoin(source_url, link["href"])
-        if absolute_url == target_url:
-            break
-    else:
+    if metadata is None:
         raise SourceDoesNotLink()
 
-    post_type = parse_post_type(link)
-
-    hcard = find_related_hcard(link) or parse_hcard(soup, recursive=False)
-    if hcard:
-        hcard = _coerce_hcard_absolute_urls(hcard, source_url)
+    return metadata
 
-    return WebmentionMetadata(
-        post_type=post_type.serialized_name() if post_type else None,
-        hcard=hcard,
-    )
 
+def get_metadata_for_targets(
+    html: str,
+    target_urls: Iterable[str],
+    source_url: str,
+) -> Dict[str, Optional[WebmentionMetadata]]:
+    """Retrieve contextual data about mentions of each of target_urls from
+    the html source.
+
+    The html is only parsed once, regardless of the number of targets, and
+    not at all if a quick check of the text shows that none of the targets
+    can be linked. Links are matched after normalizing both URLs, so
+    differences in the case of the host or an explicit default port do not
+    prevent a match.
+
+    Returns:
+        A dictionary of target_url -> WebmentionMetadata, or None if the
+        target_url is not linked in the given html.
+    """
+    target_urls = list(target_urls)
+    result = {target_url: None for target_url in target_urls}
 
-def _coerce_hcard_absolute_urls(hcard: HCard, source_url: str) -> HCard:
-    """Convert any relative URLs to absolute URLs."""
-    updated_fields = []
+    possible_targets = find_possible_targets(html, target_urls, source_url)
+    if not possible_targets:
+        return result
 
-    if hcard.avatar:
-        hcard.avatar = urljoin(source_url, hcard.avatar)
-        updated_fields.append("avatar")
+    source = ParsedSource(html, source_url)
 
-    if hcard.homepage:
-        hcard.homepage = urljoin(source_url, hcard.homepage)
-        updated_fields.append("homepage")
+    for target_url in possible_targets:
+        link = source.find_link(target_url)
+        if link is None:
+            continue
 
-    if updated_fields:
-        hcard.save(update_fields=updated_fields)
+        post_type = source.get_post_type(link)
+        result[target_url] = WebmentionMetadata(
+            post_type=post_type.serialized_name() if post_type else None,
+            hcard=source.get_hcard(link),
+        )
 
-    return hcard
+    return result
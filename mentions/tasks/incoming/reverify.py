@@ -1,6 +1,6 @@
 import logging
 
-from mentions.exceptions import RejectedByConfig, SourceNotAccessible
+from mentions.exceptions import RateLimited, RejectedByConfig, SourceNotAccessible
 from mentions.models import Webmention
 from mentions.tasks.incoming.process import verify_webmention
 from mentions.tasks.incoming.status import Status
@@ -32,6 +32,10 @@ def reverify_mention(mention: Webmention) -> bool:
             mention, status.warning(f"Source URL not accessible: '{source_url}'")
         )
 
+    except RateLimited as e:
+        log.warning(f"Unable to reverify mention from '{source_url}': {e}")
+        return False
+
     updated_fields = []
 
     if mention.target_object != target_object:
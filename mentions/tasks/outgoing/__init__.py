@@ -1,3 +1,3 @@
 from .local import is_valid_target
 from .process import process_outgoing_webmentions
-from .remote import try_send_webmention
+from .remote import atry_send_webmention, try_send_webmention
@@ -0,0 +1,69 @@
+"""Remember the results of webmention endpoint discovery for outgoing targets.
+
+Both positive results (the endpoint URL) and negative results (the target
+does not support webmentions) are cached, with separate lifetimes configured
+by `options.endpoint_cache_ttl` and `options.endpoint_cache_ttl_not_found`.
+
+Eviction of old entries is handled by the configured cache backend."""
+import logging
+from typing import Optional, Tuple
+
+from mentions import options
+from mentions.util import get_base_url
+from mentions.util.cache import cache_key, get_cache
+
+__all__ = [
+    "cache_endpoint",
+    "forget_endpoint",
+    "get_cached_endpoint",
+]
+
+log = logging.getLogger(__name__)
+
+"""Cached value which represents a target that has no webmention endpoint."""
+_NO_ENDPOINT = ""
+
+
+def get_cached_endpoint(target_url: str) -> Tuple[bool, Optional[str]]:
+    """Look up the result of any previous endpoint discovery for target_url.
+
+    Returns:
+        (is_cached, endpoint)
+        is_cached: True if a result is available. If False, discovery is required.
+        endpoint: The absolute URL of the endpoint, or None if the target
+                  does not support webmentions.
+    """
+    value = get_cache().get(_key(target_url))
+    if value is None:
+        return False, None
+
+    log.debug(f"Using cached webmention endpoint for '{target_url}': '{value}'")
+    return True, value or None
+
+
+def cache_endpoint(target_url: str, endpoint: Optional[str]) -> None:
+    """Remember the result of endpoint discovery for target_url.
+
+    Args:
+        target_url: The URL that was checked for webmention support.
+        endpoint: The absolute URL of the discovered endpoint, or None if
+                  no endpoint was found.
+    """
+    if endpoint:
+        timeout = options.endpoint_cache_ttl()
+    else:
+        timeout = options.endpoint_cache_ttl_not_found()
+
+    if not timeout or timeout <= 0:
+        return
+
+    get_cache().set(_key(target_url), endpoint or _NO_ENDPOINT, timeout=timeout)
+
+
+def forget_endpoint(target_url: str) -> None:
+    """Remove any cached result for target_url, e.g. if the endpoint has stopped working."""
+    get_cache().delete(_key(target_url))
+
+
+def _key(target_url: str) -> str:
+    return cache_key("endpoint", get_base_url(target_url), target_url)
@@ -1,5 +1,6 @@
+import hashlib
 import logging
-from typing import Iterable, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set
 from urllib.parse import urljoin
 
 from bs4 import Tag
@@ -9,6 +10,7 @@ from mentions import config, options
 from mentions.util import find_links_in_html, get_url_validator
 
 __all__ = [
+    "get_target_link_fingerprints",
     "get_target_links_in_html",
     "is_valid_target",
 ]
@@ -43,36 +45,52 @@ def get_target_links_in_html(
     Returns:
         Absolute URLs for any valid links from `html`.
     """
-    domains_allow = domains_allow or options.outgoing_domains_allow()
-    domains_deny = domains_deny or options.outgoing_domains_deny()
-    valid_links = set()
-
-    links = find_links_in_html(html)
-
-    for link in links:
-        href = link["href"]
-        if href.startswith("#"):
-            # Ignore local #anchors
-            continue
+    return set(
+        _find_target_links(
+            html,
+            source_path,
+            allow_self_mentions=allow_self_mentions,
+            domains_allow=domains_allow,
+            domains_deny=domains_deny,
+            domains_allow_tag=domains_allow_tag,
+            domains_deny_tag=domains_deny_tag,
+        ).keys()
+    )
 
-        href = _resolve_relative_url(source_path, href)
 
-        if _has_class_or_attribute(link, domains_deny_tag):
-            continue
+def get_target_link_fingerprints(
+    html: str,
+    source_path: str,
+    allow_self_mentions: bool = options.allow_self_mentions(),
+    domains_allow: Optional[Iterable[str]] = None,
+    domains_deny: Optional[Iterable[str]] = None,
+    domains_allow_tag: Optional[str] = options.outgoing_domains_tag_allow(),
+    domains_deny_tag: Optional[str] = options.outgoing_domains_tag_deny(),
+) -> Dict[str, str]:
+    """Get the same links as `get_target_links_in_html`, each with a fingerprint
+    of the content that surrounds it.
 
-        if _has_class_or_attribute(link, domains_allow_tag):
-            valid_links.add(href)
-            continue
+    The fingerprint of a link only changes if the text of its parent element
+    changes. This lets us detect which links are affected when the content
+    is edited.
 
-        if is_valid_target(
-            href,
-            allow_self_mentions,
-            domains_allow=domains_allow,
-            domains_deny=domains_deny,
-        ):
-            valid_links.add(href)
+    Returns:
+        A dictionary of absolute URL -> fingerprint.
+    """
+    links = _find_target_links(
+        html,
+        source_path,
+        allow_self_mentions=allow_self_mentions,
+        domains_allow=domains_allow,
+        domains_deny=domains_deny,
+        domains_allow_tag=domains_allow_tag,
+        domains_deny_tag=domains_deny_tag,
+    )
 
-    return valid_links
+    return {
+        href: _fingerprint(href, [_get_link_context(tag) for tag in tags])
+        for href, tags in links.items()
+    }
 
 
 def is_valid_target(
@@ -107,6 +125,55 @@ def is_valid_target(
     )
 
 
+def _find_target_links(
+    html: str,
+    source_path: str,
+    allow_self_mentions: bool,
+    domains_allow: Optional[Iterable[str]],
+    domains_deny: Optional[Iterable[str]],
+    domains_allow_tag: Optional[str],
+    domains_deny_tag: Optional[str],
+) -> Dict[str, List[Tag]]:
+    """Return a dictionary of absolute URL -> any tags which link to that URL."""
+    domains_allow = domains_allow or options.outgoing_domains_allow()
+    domains_deny = domains_deny or options.outgoing_domains_deny()
+    valid_links = {}
+
+    links = find_links_in_html(html)
+
+    for link in links:
+        href = link["href"]
+        if href.startswith("#"):
+            # Ignore local #anchors
+            continue
+
+        href = _resolve_relative_url(source_path, href)
+
+        if _has_class_or_attribute(link, domains_deny_tag):
+            continue
+
+        if _has_class_or_attribute(link, domains_allow_tag) or is_valid_target(
+            href,
+            allow_self_mentions,
+            domains_allow=domains_allow,
+            domains_deny=domains_deny,
+        ):
+            valid_links.setdefault(href, []).append(link)
+
+    return valid_links
+
+
+def _get_link_context(tag: Tag) -> str:
+    """Return the normalised text of the element that contains the link."""
+    parent = tag.parent or tag
+    return " ".join(parent.get_text().split())
+
+
+def _fingerprint(href: str, contexts: List[str]) -> str:
+    content = "\n".join([href, *sorted(contexts)])
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
 def _resolve_relative_url(source_path: str, relative_path: str) -> str:
     return urljoin(urljoin(config.base_url(), source_path), relative_path)
 
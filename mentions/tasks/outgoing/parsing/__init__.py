@@ -2,5 +2,6 @@ from .webmention_endpoint import (
     get_endpoint_in_html,
     get_endpoint_in_html_body,
     get_endpoint_in_html_head,
+    get_endpoint_in_html_stream,
     get_endpoint_in_http_headers,
 )
@@ -1,6 +1,7 @@
 import logging
 import re
-from typing import Optional
+from html.parser import HTMLParser
+from typing import Iterable, Optional
 
 from bs4 import BeautifulSoup
 from requests.structures import CaseInsensitiveDict
@@ -11,6 +12,7 @@ __all__ = [
     "get_endpoint_in_html",
     "get_endpoint_in_html_body",
     "get_endpoint_in_html_head",
+    "get_endpoint_in_html_stream",
     "get_endpoint_in_http_headers",
 ]
 
@@ -18,6 +20,22 @@ HTTP_LINK_PATTERN = re.compile(
     r"<(?P<url>[^>]+?)>;([^,]*;)*\s*rel=(?P<quote>['\"]?)webmention(?P=quote)"
 )
 
+"""Elements that may appear in the document <head>.
+
+Any other element implicitly starts the document <body>."""
+HTML_HEAD_ELEMENTS = {
+    "base",
+    "head",
+    "html",
+    "link",
+    "meta",
+    "noscript",
+    "script",
+    "style",
+    "template",
+    "title",
+}
+
 log = logging.getLogger(__name__)
 
 
@@ -61,3 +79,53 @@ def get_endpoint_in_html_body(soup: BeautifulSoup) -> Optional[str]:
             endpoint = link["href"]
             log.debug(f"Webmention endpoint found in document body: {endpoint}")
             return endpoint
+
+
+def get_endpoint_in_html_stream(chunks: Iterable[str]) -> Optional[str]:
+    """Search for a webmention endpoint in HTML which is received in chunks.
+
+    The HTML is parsed incrementally and parsing stops at the first
+    `<link rel="webmention">` in the document <head> or
+    `<a rel="webmention">` in the document <body>, so the rest of the
+    document does not need to be retrieved."""
+    parser = _EndpointParser()
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.endpoint is not None:
+            log.debug(f"Webmention endpoint found in HTML stream: {parser.endpoint}")
+            return parser.endpoint
+
+    parser.close()
+    return parser.endpoint
+
+
+class _EndpointParser(HTMLParser):
+    """Find the first webmention endpoint in a document without building a tree."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.endpoint: Optional[str] = None
+        self.in_body = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.endpoint is not None:
+            return
+
+        if tag == "body" or tag not in HTML_HEAD_ELEMENTS:
+            self.in_body = True
+
+        if tag == "link" and self.in_body:
+            return
+
+        if tag not in ("a", "link"):
+            return
+
+        # Keep the first value of any duplicate attributes.
+        attrs = dict(reversed(attrs))
+        href = attrs.get("href")
+        rel = attrs.get("rel") or ""
+        if href is not None and "webmention" in rel.split():
+            self.endpoint = href
+
+    handle_startendtag = handle_starttag
@@ -1,7 +1,13 @@
-from mentions.models.outgoing_status import get_or_create_outgoing_webmention
+from typing import Iterable, List, Union
+
+from mentions import options
+from mentions.models import OutgoingWebmentionStatus
+from mentions.models.outgoing_status import get_or_create_outgoing_webmentions
 from mentions.tasks.celeryproxy import get_logger, shared_task
-from mentions.tasks.outgoing.local import get_target_links_in_html
-from mentions.tasks.outgoing.remote import try_send_webmention
+from mentions.tasks.outgoing.local import get_target_link_fingerprints
+from mentions.tasks.outgoing.remote import DEFERRED, try_send_webmention
+from mentions.util import get_domain
+from mentions.util.concurrency import map_grouped
 
 log = get_logger(__name__)
 
@@ -9,6 +15,9 @@ __all__ = [
     "process_outgoing_webmentions",
 ]
 
+"""Fingerprint for a link that has been removed from the source content."""
+FINGERPRINT_LINK_REMOVED = "removed"
+
 
 @shared_task
 def process_outgoing_webmentions(source_urlpath: str, text: str) -> int:
@@ -28,6 +37,15 @@ def process_outgoing_webmentions(source_urlpath: str, text: str) -> int:
     source_urlpath should be the value returned by model.get_absolute_url() -
     it will be appended to settings.DOMAIN_NAME
 
+    Links are only processed if they are new, or if the content around them
+    has changed since they were last processed. Links which have been removed
+    since we last successfully sent a webmention to them are also notified, as
+    recommended by the spec:
+    https://www.w3.org/TR/webmention/#sending-webmentions-for-updated-posts
+
+    Links may be processed in parallel: see `options.outgoing_concurrency`
+    and `options.outgoing_concurrency_per_host`.
+
     Returns:
          Number of outgoing webmentions that were submitted successfully.
     """
@@ -35,34 +53,64 @@ def process_outgoing_webmentions(source_urlpath: str, text: str) -> int:
     log.info(f"Checking for mentionable links in text from '{source_urlpath}'...")
     mentions_attempted = 0
     mentions_sent = 0
-    links_in_text = get_target_links_in_html(text, source_path=source_urlpath)
+    mentions_deferred = 0
+    links_in_text = get_target_link_fingerprints(text, source_path=source_urlpath)
+    removed_links = _get_removed_links(source_urlpath, links_in_text.keys())
 
-    if not links_in_text:
+    if not links_in_text and not removed_links:
         log.debug("No links found in text.")
         return 0
 
-    for link_url in links_in_text:
-        outgoing_webmention = get_or_create_outgoing_webmention(
-            source_urlpath,
-            link_url,
-            reset_retries=True,
-        )
-        result = try_send_webmention(
-            source_urlpath,
-            link_url,
-            outgoing_status=outgoing_webmention,
-        )
-
+    fingerprints = {
+        **links_in_text,
+        **{link_url: FINGERPRINT_LINK_REMOVED for link_url in removed_links},
+    }
+    statuses = get_or_create_outgoing_webmentions(source_urlpath, fingerprints.keys())
+
+    changed_links = []
+    for link_url in sorted(fingerprints):
+        if statuses[link_url].content_fingerprint == fingerprints[link_url]:
+            log.debug(f"Link is unchanged since last processed: '{link_url}'")
+        else:
+            changed_links.append(link_url)
+
+    changed_statuses = [statuses[link_url] for link_url in changed_links]
+    OutgoingWebmentionStatus.bulk_reset_retries(changed_statuses)
+
+    results = map_grouped(
+        lambda link_url: _process_link(source_urlpath, link_url, statuses[link_url]),
+        changed_links,
+        key=get_domain,
+        max_workers=options.outgoing_concurrency(),
+        max_workers_per_group=options.outgoing_concurrency_per_host(),
+    )
+
+    for status in changed_statuses:
+        status.content_fingerprint = fingerprints[status.target_url]
+    OutgoingWebmentionStatus.objects.bulk_update(
+        changed_statuses, ["content_fingerprint"]
+    )
+
+    for result in results:
         if result is None:
-            # No webmention endpoint found
+            # No webmention endpoint found, or link is unchanged.
+            continue
+
+        if result == DEFERRED:
+            # Rate limited: will be retried later.
+            mentions_deferred += 1
             continue
 
         mentions_attempted += 1
         if result is True:
             mentions_sent += 1
 
+    if mentions_deferred:
+        log.info(f"Deferred {mentions_deferred} webmentions because of rate limits.")
+
     if mentions_attempted == 0:
-        log.debug(f"No mentionable links found in text.")
+        if not mentions_deferred:
+            log.debug(f"No mentionable links found in text.")
 
     elif mentions_sent == mentions_attempted:
         log.info(f"Successfully sent {mentions_sent} webmentions.")
@@ -73,3 +121,30 @@ def process_outgoing_webmentions(source_urlpath: str, text: str) -> int:
         )
 
     return mentions_sent
+
+
+def _get_removed_links(source_urlpath: str, current_links: Iterable[str]) -> List[str]:
+    """Return any targets which were successfully mentioned by this source but are no longer linked."""
+    return list(
+        OutgoingWebmentionStatus.objects.filter(
+            source_url=source_urlpath,
+            successful=True,
+        )
+        .exclude(target_url__in=list(current_links))
+        .exclude(content_fingerprint=FINGERPRINT_LINK_REMOVED)
+        .order_by("target_url")
+        .values_list("target_url", flat=True)
+        .distinct()
+    )
+
+
+def _process_link(
+    source_urlpath: str,
+    link_url: str,
+    outgoing_status: OutgoingWebmentionStatus,
+) -> Union[bool, str, None]:
+    return try_send_webmention(
+        source_urlpath,
+        link_url,
+        outgoing_status=outgoing_status,
+    )
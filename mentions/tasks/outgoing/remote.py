@@ -1,24 +1,45 @@
 import logging
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 from urllib.parse import urljoin
 
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ValidationError
 from requests import RequestException, Response
 
-from mentions import config
-from mentions.exceptions import TargetNotAccessible
+from mentions import config, options
+from mentions.exceptions import RateLimited, TargetNotAccessible
 from mentions.models import OutgoingWebmentionStatus
 from mentions.models.outgoing_status import get_or_create_outgoing_webmention
+from mentions.tasks.outgoing.endpoint_cache import (
+    cache_endpoint,
+    forget_endpoint,
+    get_cached_endpoint,
+)
 from mentions.tasks.outgoing.parsing import (
     get_endpoint_in_html,
+    get_endpoint_in_html_stream,
     get_endpoint_in_http_headers,
 )
-from mentions.util import get_url_validator, http_get, http_post
+from mentions.util import get_url_validator, http_get, http_head, http_post
+from mentions.util.async_requests import (
+    AsyncResponse,
+    ahttp_get,
+    ahttp_head,
+    ahttp_post,
+)
+from mentions.util.ratelimit import throttle
+from mentions.util.requests import get_deadline, iter_text, may_be_html
 
 __all__ = [
+    "DEFERRED",
+    "atry_send_webmention",
     "try_send_webmention",
 ]
 
+"""Returned by `try_send_webmention` if the request was deferred because of
+`options.rate_limit`. The status will be retried later."""
+DEFERRED = "deferred"
+
 
 STATUS_MESSAGE_TARGET_UNREACHABLE = "The target URL could not be retrieved: {error}."
 STATUS_MESSAGE_TARGET_ERROR_CODE = (
@@ -27,7 +48,14 @@ STATUS_MESSAGE_TARGET_ERROR_CODE = (
 STATUS_MESSAGE_TARGET_ENDPOINT_ERROR = (
     "The target endpoint URL returned an HTTP error code"
 )
+STATUS_MESSAGE_TARGET_ENDPOINT_UNREACHABLE = (
+    "The target endpoint URL could not be reached: {error}."
+)
 STATUS_MESSAGE_OK = "The target server accepted the webmention."
+STATUS_MESSAGE_NO_ENDPOINT = "The target URL does not support webmentions."
+STATUS_MESSAGE_RATE_LIMITED = (
+    "Deferred: too many requests have been sent to the target server recently."
+)
 
 log = logging.getLogger(__name__)
 
@@ -36,47 +64,209 @@ def try_send_webmention(
     source_urlpath: str,
     target_url: str,
     outgoing_status: Optional[OutgoingWebmentionStatus],
-) -> Optional[bool]:
+) -> Union[bool, str, None]:
     """Try to send a webmention for target_url.
 
     Returns:
         True if a webmention was submitted successfully.
         False if a webmention endpoint was resolved but submission failed.
         None if a webmention endpoint could not be resolved (i.e. the website does not appear to support webmentions).
+        DEFERRED if too many requests have been made to the target or endpoint host recently.
     """
     if outgoing_status is None:
         outgoing_status = get_or_create_outgoing_webmention(source_urlpath, target_url)
 
-    try:
-        response = _get_target(outgoing_status, target_url)
-    except TargetNotAccessible:
-        return
+    is_cached, endpoint = get_cached_endpoint(target_url)
+
+    if not is_cached:
+        if not _throttle(outgoing_status, target_url):
+            return DEFERRED
+
+        try:
+            endpoint = _discover_endpoint(outgoing_status, target_url)
+        except TargetNotAccessible:
+            return
 
-    endpoint = _get_absolute_endpoint_from_response(response)
     if endpoint:
         log.debug(f"Found webmention endpoint: '{endpoint}'")
-        return _try_send_webmention(
+        if not _throttle(outgoing_status, endpoint):
+            return DEFERRED
+
+        result = _try_send_webmention(
             outgoing_status,
             source_urlpath=source_urlpath,
             endpoint=endpoint,
             target_url=target_url,
         )
 
+        if not result:
+            # Endpoint may have changed: check again next time.
+            forget_endpoint(target_url)
+
+        return result
+
+    else:
+        _save_no_endpoint(outgoing_status, target_url)
+
+
+async def atry_send_webmention(
+    source_urlpath: str,
+    target_url: str,
+    outgoing_status: Optional[OutgoingWebmentionStatus],
+) -> Union[bool, str, None]:
+    """Async version of `try_send_webmention`."""
+    if outgoing_status is None:
+        outgoing_status = await sync_to_async(get_or_create_outgoing_webmention)(
+            source_urlpath, target_url
+        )
+
+    is_cached, endpoint = await sync_to_async(get_cached_endpoint)(target_url)
+
+    if not is_cached:
+        if not await sync_to_async(_throttle)(outgoing_status, target_url):
+            return DEFERRED
+
+        try:
+            endpoint = await _adiscover_endpoint(outgoing_status, target_url)
+        except TargetNotAccessible:
+            return
+
+    if endpoint:
+        log.debug(f"Found webmention endpoint: '{endpoint}'")
+        if not await sync_to_async(_throttle)(outgoing_status, endpoint):
+            return DEFERRED
+
+        result = await _atry_send_webmention(
+            outgoing_status,
+            source_urlpath=source_urlpath,
+            endpoint=endpoint,
+            target_url=target_url,
+        )
+
+        if not result:
+            # Endpoint may have changed: check again next time.
+            await sync_to_async(forget_endpoint)(target_url)
+
+        return result
+
     else:
-        log.info(f"No webmention endpoint found for url '{target_url}'")
+        await sync_to_async(_save_no_endpoint)(outgoing_status, target_url)
+
+
+def _discover_endpoint(
+    status: OutgoingWebmentionStatus,
+    target_url: str,
+) -> Optional[str]:
+    """Retrieve the target and return the absolute URL of its webmention endpoint, if any.
+
+    The result is cached for use by later calls to `try_send_webmention`.
+
+    Raises:
+        TargetNotAccessible: If the target cannot be retrieved.
+    """
+    endpoint = None
+    if options.endpoint_discovery_use_head():
+        endpoint = _get_endpoint_from_head(status, target_url)
+
+    if endpoint is None:
+        deadline = get_deadline()
+        response = _get_target(status, target_url, stream=True)
+        try:
+            endpoint = _get_absolute_endpoint_from_response(response, deadline)
+        except RequestException as e:
+            _save_for_retry(status, STATUS_MESSAGE_TARGET_UNREACHABLE.format(error=e))
+            raise TargetNotAccessible()
+        finally:
+            response.close()
+
+    cache_endpoint(target_url, endpoint)
+
+    return endpoint
+
+
+def _get_endpoint_from_head(
+    status: OutgoingWebmentionStatus,
+    target_url: str,
+) -> Optional[str]:
+    """Look for an endpoint in the HTTP headers of the target without retrieving its content.
+
+    Returns:
+        The absolute URL of the endpoint, or None if it was not found. This
+        does not mean the target does not support webmentions - the endpoint
+        may still be found in the HTML content.
+
+    Raises:
+        TargetNotAccessible: If the target cannot be reached.
+    """
+    log.debug(f"Checking url='{target_url}' headers for webmention support...")
+    try:
+        response = http_head(target_url)
+    except RequestException as e:
+        _save_for_retry(status, STATUS_MESSAGE_TARGET_UNREACHABLE.format(error=e))
+        raise TargetNotAccessible()
+
+    return _get_absolute_endpoint_from_head_response(response)
+
+
+async def _adiscover_endpoint(
+    status: OutgoingWebmentionStatus,
+    target_url: str,
+) -> Optional[str]:
+    """Async version of `_discover_endpoint`."""
+    endpoint = None
+    if options.endpoint_discovery_use_head():
+        log.debug(f"Checking url='{target_url}' headers for webmention support...")
+        try:
+            response = await ahttp_head(target_url)
+        except RequestException as e:
+            await sync_to_async(_save_for_retry)(
+                status, STATUS_MESSAGE_TARGET_UNREACHABLE.format(error=e)
+            )
+            raise TargetNotAccessible()
+
+        endpoint = _get_absolute_endpoint_from_head_response(response)
+
+    if endpoint is None:
+        response = await _aget_target(status, target_url)
+        endpoint = get_endpoint_in_http_headers(response.headers)
+        if not endpoint and response.text:
+            endpoint = get_endpoint_in_html_stream([response.text])
+
+        if endpoint:
+            endpoint = _relative_to_absolute_url(response, endpoint)
+
+    await sync_to_async(cache_endpoint)(target_url, endpoint)
+
+    return endpoint
+
+
+def _get_absolute_endpoint_from_head_response(
+    response: Union[Response, AsyncResponse],
+) -> Optional[str]:
+    if response.status_code >= 300:
+        # Some servers do not handle HEAD requests: try again with GET.
+        return None
+
+    endpoint = get_endpoint_in_http_headers(response.headers)
+    if endpoint:
+        return _relative_to_absolute_url(response, endpoint)
 
 
 def _get_target(
     status: OutgoingWebmentionStatus,
     target_url: str,
+    stream: bool = False,
 ) -> Optional[Response]:
-    """Confirm the target is accessible."""
+    """Confirm the target is accessible.
+
+    If stream is True, the caller is responsible for closing the response."""
     log.debug(f"Checking url='{target_url}' for webmention support...")
     try:
-        response = http_get(target_url)
+        response = http_get(target_url, stream=stream)
         if response.status_code < 300:
             return response
 
+        response.close()
         error_message = STATUS_MESSAGE_TARGET_ERROR_CODE.format(
             status_code=response.status_code
         )
@@ -91,14 +281,90 @@ def _get_target(
     raise TargetNotAccessible()
 
 
+async def _aget_target(
+    status: OutgoingWebmentionStatus,
+    target_url: str,
+) -> AsyncResponse:
+    """Async version of `_get_target`.
+
+    Content is read up to a maximum of `options.endpoint_discovery_max_bytes()`."""
+    log.debug(f"Checking url='{target_url}' for webmention support...")
+    try:
+        response = await ahttp_get(
+            target_url,
+            max_bytes=options.endpoint_discovery_max_bytes(),
+            deadline=get_deadline(),
+            html_only=True,
+        )
+        if response.status_code < 300:
+            return response
+
+        error_message = STATUS_MESSAGE_TARGET_ERROR_CODE.format(
+            status_code=response.status_code
+        )
+
+    except RequestException as e:
+        error_message = STATUS_MESSAGE_TARGET_UNREACHABLE.format(error=e)
+
+    await sync_to_async(_save_for_retry)(status, error_message)
+    raise TargetNotAccessible()
+
+
 def _try_send_webmention(
     status: OutgoingWebmentionStatus,
     source_urlpath: str,
     endpoint: str,
     target_url: str,
 ):
-    success, status_code = _send_webmention(source_urlpath, endpoint, target_url)
+    try:
+        success, status_code = _send_webmention(source_urlpath, endpoint, target_url)
+    except RequestException as e:
+        _save_for_retry(
+            status, STATUS_MESSAGE_TARGET_ENDPOINT_UNREACHABLE.format(error=e)
+        )
+        return False
+
+    return _save_send_result(
+        status,
+        endpoint=endpoint,
+        target_url=target_url,
+        success=success,
+        status_code=status_code,
+    )
+
+
+async def _atry_send_webmention(
+    status: OutgoingWebmentionStatus,
+    source_urlpath: str,
+    endpoint: str,
+    target_url: str,
+):
+    try:
+        success, status_code = await _asend_webmention(
+            source_urlpath, endpoint, target_url
+        )
+    except RequestException as e:
+        await sync_to_async(_save_for_retry)(
+            status, STATUS_MESSAGE_TARGET_ENDPOINT_UNREACHABLE.format(error=e)
+        )
+        return False
+
+    return await sync_to_async(_save_send_result)(
+        status,
+        endpoint=endpoint,
+        target_url=target_url,
+        success=success,
+        status_code=status_code,
+    )
+
 
+def _save_send_result(
+    status: OutgoingWebmentionStatus,
+    endpoint: str,
+    target_url: str,
+    success: bool,
+    status_code: int,
+) -> bool:
     status.target_webmention_endpoint = endpoint
     status.response_code = status_code
 
@@ -122,13 +388,28 @@ def _send_webmention(
     endpoint: str,
     target: str,
 ) -> Tuple[bool, int]:
-    payload = {
+    response = http_post(endpoint, data=_build_payload(source_urlpath, target))
+    return _check_send_response(endpoint, response.status_code)
+
+
+async def _asend_webmention(
+    source_urlpath: str,
+    endpoint: str,
+    target: str,
+) -> Tuple[bool, int]:
+    """Async version of `_send_webmention`."""
+    response = await ahttp_post(endpoint, data=_build_payload(source_urlpath, target))
+    return _check_send_response(endpoint, response.status_code)
+
+
+def _build_payload(source_urlpath: str, target: str) -> dict:
+    return {
         "target": target,
         "source": config.build_url(source_urlpath),
     }
-    response = http_post(endpoint, data=payload)
-    status_code = response.status_code
 
+
+def _check_send_response(endpoint: str, status_code: int) -> Tuple[bool, int]:
     if status_code >= 300:
         log.warning(
             f'Sending webmention to "{endpoint}" '
@@ -144,16 +425,37 @@ def _send_webmention(
         return True, status_code
 
 
-def _get_absolute_endpoint_from_response(response: Response) -> Optional[str]:
-    endpoint = get_endpoint_in_http_headers(response.headers) or get_endpoint_in_html(
-        response.text
-    )
+def _get_absolute_endpoint_from_response(
+    response: Response,
+    deadline: Optional[float] = None,
+) -> Optional[str]:
+    """Search the headers and content of the response for a webmention endpoint.
+
+    The content is only read if it may be HTML, and only until an endpoint is
+    found, up to a maximum of `options.endpoint_discovery_max_bytes()`.
+
+    Raises:
+        RequestException: If the content is not received before deadline.
+    """
+    endpoint = get_endpoint_in_http_headers(response.headers)
+
+    if not endpoint and may_be_html(response):
+        endpoint = get_endpoint_in_html_stream(
+            iter_text(
+                response,
+                max_bytes=options.endpoint_discovery_max_bytes(),
+                deadline=deadline,
+            )
+        )
 
     if endpoint:
         return _relative_to_absolute_url(response, endpoint)
 
 
-def _relative_to_absolute_url(response: Response, url: str) -> Optional[str]:
+def _relative_to_absolute_url(
+    response: Union[Response, AsyncResponse],
+    url: str,
+) -> Optional[str]:
     """
     If given url is relative, try to construct an absolute url using response domain.
     """
@@ -166,6 +468,32 @@ def _relative_to_absolute_url(response: Response, url: str) -> Optional[str]:
         return absolute_url
 
 
+def _throttle(status: OutgoingWebmentionStatus, url: str) -> bool:
+    """Check whether a request to url is allowed by `options.rate_limit`.
+
+    If not, the status is deferred until the host is expected to accept
+    requests again. This does not count as a failed attempt.
+
+    Returns:
+        True if the request may be made now, otherwise False.
+    """
+    try:
+        throttle(url)
+        return True
+    except RateLimited as e:
+        log.info(str(e))
+        status.status_message = STATUS_MESSAGE_RATE_LIMITED
+        status.defer_processing(e.retry_after, save=True)
+        return False
+
+
+def _save_no_endpoint(status: OutgoingWebmentionStatus, target_url: str) -> None:
+    """The target does not support webmentions so there is nothing to retry."""
+    log.info(f"No webmention endpoint found for url '{target_url}'")
+    status.status_message = STATUS_MESSAGE_NO_ENDPOINT
+    status.mark_processing_successful(save=True)
+
+
 def _save_for_retry(status: OutgoingWebmentionStatus, message: str) -> None:
     """In case of network errors, mark the status for reprocessing later."""
     log.warning(message)
@@ -1,5 +1,15 @@
 import logging
-from itertools import chain
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db.models import Q, QuerySet
+from django.utils import timezone
 
 from mentions import options
 from mentions.models import (
@@ -7,35 +17,126 @@ from mentions.models import (
     PendingIncomingWebmention,
     PendingOutgoingContent,
 )
+from mentions.models.managers.retryable import RetryableQuerySet
+from mentions.models.mixins import RetryableMixin
 from mentions.tasks.celeryproxy import shared_task
-from mentions.tasks.incoming import process_incoming_webmention
+from mentions.tasks.incoming import (
+    aprocess_incoming_webmentions_from_source,
+    process_incoming_webmention,
+    process_incoming_webmentions_from_source,
+)
 from mentions.tasks.outgoing import (
+    atry_send_webmention,
     is_valid_target,
     process_outgoing_webmentions,
     try_send_webmention,
 )
+from mentions.util.async_requests import aclose_client
+from mentions.util.cache import cache_key, get_cache
+from mentions.util.concurrency import amap_grouped, map_grouped
+from mentions.util.url import get_domain
 
 log = logging.getLogger(__name__)
 
+"""Default number of objects claimed and processed together during a sweep."""
+DEFAULT_BATCH_SIZE = 100
+
+STAGE_INCOMING = "incoming"
+STAGE_OUTGOING = "outgoing"
+STAGE_OUTGOING_CONTENT = "outgoing content"
+
 
 __all__ = [
+    "PendingStats",
     "handle_pending_webmentions",
     "handle_incoming_webmention",
     "handle_outgoing_webmentions",
 ]
 
 
+class PendingStats:
+    """Counts and timings collected by `handle_pending_webmentions`.
+
+    Stages may be processed by several threads so updates are locked."""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.timings: Dict[str, float] = defaultdict(float)
+        self.is_incomplete = False
+        self._lock = threading.Lock()
+
+    @property
+    def total_count(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.timings.values())
+
+    @property
+    def items_per_second(self) -> float:
+        if not self.total_seconds:
+            return 0.0
+        return self.total_count / self.total_seconds
+
+    def add(self, stage: str, count: int) -> None:
+        with self._lock:
+            self.counts[stage] += count
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.timings[stage] += time.monotonic() - start
+
+
 @shared_task
-def handle_pending_webmentions(incoming: bool = True, outgoing: bool = True):
+def handle_pending_webmentions(
+    incoming: bool = True,
+    outgoing: bool = True,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_seconds: Optional[float] = None,
+    stats: Optional[PendingStats] = None,
+    stop: Optional[threading.Event] = None,
+):
     """Process any webmentions that are pending processing, including retries.
 
-    Typically run via `manage.py pending_mentions`"""
+    Typically run via `manage.py mentions_pending`
+
+    Args:
+        incoming: Whether to process pending incoming webmentions.
+        outgoing: Whether to process pending outgoing webmentions.
+        workers: The number of batches that may be processed in parallel.
+        batch_size: The number of objects claimed and processed together.
+        max_seconds: If set, no new batches are started after this many
+                     seconds. Any remaining objects are left for next time.
+        stats: If set, counts and timings are added to this object.
+        stop: If set, no new batches are started once this event is set.
+    """
+    stats = stats or PendingStats()
+    deadline = None if max_seconds is None else time.monotonic() + max_seconds
+    sweep = _Sweep(
+        workers=max(1, workers),
+        batch_size=max(1, batch_size),
+        deadline=deadline,
+        stats=stats,
+        stop=stop,
+    )
 
     if incoming:
-        _handle_pending_incoming()
+        with stats.measure(STAGE_INCOMING):
+            sweep.handle_pending_incoming()
 
     if outgoing:
-        _handle_pending_outgoing()
+        with stats.measure(STAGE_OUTGOING):
+            sweep.handle_pending_outgoing()
+
+        with stats.measure(STAGE_OUTGOING_CONTENT):
+            sweep.handle_pending_outgoing_content()
 
     if options.use_celery():
         _maybe_reschedule_handle_pending_webmentions()
@@ -76,21 +177,24 @@ def _task_handle_incoming(source: str, target: str, sent_by: str):
 def handle_outgoing_webmentions(absolute_url: str, text: str) -> None:
     """Delegate processing to `celery` if available, otherwise store for later.
 
-    If settings.WEBMENTIONS_USE_CELERY is False, create a PendingOutgoingContent.
-    This needs to be processed at some point by running `manage.py pending_mentions`.
+    If settings.WEBMENTIONS_USE_CELERY is False, create or update a
+    PendingOutgoingContent. This needs to be processed at some point by
+    running `manage.py pending_mentions`.
+
+    If settings.WEBMENTIONS_OUTGOING_COALESCE_WINDOW is set, repeated calls
+    for the same absolute_url within that window are combined into a single
+    celery task which processes the latest text.
     """
     use_celery = options.use_celery()
 
-    if use_celery:
-        _task_handle_outgoing.delay(absolute_url, text)
+    if not use_celery:
+        _store_pending_outgoing(absolute_url, text)
+
+    elif options.outgoing_coalesce_window() > 0:
+        _coalesce_outgoing(absolute_url, text)
 
     else:
-        PendingOutgoingContent.objects.get_or_create(
-            absolute_url=absolute_url,
-            defaults={
-                "text": text,
-            },
-        )
+        _task_handle_outgoing.delay(absolute_url, text)
 
 
 @shared_task
@@ -99,57 +203,373 @@ def _task_handle_outgoing(absolute_url: str, text: str) -> None:
     _maybe_reschedule_handle_pending_webmentions()
 
 
-def _handle_pending_incoming():
-    for incoming_wm in PendingIncomingWebmention.objects.filter(is_awaiting_retry=True):
-        if incoming_wm.can_retry():
-            process_incoming_webmention(
-                incoming_wm.source_url,
-                incoming_wm.target_url,
-                incoming_wm.sent_by,
-            )
+@shared_task
+def _task_handle_coalesced_outgoing(absolute_url: str) -> None:
+    """Process the latest version of content stored by `_coalesce_outgoing`."""
+    # Release the lock first so that any further saves schedule a new task.
+    get_cache().delete(_coalesce_key(absolute_url))
+
+    pending_out = PendingOutgoingContent.objects.filter(
+        absolute_url=absolute_url
+    ).first()
+    if pending_out is None:
+        # Already handled, e.g. by `handle_pending_webmentions`.
+        return
+
+    process_outgoing_webmentions(pending_out.absolute_url, pending_out.text)
+
+    # Content may have been saved again while we were processing - if so it
+    # is kept for the next task.
+    PendingOutgoingContent.objects.filter(
+        pk=pending_out.pk,
+        text=pending_out.text,
+    ).delete()
+    _maybe_reschedule_handle_pending_webmentions()
+
+
+def _store_pending_outgoing(absolute_url: str, text: str) -> PendingOutgoingContent:
+    """Create or update the PendingOutgoingContent for absolute_url so that
+    it always holds the latest version of the content."""
+    pending_out, _ = PendingOutgoingContent.objects.update_or_create(
+        absolute_url=absolute_url,
+        defaults={
+            "text": text,
+        },
+    )
+    return pending_out
 
-            incoming_wm.refresh_from_db()
-            if incoming_wm.is_retry_successful:
-                # Webmention created successfully so this is no longer needed.
-                incoming_wm.delete()
 
+def _coalesce_outgoing(absolute_url: str, text: str) -> None:
+    """Store the latest text and schedule a task to process it, unless one is
+    already scheduled for this absolute_url."""
+    _store_pending_outgoing(absolute_url, text)
+
+    window = options.outgoing_coalesce_window()
+    if not get_cache().add(_coalesce_key(absolute_url), True, timeout=window * 2):
+        log.debug(f"Outgoing webmentions already scheduled for '{absolute_url}'")
+        return
+
+    _task_handle_coalesced_outgoing.apply_async(
+        args=[absolute_url],
+        countdown=window,
+    )
+
+
+def _coalesce_key(absolute_url: str) -> str:
+    return cache_key("coalesce-outgoing", absolute_url)
 
-def _handle_pending_outgoing():
-    allow_self_mentions = options.allow_self_mentions()
-    domains_allow = options.outgoing_domains_allow()
-    domains_deny = options.outgoing_domains_deny()
 
-    for outgoing_retry in OutgoingWebmentionStatus.objects.filter(
-        is_awaiting_retry=True,
+class _Sweep:
+    """Process objects which are due for retry in batches, using up to
+    `workers` threads.
+
+    If `options.async_concurrency` is set, the objects in each batch are
+    processed concurrently using asyncio."""
+
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        deadline: Optional[float],
+        stats: PendingStats,
+        stop: Optional[threading.Event] = None,
     ):
-        if not is_valid_target(
-            outgoing_retry.target_url,
-            allow_self_mention=allow_self_mentions,
-            domains_allow=domains_allow,
-            domains_deny=domains_deny,
-        ):
-            log.warning(f"Target URL is invalid: {outgoing_retry.target_url}")
-            outgoing_retry.delete()
-            continue
-
-        if outgoing_retry.can_retry():
-            try_send_webmention(
-                source_urlpath=outgoing_retry.source_url,
-                target_url=outgoing_retry.target_url,
-                outgoing_status=outgoing_retry,
+        self.workers = workers
+        self.batch_size = batch_size
+        self.deadline = deadline
+        self.stats = stats
+        self.stop = stop
+
+    def should_stop(self) -> bool:
+        if self.stop is not None and self.stop.is_set():
+            return True
+
+        if self.deadline is None or time.monotonic() < self.deadline:
+            return False
+
+        if not self.stats.is_incomplete:
+            log.info("Time limit reached: remaining webmentions left for next time.")
+            self.stats.is_incomplete = True
+        return True
+
+    def map_batches(self, func, batches: Iterable[List]) -> None:
+        """Apply func to each of batches, up to `workers` at a time.
+
+        Batches are only retrieved from the iterable as they are needed."""
+        batches = iter(batches)
+        while not self.should_stop():
+            group = list(islice(batches, self.workers))
+            if not group:
+                return
+
+            map_grouped(
+                func,
+                group,
+                key=id,
+                max_workers=self.workers,
+                max_workers_per_group=1,
             )
 
-    for pending_out in PendingOutgoingContent.objects.all():
-        process_outgoing_webmentions(pending_out.absolute_url, pending_out.text)
-        # OutgoingWebmentionStatus created instead to track status of individual links.
-        pending_out.delete()
+    def handle_pending_incoming(self):
+        """Process any PendingIncomingWebmention that is due for a retry.
+
+        Pending webmentions from the same source in the same batch are
+        processed together so that the source only needs to be retrieved once."""
+        self.map_batches(
+            self._handle_pending_incoming_batch,
+            _iter_due_ids(PendingIncomingWebmention.objects.all(), self.batch_size),
+        )
+
+    def _handle_pending_incoming_batch(self, ids: Sequence) -> None:
+        if self.should_stop():
+            return
+
+        batch = PendingIncomingWebmention.objects.claim_for_retry(ids)
+        if not batch:
+            return
+
+        by_source: Dict[str, List[PendingIncomingWebmention]] = defaultdict(list)
+        for incoming_wm in batch:
+            by_source[incoming_wm.source_url].append(incoming_wm)
+
+        try:
+            if options.async_concurrency() > 0:
+                async_to_sync(_aprocess_pending_incoming)(by_source)
+            else:
+                for source_url, pending in by_source.items():
+                    _process_pending_incoming_from_source(source_url, pending)
+        finally:
+            _release_leases(batch)
+
+        self.stats.add(STAGE_INCOMING, len(batch))
+
+    def handle_pending_outgoing(self):
+        """Retry any OutgoingWebmentionStatus that is due."""
+        self.map_batches(
+            self._handle_pending_outgoing_batch,
+            _iter_due_ids(OutgoingWebmentionStatus.objects.all(), self.batch_size),
+        )
+
+    def _handle_pending_outgoing_batch(self, ids: Sequence) -> None:
+        if self.should_stop():
+            return
+
+        batch = OutgoingWebmentionStatus.objects.claim_for_retry(ids)
+        if not batch:
+            return
+
+        allow_self_mentions = options.allow_self_mentions()
+        domains_allow = options.outgoing_domains_allow()
+        domains_deny = options.outgoing_domains_deny()
+
+        try:
+            valid = []
+            for outgoing_retry in batch:
+                if not is_valid_target(
+                    outgoing_retry.target_url,
+                    allow_self_mention=allow_self_mentions,
+                    domains_allow=domains_allow,
+                    domains_deny=domains_deny,
+                ):
+                    log.warning(f"Target URL is invalid: {outgoing_retry.target_url}")
+                    outgoing_retry.delete()
+                    continue
+
+                valid.append(outgoing_retry)
+
+            if options.async_concurrency() > 0:
+                async_to_sync(_asend_pending_outgoing)(valid)
+            else:
+                for outgoing_retry in valid:
+                    try_send_webmention(
+                        source_urlpath=outgoing_retry.source_url,
+                        target_url=outgoing_retry.target_url,
+                        outgoing_status=outgoing_retry,
+                    )
+        finally:
+            _release_leases(batch)
+
+        self.stats.add(STAGE_OUTGOING, len(batch))
+
+    def handle_pending_outgoing_content(self):
+        """Process any PendingOutgoingContent."""
+        self.map_batches(
+            self._handle_pending_outgoing_content_batch,
+            _iter_ids(PendingOutgoingContent.objects.all(), self.batch_size),
+        )
+
+    def _handle_pending_outgoing_content_batch(self, ids: Sequence) -> None:
+        for pending_out in PendingOutgoingContent.objects.filter(pk__in=ids):
+            if self.should_stop():
+                return
+
+            process_outgoing_webmentions(pending_out.absolute_url, pending_out.text)
+            # OutgoingWebmentionStatus created instead to track status of individual links.
+            # If the content was updated while we were processing it, keep it for next time.
+            PendingOutgoingContent.objects.filter(
+                pk=pending_out.pk,
+                text=pending_out.text,
+            ).delete()
+            self.stats.add(STAGE_OUTGOING_CONTENT, 1)
+
+
+def _process_pending_incoming_from_source(
+    source_url: str,
+    pending: List[PendingIncomingWebmention],
+) -> None:
+    if len(pending) == 1:
+        process_incoming_webmention(
+            source_url,
+            pending[0].target_url,
+            pending[0].sent_by,
+        )
+    else:
+        process_incoming_webmentions_from_source(
+            source_url,
+            [(incoming_wm.target_url, incoming_wm.sent_by) for incoming_wm in pending],
+        )
+
+    _delete_successful(pending)
+
+
+def _delete_successful(pending: List[PendingIncomingWebmention]) -> None:
+    # Webmention created successfully so these are no longer needed.
+    PendingIncomingWebmention.objects.filter(
+        pk__in=[incoming_wm.pk for incoming_wm in pending],
+        is_retry_successful=True,
+    ).delete()
+
+
+async def _aprocess_pending_incoming(
+    by_source: Dict[str, List[PendingIncomingWebmention]],
+) -> None:
+    """Process pending webmentions from each source concurrently."""
+
+    async def process(source_url: str) -> None:
+        pending = by_source[source_url]
+        await aprocess_incoming_webmentions_from_source(
+            source_url,
+            [(incoming_wm.target_url, incoming_wm.sent_by) for incoming_wm in pending],
+        )
+        await sync_to_async(_delete_successful)(pending)
+
+    try:
+        await amap_grouped(
+            process,
+            by_source,
+            key=get_domain,
+            max_concurrency=options.async_concurrency(),
+            max_concurrency_per_group=1,
+        )
+    finally:
+        await aclose_client()
+
+
+async def _asend_pending_outgoing(batch: List[OutgoingWebmentionStatus]) -> None:
+    """Retry sending each of batch concurrently."""
+
+    async def send(outgoing_retry: OutgoingWebmentionStatus) -> None:
+        await atry_send_webmention(
+            source_urlpath=outgoing_retry.source_url,
+            target_url=outgoing_retry.target_url,
+            outgoing_status=outgoing_retry,
+        )
+
+    try:
+        await amap_grouped(
+            send,
+            batch,
+            key=lambda outgoing_retry: get_domain(outgoing_retry.target_url),
+            max_concurrency=options.async_concurrency(),
+            max_concurrency_per_group=options.outgoing_concurrency_per_host(),
+        )
+    finally:
+        await aclose_client()
+
+
+def _iter_due_ids(
+    queryset: RetryableQuerySet,
+    batch_size: int,
+) -> Iterator[List]:
+    """Yield the ids of objects from queryset which are due for retry, in the
+    order they became due before this was called, up to batch_size at a time.
+
+    Each page of ids is selected after the previous one has been handled,
+    starting after the last object in that page. Each batch is then claimed
+    with `RetryableQuerySet.claim_for_retry` just before it is processed.
+    Objects that have been claimed by another worker in the meantime are
+    skipped, so several workers may safely run at once."""
+    # Objects which are rescheduled while the sweep is running are left
+    # for next time.
+    now = timezone.now()
+    last = None
+
+    while True:
+        page = queryset.filter_due_for_retry(now=now).filter_unleased()
+        if last is not None:
+            page = page.filter(_after_due(*last))
+
+        rows = list(page.values_list("next_retry_at", "pk")[:batch_size])
+        if not rows:
+            return
+
+        yield [pk for _, pk in rows]
+        last = rows[-1]
+
+
+def _after_due(next_retry_at: Optional[datetime], pk) -> Q:
+    """Filter for objects which come after (next_retry_at, pk) in the order
+    used by `RetryableQuerySet.filter_due_for_retry`."""
+    if next_retry_at is None:
+        return Q(next_retry_at__isnull=True, pk__gt=pk) | Q(next_retry_at__isnull=False)
+
+    return Q(next_retry_at__gt=next_retry_at) | Q(
+        next_retry_at=next_retry_at, pk__gt=pk
+    )
+
+
+def _iter_ids(queryset: QuerySet, batch_size: int) -> Iterator[List]:
+    """Yield the ids of objects in queryset, up to batch_size at a time."""
+    last_pk = None
+
+    while True:
+        page = queryset.order_by("pk")
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+
+        ids = list(page.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return
+
+        yield ids
+        last_pk = ids[-1]
+
+
+def _release_leases(batch: List[RetryableMixin]) -> None:
+    """Release any leases on batch that were not released while processing,
+    e.g. if no webmention endpoint was found.
+
+    Only our own leases are released: if an object has been processed and
+    then claimed again by another worker, its lease is left alone."""
+    leases = {obj.lease_expires_at for obj in batch} - {None}
+    if not leases:
+        return
+
+    type(batch[0]).objects.filter(
+        pk__in=[obj.pk for obj in batch],
+        lease_expires_at__in=leases,
+    ).release_leases()
 
 
 def _maybe_reschedule_handle_pending_webmentions():
     """Check if there are objects awaiting retry; if so, schedule `handle_pending_webmentions` to run again later."""
+    if get_cache().get(_reschedule_key()) is not None:
+        # Already scheduled, no need to check the database.
+        return
+
     should_reschedule = (
-        PendingIncomingWebmention.objects.filter(is_awaiting_retry=True).exists()
-        or OutgoingWebmentionStatus.objects.filter(is_awaiting_retry=True).exists()
+        PendingIncomingWebmention.objects.filter_awaiting_retry().exists()
+        or OutgoingWebmentionStatus.objects.filter_awaiting_retry().exists()
     )
 
     if not should_reschedule:
@@ -161,29 +581,35 @@ def _maybe_reschedule_handle_pending_webmentions():
 def _reschedule_handle_pending_webmentions():
     """Using celery, schedule `handle_pending_webmentions` to run again later.
 
-    Only one such task should be scheduled at a time - halt if it is already scheduled."""
-    import celery
+    Only one such task should be scheduled at a time. This is enforced with a
+    lease in the cache which is held until the scheduled task starts, or until
+    it expires in case the task is lost."""
+    interval = options.retry_interval()
+    lease_key = _reschedule_key()
 
-    # Check if this task is already scheduled.
-    task = handle_pending_webmentions
-    task_name = ".".join([task.__module__, task.__name__])
+    if not get_cache().add(lease_key, True, timeout=interval * 2):
+        log.debug("Task 'handle_pending_webmentions' already scheduled.")
+        return
 
-    app = celery.current_app
-    scheduled = app.control.inspect().scheduled()
-    scheduled_task_etas = [
-        item["eta"]
-        for item in chain.from_iterable(scheduled.values())
-        if item["request"]["name"] == task_name
-    ]
+    try:
+        _task_handle_scheduled_pending_webmentions.apply_async(
+            countdown=interval,
+            expires=interval * 2,
+        )
+    except Exception:
+        get_cache().delete(lease_key)
+        raise
 
-    if scheduled_task_etas:
-        log.info(f"Task '{task_name}' already scheduled: ETA {scheduled_task_etas}")
-        return
+    log.info(f"Scheduled task 'handle_pending_webmentions' in {interval} seconds.")
 
-    # Schedule fresh task
-    interval = options.retry_interval()
-    task.apply_async(
-        countdown=interval,
-        expires=interval * 2,
-    )
-    log.info(f"Scheduled task '{task_name}' in {interval} seconds.")
+
+@shared_task
+def _task_handle_scheduled_pending_webmentions():
+    """Run `handle_pending_webmentions` as scheduled by `_reschedule_handle_pending_webmentions`."""
+    # Release the lease first so that the task can be scheduled again afterwards.
+    get_cache().delete(_reschedule_key())
+    handle_pending_webmentions()
+
+
+def _reschedule_key() -> str:
+    return cache_key("reschedule-pending")
@@ -0,0 +1,94 @@
+"""A long-running alternative to running `manage.py mentions_pending` with cron.
+
+For deployments that do not use `celery`. Pending webmentions are processed
+soon after they arrive, without paying Django startup costs on every run."""
+import logging
+import threading
+from typing import Callable, Optional
+
+from django.db import close_old_connections
+
+from mentions import options
+from mentions.tasks.scheduling import (
+    DEFAULT_BATCH_SIZE,
+    PendingStats,
+    handle_pending_webmentions,
+)
+
+__all__ = [
+    "PollInterval",
+    "run_worker",
+]
+
+log = logging.getLogger(__name__)
+
+
+class PollInterval:
+    """How long to wait before checking for pending webmentions again.
+
+    The interval is reset to `minimum` whenever work is found, and doubles
+    after each idle check up to `maximum`."""
+
+    def __init__(self, minimum: float, maximum: float):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.current = minimum
+
+    def update(self, found_work: bool) -> float:
+        if found_work:
+            self.current = self.minimum
+        else:
+            self.current = min(self.maximum, self.current * 2)
+
+        return self.current
+
+
+def run_worker(
+    stop: threading.Event,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    poll_interval: float = 1,
+    max_poll_interval: float = 30,
+    on_stats: Optional[Callable[[PendingStats], None]] = None,
+) -> None:
+    """Process pending webmentions until stop is set.
+
+    When stop is set, any batches that have already started are allowed to
+    finish but no new batches are started.
+
+    Args:
+        stop: Event which ends the loop when set, e.g. from a signal handler.
+        workers: The number of batches that may be processed in parallel.
+        batch_size: The number of objects claimed and processed together.
+        poll_interval: The minimum delay (in seconds) between checks.
+        max_poll_interval: The maximum delay (in seconds) between checks
+                           while there is nothing to do.
+        on_stats: Called with the results of each check that found work.
+    """
+    if options.use_celery():
+        log.warning(
+            "settings.WEBMENTIONS_USE_CELERY is True: new webmentions will be "
+            "handled by celery, not by this worker."
+        )
+
+    interval = PollInterval(poll_interval, max_poll_interval)
+
+    while not stop.is_set():
+        # Drop any connections that have been closed by the database while we waited.
+        close_old_connections()
+
+        stats = PendingStats()
+        handle_pending_webmentions(
+            workers=workers,
+            batch_size=batch_size,
+            stats=stats,
+            stop=stop,
+        )
+
+        found_work = stats.total_count > 0
+        if found_work and on_stats:
+            on_stats(stats)
+
+        stop.wait(interval.update(found_work))
+
+    close_old_connections()
@@ -1,3 +1,10 @@
 from .html import find_links_in_html, html_parser
-from .requests import http_get, http_post
-from .url import get_base_url, get_domain, get_url_validator, get_urlpath
+from .requests import http_get, http_head, http_post
+from .url import (
+    domain_in_set,
+    get_base_url,
+    get_domain,
+    get_url_validator,
+    get_urlpath,
+    normalize_url,
+)
@@ -0,0 +1,318 @@
+"""Async counterparts to the functions in `mentions.util.requests`.
+
+If `httpx` is installed, requests are made with an `httpx.AsyncClient` which
+is shared by all requests on the same event loop. Otherwise, the blocking
+functions from `mentions.util.requests` are run in the default executor so
+that they do not block the event loop.
+
+Network errors are raised as `requests.RequestException` regardless of the
+backend, so callers can handle them in the same way as the sync functions."""
+
+import asyncio
+import codecs
+import time
+import weakref
+from typing import Mapping, Optional
+
+from requests import RequestException, Response
+from requests.structures import CaseInsensitiveDict
+
+from mentions import options
+from mentions.util import requests as sync_requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+__all__ = [
+    "AsyncResponse",
+    "aclose_client",
+    "ahttp_get",
+    "ahttp_head",
+    "ahttp_post",
+]
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class AsyncResponse:
+    """The result of an async request.
+
+    Unlike `requests.Response`, the content has already been read by the time
+    this is returned, so there is nothing to close."""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Mapping[str, str],
+        text: Optional[str],
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.text = text
+
+    def __str__(self):
+        return f"[{self.status_code}] {self.url}"
+
+
+async def ahttp_get(
+    url: str,
+    max_bytes: Optional[int] = None,
+    truncate: bool = True,
+    deadline: Optional[float] = None,
+    html_only: bool = False,
+) -> AsyncResponse:
+    """Async version of `http_get`.
+
+    The content is not read if the response has an error status code, or if
+    html_only is True and the response is not HTML. In these cases the
+    returned `AsyncResponse.text` is None.
+
+    Args:
+        url: The URL to retrieve.
+        max_bytes, truncate, deadline: See `mentions.util.requests.iter_text`.
+        html_only: If True, do not read the content if the response declares
+                   a content type which is not HTML.
+    """
+    # Only the request itself is monitored: errors while reading the content,
+    # e.g. if it is too large, do not mean the host is unhealthy.
+    if httpx is None:
+        async with _amonitor(url):
+            response = await _run_in_executor(sync_requests._get, url, True)
+
+        return await _run_in_executor(
+            _sync_read_response, response, max_bytes, truncate, deadline, html_only
+        )
+
+    client = _get_client()
+    async with _amonitor(url):
+        try:
+            response = await client.send(
+                client.build_request("GET", url),
+                stream=True,
+            )
+        except httpx.HTTPError as e:
+            raise RequestException(e) from e
+
+    try:
+        text = None
+        if _should_read_body(response, html_only):
+            text = await _read_text(response, max_bytes, truncate, deadline)
+
+        return AsyncResponse(
+            url=str(response.url),
+            status_code=response.status_code,
+            headers=response.headers,
+            text=text,
+        )
+    except httpx.HTTPError as e:
+        raise RequestException(e) from e
+    finally:
+        await response.aclose()
+
+
+async def ahttp_head(url: str) -> AsyncResponse:
+    """Async version of `http_head`."""
+    async with _amonitor(url):
+        if httpx is None:
+            return await _run_in_executor(_sync_head, url)
+
+        try:
+            response = await _get_client().head(url)
+        except httpx.HTTPError as e:
+            raise RequestException(e) from e
+
+    return AsyncResponse(
+        url=str(response.url),
+        status_code=response.status_code,
+        headers=response.headers,
+        text=None,
+    )
+
+
+async def ahttp_post(url: str, data: dict) -> AsyncResponse:
+    """Async version of `http_post`."""
+    async with _amonitor(url):
+        if httpx is None:
+            return await _run_in_executor(_sync_post, url, data)
+
+        try:
+            response = await _get_client().post(url, data=data)
+        except httpx.HTTPError as e:
+            raise RequestException(e) from e
+
+    return AsyncResponse(
+        url=str(response.url),
+        status_code=response.status_code,
+        headers=response.headers,
+        text=response.text,
+    )
+
+
+async def aclose_client() -> None:
+    """Close any open connections held by the client for the running event loop."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _get_client() -> "httpx.AsyncClient":
+    """Return the shared client for the running event loop.
+
+    An `httpx.AsyncClient` cannot be used across event loops."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+
+    if client is None:
+        client = httpx.AsyncClient(
+            headers=sync_requests.HTTP_HEADERS,
+            timeout=httpx.Timeout(
+                options.read_timeout(),
+                connect=options.connect_timeout(),
+            ),
+            limits=httpx.Limits(
+                max_keepalive_connections=options.http_pool_connections()
+                * options.http_pool_maxsize(),
+            ),
+            follow_redirects=True,
+        )
+        _clients[loop] = client
+
+    return client
+
+
+def _should_read_body(response, html_only: bool) -> bool:
+    if response.status_code >= 300:
+        return False
+
+    if html_only:
+        return sync_requests.may_be_html(response)
+
+    return True
+
+
+async def _read_text(
+    response: "httpx.Response",
+    max_bytes: Optional[int],
+    truncate: bool,
+    deadline: Optional[float],
+) -> str:
+    """Read the body of a streamed response.
+
+    The deadline is enforced while waiting for data, not only between chunks,
+    so a server which sends data very slowly cannot hold us past it."""
+    if deadline is None:
+        return await _read_chunks(response, max_bytes, truncate, deadline)
+
+    try:
+        return await asyncio.wait_for(
+            _read_chunks(response, max_bytes, truncate, deadline),
+            timeout=max(0.0, deadline - time.monotonic()),
+        )
+    except asyncio.TimeoutError:
+        raise sync_requests._deadline_exceeded(response)
+
+
+async def _read_chunks(
+    response: "httpx.Response",
+    max_bytes: Optional[int],
+    truncate: bool,
+    deadline: Optional[float],
+) -> str:
+    if max_bytes is not None and not truncate:
+        sync_requests._check_content_length(response, max_bytes)
+
+    decoder = codecs.getincrementaldecoder(sync_requests._get_codec(response))(
+        errors="replace"
+    )
+    received = 0
+    text = []
+
+    async for chunk in response.aiter_bytes(sync_requests.STREAM_CHUNK_SIZE):
+        if deadline is not None and time.monotonic() > deadline:
+            raise sync_requests._deadline_exceeded(response)
+
+        if max_bytes is not None and received + len(chunk) > max_bytes:
+            if not truncate:
+                raise sync_requests._too_large(response, max_bytes)
+            chunk = chunk[: max_bytes - received]
+        received += len(chunk)
+
+        text.append(decoder.decode(chunk))
+
+        if max_bytes is not None and received >= max_bytes:
+            break
+
+    text.append(decoder.decode(b"", final=True))
+    return "".join(text)
+
+
+def _amonitor(url: str):
+    # Imported here to avoid a circular import with mentions.models.
+    from mentions.host_health import amonitor
+
+    return amonitor(url)
+
+
+async def _run_in_executor(func, *args):
+    """Run a request in another thread.
+
+    Requests made this way are not recorded in `HostHealth` by the thread
+    itself: the caller should use `_amonitor` instead, so that the database
+    is only accessed via `sync_to_async`."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+def _sync_read_response(
+    response: Response,
+    max_bytes: Optional[int],
+    truncate: bool,
+    deadline: Optional[float],
+    html_only: bool,
+) -> AsyncResponse:
+    try:
+        text = None
+        if _should_read_body(response, html_only):
+            text = "".join(
+                sync_requests.iter_text(
+                    response,
+                    max_bytes=max_bytes,
+                    truncate=truncate,
+                    deadline=deadline,
+                )
+            )
+
+        return AsyncResponse(
+            url=response.url,
+            status_code=response.status_code,
+            headers=response.headers,
+            text=text,
+        )
+    finally:
+        response.close()
+
+
+def _sync_head(url: str) -> AsyncResponse:
+    response = sync_requests._head(url)
+    return AsyncResponse(
+        url=response.url,
+        status_code=response.status_code,
+        headers=response.headers,
+        text=None,
+    )
+
+
+def _sync_post(url: str, data: dict) -> AsyncResponse:
+    response = sync_requests._post(url, data=data)
+    return AsyncResponse(
+        url=response.url,
+        status_code=response.status_code,
+        headers=response.headers,
+        text=response.text,
+    )
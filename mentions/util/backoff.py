@@ -0,0 +1,59 @@
+import random
+from typing import Optional
+
+from django.core.exceptions import ImproperlyConfigured
+
+from mentions import options
+
+__all__ = [
+    "get_retry_delay",
+]
+
+RETRY_BACKOFF_FIXED = "fixed"
+RETRY_BACKOFF_EXPONENTIAL = "exponential"
+RETRY_BACKOFF_DECORRELATED_JITTER = "decorrelated_jitter"
+
+RETRY_BACKOFFS = {
+    RETRY_BACKOFF_FIXED,
+    RETRY_BACKOFF_EXPONENTIAL,
+    RETRY_BACKOFF_DECORRELATED_JITTER,
+}
+
+
+def get_retry_delay(
+    attempt: int,
+    previous_delay: Optional[float] = None,
+    strategy: Optional[str] = None,
+) -> float:
+    """Return the delay (in seconds) before the next retry.
+
+    The delay is never shorter than `options.retry_interval` and never longer
+    than `options.retry_interval_max`.
+
+    Args:
+        attempt: The number of attempts that have failed so far, starting at 1.
+        previous_delay: The delay that was used before the previous attempt,
+                        if any. Only used by `decorrelated_jitter`.
+        strategy: The name of the backoff strategy to use. If not set, the
+                  value of `options.retry_backoff` is used.
+    """
+    strategy = strategy or options.retry_backoff()
+    base = options.retry_interval()
+    maximum = max(base, options.retry_interval_max() or base)
+
+    if strategy == RETRY_BACKOFF_FIXED:
+        return base
+
+    if strategy == RETRY_BACKOFF_EXPONENTIAL:
+        # Avoid huge numbers once the maximum has been reached.
+        exponent = min(max(attempt - 1, 0), 32)
+        return min(maximum, base * 2**exponent)
+
+    if strategy == RETRY_BACKOFF_DECORRELATED_JITTER:
+        # See https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+        previous_delay = max(base, previous_delay or base)
+        return min(maximum, random.uniform(base, previous_delay * 3))
+
+    raise ImproperlyConfigured(
+        f"Unknown retry backoff '{strategy}': must be one of {sorted(RETRY_BACKOFFS)}"
+    )
@@ -0,0 +1,114 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from django.core.cache import BaseCache, caches
+
+from mentions import options
+
+__all__ = [
+    "LRUCache",
+    "cache_key",
+    "get_cache",
+    "get_generation",
+    "increment_generation",
+]
+
+KEY_PREFIX = "mentions"
+
+
+def get_cache() -> BaseCache:
+    """Return the cache backend configured by `options.cache_alias`."""
+    return caches[options.cache_alias()]
+
+
+def cache_key(namespace: str, *parts: str) -> str:
+    """Build a cache key that is safe to use with any cache backend.
+
+    Memcached does not allow keys longer than 250 characters or keys that
+    contain whitespace, so arbitrary values like URLs are hashed."""
+    digest = hashlib.sha1("\n".join(parts).encode()).hexdigest()
+    return f"{KEY_PREFIX}:{namespace}:{digest}"
+
+
+def get_generation(namespace: str) -> int:
+    """Return the current generation number for namespace.
+
+    Including the generation in cache keys allows every entry in a namespace
+    to be invalidated at once via `increment_generation`."""
+    cache = get_cache()
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+
+    if generation is None:
+        # Start from a value that cannot match any entries that were created
+        # before the generation was lost, e.g. by eviction.
+        cache.add(key, _new_generation(), timeout=None)
+        generation = cache.get(key)
+
+    return generation
+
+
+def increment_generation(namespace: str) -> None:
+    """Invalidate all cache keys that were built with the current generation of namespace."""
+    cache = get_cache()
+    key = _generation_key(namespace)
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_generation(), timeout=None)
+
+
+def _generation_key(namespace: str) -> str:
+    return cache_key("generation", namespace)
+
+
+def _new_generation() -> int:
+    return int(time.time() * 1000)
+
+
+class LRUCache:
+    """A thread-safe, in-process cache which discards the least recently
+    used entries when it is full."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, object]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key: Hashable, value, maxsize: int) -> None:
+        """Store value, evicting old entries so that no more than maxsize remain.
+
+        If maxsize is 0 or less, nothing is stored."""
+        with self._lock:
+            if maxsize <= 0:
+                self._data.clear()
+                return
+
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, predicate: Callable[[Hashable, object], bool]) -> None:
+        """Remove any entries for which predicate(key, value) is True."""
+        with self._lock:
+            for key in [k for k, v in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
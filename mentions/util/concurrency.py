@@ -0,0 +1,140 @@
+"""Helpers for running blocking work, typically network requests, in parallel."""
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Tuple, TypeVar
+
+from django.db import connections
+
+__all__ = [
+    "amap_grouped",
+    "map_grouped",
+]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+Lane = List[Tuple[int, T]]
+
+
+def map_grouped(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    key: Callable[[T], Hashable],
+    max_workers: int,
+    max_workers_per_group: int,
+) -> List[R]:
+    """Apply `func` to each of `items`, running up to `max_workers` calls in parallel.
+
+    Items are grouped by the value returned by `key` - no more than
+    `max_workers_per_group` items from the same group will be processed at the
+    same time. e.g. Group URLs by domain name to limit the number of concurrent
+    requests to any single server.
+
+    If `max_workers` is less than 2, each item is processed in turn on the
+    calling thread.
+
+    Returns:
+        The results of `func` for each item, in the same order as `items`.
+
+    Raises:
+        Any exception raised by `func` is re-raised after all other items have
+        finished processing.
+    """
+    items = list(items)
+
+    if max_workers < 2 or len(items) < 2:
+        return [func(item) for item in items]
+
+    lanes = _build_lanes(items, key, max(1, max_workers_per_group))
+    results: List[R] = [None] * len(items)
+
+    def process_lane(lane: Lane):
+        try:
+            for index, item in lane:
+                results[index] = func(item)
+        finally:
+            # Connections are per-thread so make sure we clean up after ourselves.
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(lanes))) as executor:
+        futures = [executor.submit(process_lane, lane) for lane in lanes]
+
+    for future in futures:
+        future.result()
+
+    return results
+
+
+async def amap_grouped(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    key: Callable[[T], Hashable],
+    max_concurrency: int,
+    max_concurrency_per_group: int,
+) -> List[R]:
+    """Async version of `map_grouped`: await `func` for each of `items`, with
+    up to `max_concurrency` calls in progress at the same time.
+
+    Returns:
+        The results of `func` for each item, in the same order as `items`.
+
+    Raises:
+        Any exception raised by `func` is re-raised after all other items have
+        finished processing.
+    """
+    limit = asyncio.Semaphore(max(1, max_concurrency))
+    group_limits: Dict[Hashable, asyncio.Semaphore] = {}
+
+    async def process(item: T) -> R:
+        group = key(item)
+        if group not in group_limits:
+            group_limits[group] = asyncio.Semaphore(max(1, max_concurrency_per_group))
+
+        # Wait for the group first so that a queued item does not hold up
+        # items from other groups.
+        async with group_limits[group]:
+            async with limit:
+                return await func(item)
+
+    results = await asyncio.gather(
+        *[process(item) for item in items],
+        return_exceptions=True,
+    )
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return results
+
+
+def _build_lanes(
+    items: List[T],
+    key: Callable[[T], Hashable],
+    max_lanes_per_group: int,
+) -> List[Lane]:
+    """Distribute items into lanes which will each be processed sequentially.
+
+    Each group is split across at most `max_lanes_per_group` lanes, so that
+    group can never have more than that many items processing simultaneously.
+    Lanes from different groups are interleaved so that work for all groups
+    can start as early as possible."""
+    groups: "OrderedDict[Hashable, List[Tuple[int, T]]]" = OrderedDict()
+    for index, item in enumerate(items):
+        groups.setdefault(key(item), []).append((index, item))
+
+    grouped_lanes = []
+    for group in groups.values():
+        lane_count = min(max_lanes_per_group, len(group))
+        grouped_lanes.append(
+            [group[offset::lane_count] for offset in range(lane_count)]
+        )
+
+    lanes = []
+    for depth in range(max_lanes_per_group):
+        for group_lanes in grouped_lanes:
+            if depth < len(group_lanes):
+                lanes.append(group_lanes[depth])
+
+    return lanes
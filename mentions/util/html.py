@@ -1,14 +1,31 @@
 import re
-from typing import List
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Union
 
-from bs4 import BeautifulSoup, ResultSet, Tag
+from bs4 import BeautifulSoup, FeatureNotFound, ResultSet, Tag
+from django.core.exceptions import ImproperlyConfigured
+
+from mentions import options
 
 __all__ = [
     "html_parser",
     "find_links_in_html",
     "find_links_in_soup",
+    "LinkTag",
 ]
 
+LINK_PARSER_HTML5LIB = "html5lib"
+LINK_PARSER_LXML = "lxml"
+LINK_PARSER_HTML_PARSER = "html.parser"
+LINK_PARSER_STREAM = "stream"
+
+LINK_PARSERS = {
+    LINK_PARSER_HTML5LIB,
+    LINK_PARSER_LXML,
+    LINK_PARSER_HTML_PARSER,
+    LINK_PARSER_STREAM,
+}
+
 
 def html_parser(content: str) -> Tag:
     soup = BeautifulSoup(content, features="html5lib")
@@ -16,8 +33,37 @@ def html_parser(content: str) -> Tag:
     return _clean_soup(soup)
 
 
-def find_links_in_html(html: str) -> List[Tag]:
-    soup = html_parser(html)
+def find_links_in_html(
+    html: str,
+    parser: Optional[str] = None,
+) -> List[Union[Tag, "LinkTag"]]:
+    """Return any `<a href>` tags in html.
+
+    Unlike `html_parser`, the parsed HTML is not cleaned for microformat
+    parsing as we are only interested in the links themselves.
+
+    Args:
+        html: The HTML text to search.
+        parser: The name of the parser to use. If not set, the value of
+                `options.link_parser` is used.
+    """
+    parser = parser or options.link_parser()
+
+    if parser == LINK_PARSER_STREAM:
+        return _find_links_in_html_stream(html)
+
+    if parser not in LINK_PARSERS:
+        raise ImproperlyConfigured(
+            f"Unknown link parser '{parser}': must be one of {sorted(LINK_PARSERS)}"
+        )
+
+    try:
+        soup = BeautifulSoup(html, features=parser)
+    except FeatureNotFound as e:
+        raise ImproperlyConfigured(
+            f"Link parser '{parser}' is not available - is it installed?"
+        ) from e
+
     return find_links_in_soup(soup)
 
 
@@ -40,3 +86,168 @@ def _clean_soup(soup: Tag) -> Tag:
             del tag["class"]
 
     return soup
+
+
+class _ElementText:
+    """The text content of an element, as returned by `Tag.get_text()`."""
+
+    def __init__(self, name: str, start: int):
+        self.name = name
+        self.start = start
+        self.end: Optional[int] = None
+        self.text = ""
+
+    def get_text(self) -> str:
+        return self.text
+
+
+class LinkTag:
+    """Lightweight replacement for a `bs4.Tag` representing an `<a href>` link.
+
+    Supports the subset of the `Tag` API that we use for outgoing links:
+    attribute access via `tag["href"]` and `tag.attrs`, and
+    `tag.parent.get_text()`."""
+
+    def __init__(self, attrs: Dict[str, Union[str, List[str]]], parent: _ElementText):
+        self.name = "a"
+        self.attrs = attrs
+        self.parent = parent
+
+    def __getitem__(self, key: str) -> Union[str, List[str]]:
+        return self.attrs[key]
+
+    def get(self, key: str, default=None):
+        return self.attrs.get(key, default)
+
+    def __repr__(self):
+        return f"<LinkTag {self.attrs}>"
+
+
+"""Elements which never have any content or end tag."""
+_VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+
+"""Elements whose start tag implicitly closes an open `<p>`."""
+_CLOSES_PARAGRAPH = {
+    "address",
+    "article",
+    "aside",
+    "blockquote",
+    "div",
+    "dl",
+    "fieldset",
+    "figure",
+    "footer",
+    "form",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "header",
+    "hr",
+    "main",
+    "nav",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "ul",
+}
+
+
+class _LinkParser(HTMLParser):
+    """Find `<a href>` links in a single pass without building a document tree.
+
+    Only enough of the document structure is tracked to provide the text of
+    the element that contains each link."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[LinkTag] = []
+        self._text: List[str] = []
+        self._text_length = 0
+        self._open: List[_ElementText] = [_ElementText("#document", 0)]
+        self._elements: List[_ElementText] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _CLOSES_PARAGRAPH:
+            self._close_implied("p")
+        elif tag == "li":
+            self._close_implied("li")
+
+        if tag == "a":
+            link_attrs = _build_attrs(attrs)
+            if "href" in link_attrs:
+                self.links.append(LinkTag(link_attrs, parent=self._open[-1]))
+
+        if tag not in _VOID_ELEMENTS:
+            self._open.append(_ElementText(tag, self._text_length))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        for index in range(len(self._open) - 1, 0, -1):
+            if self._open[index].name == tag:
+                while len(self._open) > index:
+                    self._close(self._open.pop())
+                return
+
+    def handle_data(self, data):
+        self._text.append(data)
+        self._text_length += len(data)
+
+    def close(self):
+        super().close()
+        while self._open:
+            self._close(self._open.pop())
+
+        text = "".join(self._text)
+        for element in self._elements:
+            element.text = text[element.start : element.end]
+
+    def _close_implied(self, tag: str):
+        if any(element.name == tag for element in self._open):
+            self.handle_endtag(tag)
+
+    def _close(self, element: _ElementText):
+        element.end = self._text_length
+        self._elements.append(element)
+
+
+def _build_attrs(attrs) -> Dict[str, Union[str, List[str]]]:
+    """Match the attribute values produced by BeautifulSoup: the first
+    occurrence of an attribute is used and `class` is a list of names."""
+    result = {}
+    for name, value in attrs:
+        if name in result:
+            continue
+        value = value or ""
+        result[name] = value.split() if name == "class" else value
+    return result
+
+
+def _find_links_in_html_stream(html: str) -> List[LinkTag]:
+    parser = _LinkParser()
+    parser.feed(html)
+    parser.close()
+    return parser.links
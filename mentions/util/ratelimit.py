@@ -0,0 +1,106 @@
+"""Limit the rate of requests made to any single host.
+
+Each host has a token bucket which holds up to `options.rate_limit_burst`
+tokens and is refilled at the rate given by `options.rate_limit` or
+`options.rate_limit_domains`. Buckets are stored in the Django cache so that
+the limit is shared by all workers which use the same cache.
+
+Reading and updating a bucket is guarded by a short-lived lock, created with
+`cache.add`, so that concurrent workers cannot both take the last token. If
+the lock is held by another worker the bucket is updated anyway, rather than
+waiting or refusing the request: the limit may then be exceeded slightly,
+but a busy host is never throttled while it still has tokens."""
+import logging
+import time
+
+from mentions import options
+from mentions.exceptions import RateLimited
+from mentions.util.cache import cache_key, get_cache
+from mentions.util.url import domain_in_set, get_domain
+
+__all__ = [
+    "acquire",
+    "get_rate_limit",
+    "throttle",
+]
+
+log = logging.getLogger(__name__)
+
+_NAMESPACE = "ratelimit"
+
+
+def get_rate_limit(domain: str) -> float:
+    """Return the maximum rate of requests per second for domain, or 0 if
+    requests are not limited."""
+    rate_limits = options.rate_limit_domains() or {}
+
+    if domain in rate_limits:
+        return rate_limits[domain] or 0
+
+    for pattern, rate in rate_limits.items():
+        if domain_in_set(domain, {pattern}):
+            return rate or 0
+
+    return options.rate_limit() or 0
+
+
+def acquire(url: str, now=time.time) -> float:
+    """Take a token from the bucket for the host of url.
+
+    Returns:
+        0 if a request to url may be made now. Otherwise, the number of
+        seconds until a token will be available. No token is taken in that case.
+    """
+    domain = get_domain(url)
+    if not domain:
+        return 0
+
+    rate = get_rate_limit(domain)
+    if rate <= 0:
+        return 0
+
+    burst = max(1, options.rate_limit_burst())
+    cache = get_cache()
+    key = cache_key(_NAMESPACE, domain)
+    lock_key = cache_key(_NAMESPACE, "lock", domain)
+
+    is_locked = cache.add(lock_key, True, timeout=1)
+    if not is_locked:
+        log.debug(f"Rate limit bucket for '{domain}' is busy.")
+
+    try:
+        if callable(now):
+            now = now()
+
+        tokens, updated_at = cache.get(key, (burst, now))
+        tokens = min(burst, tokens + max(0, now - updated_at) * rate)
+
+        if tokens < 1:
+            cache.set(key, (tokens, now), timeout=_bucket_timeout(burst, rate))
+            return (1 - tokens) / rate
+
+        cache.set(key, (tokens - 1, now), timeout=_bucket_timeout(burst, rate))
+        return 0
+    finally:
+        if is_locked:
+            cache.delete(lock_key)
+
+
+def throttle(url: str) -> None:
+    """Take a token from the bucket for the host of url, or raise if none is available.
+
+    Raises:
+        RateLimited: If too many requests have been made to the host recently.
+    """
+    retry_after = acquire(url)
+    if retry_after > 0:
+        raise RateLimited(
+            f"Too many requests to '{get_domain(url)}': try again in {retry_after:.1f}s",
+            retry_after=retry_after,
+        )
+
+
+def _bucket_timeout(burst: int, rate: float) -> int:
+    """An unused bucket refills completely after this time, so it can be
+    discarded."""
+    return int(burst / rate) + 1
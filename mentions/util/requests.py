@@ -1,32 +1,366 @@
+import codecs
+import os
+import socket
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
 import requests
-from requests import Response
+from requests import RequestException, Response
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
 
 from mentions import options
 
 __all__ = [
+    "close_session",
+    "get_deadline",
+    "get_session",
+    "HostUnavailable",
     "http_get",
+    "http_head",
     "http_post",
+    "is_html_content_type",
+    "iter_text",
+    "may_be_html",
+    "read_text",
+    "ResponseDeadlineExceeded",
+    "ResponseTooLarge",
 ]
 
-HTTP_TIMEOUT_SECONDS = options.timeout()
-
 HTTP_HEADERS = {
     "User-Agent": options.user_agent(),
 }
 
+STREAM_CHUNK_SIZE = 8 * 1024
+
+HTML_CONTENT_TYPES = (
+    "text/html",
+    "application/xhtml+xml",
+)
+
+
+class ResponseTooLarge(RequestException):
+    """The response body is larger than the allowed maximum size."""
+
+    pass
+
+
+class ResponseDeadlineExceeded(RequestException):
+    """The response was not received within the allowed time."""
+
+    pass
+
+
+class HostUnavailable(RequestException):
+    """The host has not been responding so the request was not attempted.
+
+    See `mentions.host_health`."""
+
+    pass
+
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the shared `requests.Session` for this process.
+
+    Connections are kept alive and reused for later requests to the same host,
+    up to the limits set by `options.http_pool_connections` and
+    `options.http_pool_maxsize`.
+
+    Connections cannot be shared with a forked child process (e.g. a `celery`
+    worker) so a new session is created if the process ID changes."""
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            _session = _create_session()
+            _session_pid = pid
+
+    return _session
+
+
+def close_session() -> None:
+    """Close any open connections held by the shared session."""
+    global _session, _session_pid
+
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+def http_get(url: str, stream: bool = False) -> Response:
+    """If stream is True, the response body is not downloaded until it is read
+    and the caller is responsible for calling `response.close()`.
+
+    Raises:
+        HostUnavailable: If the host has not been responding recently.
+    """
+    with _monitor(url):
+        return _get(url, stream=stream)
+
+
+def http_head(url: str) -> Response:
+    with _monitor(url):
+        return _head(url)
+
+
+def http_post(url: str, data: dict) -> Response:
+    with _monitor(url):
+        return _post(url, data=data)
+
+
+def get_deadline() -> Optional[float]:
+    """Return the `time.monotonic()` value by which a response should be
+    completely received, as configured by `options.response_deadline`."""
+    seconds = options.response_deadline()
+    if not seconds or seconds <= 0:
+        return None
+    return time.monotonic() + seconds
+
+
+def is_html_content_type(content_type: Optional[str]) -> bool:
+    content_type = (content_type or "").lower()
+    return any(html_type in content_type for html_type in HTML_CONTENT_TYPES)
+
+
+def may_be_html(response) -> bool:
+    """Return False if the response declares a content type which is not HTML."""
+    content_type = response.headers.get("content-type")
+    return content_type is None or is_html_content_type(content_type)
+
+
+def iter_text(
+    response: Response,
+    max_bytes: Optional[int] = None,
+    truncate: bool = True,
+    deadline: Optional[float] = None,
+) -> Iterator[str]:
+    """Decode the body of a streamed response as it is received.
+
+    Args:
+        response: A response created with `stream=True`.
+        max_bytes: If set, stop reading once this many bytes have been received.
+        truncate: If False, raise `ResponseTooLarge` if the body is larger
+                  than `max_bytes` instead of ignoring the remainder.
+        deadline: If set, raise `ResponseDeadlineExceeded` if the body has not
+                  been completely read by this `time.monotonic()` value.
+    """
+    if max_bytes is not None and not truncate:
+        _check_content_length(response, max_bytes)
+
+    decoder = codecs.getincrementaldecoder(_get_codec(response))(errors="replace")
+    received = 0
+
+    for chunk in _iter_content(response, deadline):
+        if max_bytes is not None and received + len(chunk) > max_bytes:
+            if not truncate:
+                raise _too_large(response, max_bytes)
+            chunk = chunk[: max_bytes - received]
+        received += len(chunk)
+
+        yield decoder.decode(chunk)
+
+        if max_bytes is not None and received >= max_bytes:
+            break
+
+    yield decoder.decode(b"", final=True)
+
 
-def http_get(url: str) -> Response:
-    return requests.get(
+def read_text(
+    response: Response,
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> str:
+    """Return the complete body of a streamed response.
+
+    Raises:
+        ResponseTooLarge: If the body is larger than `max_bytes`.
+        ResponseDeadlineExceeded: If the body is not completely read by `deadline`.
+    """
+    return "".join(
+        iter_text(response, max_bytes=max_bytes, truncate=False, deadline=deadline)
+    )
+
+
+def _check_content_length(response: Response, max_bytes: int) -> None:
+    """Reject the response without reading it if the server tells us it is too large."""
+    try:
+        content_length = int(response.headers.get("content-length"))
+    except (TypeError, ValueError):
+        return
+
+    if content_length > max_bytes:
+        raise _too_large(response, max_bytes)
+
+
+def _iter_content(response: Response, deadline: Optional[float]) -> Iterator[bytes]:
+    """Yield the body of a streamed response as it is received.
+
+    If deadline is set, the read timeout of the connection is reduced to the
+    time remaining before each read. Where urllib3 supports it, each read
+    returns whatever data is available so that a server which sends data
+    very slowly cannot hold us past the deadline."""
+    if deadline is None:
+        yield from response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        return
+
+    read1 = getattr(getattr(response, "raw", None), "read1", None)
+    if read1 is None:
+        # Each read blocks until a whole chunk has arrived.
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        while True:
+            _set_read_timeout(response, deadline)
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            except requests.ConnectionError as e:
+                _raise_if_deadline_exceeded(response, deadline, e)
+                raise
+
+            _raise_if_deadline_exceeded(response, deadline)
+            yield chunk
+
+    while True:
+        _set_read_timeout(response, deadline)
+        try:
+            chunk = read1(STREAM_CHUNK_SIZE, decode_content=True)
+        except ReadTimeoutError as e:
+            _raise_if_deadline_exceeded(response, deadline, e)
+            raise requests.ConnectionError(e)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+
+        if not chunk:
+            return
+        yield chunk
+
+
+def _set_read_timeout(response: Response, deadline: float) -> None:
+    """Limit the next read from the connection of response to the time
+    remaining before deadline."""
+    _raise_if_deadline_exceeded(response, deadline)
+
+    sock = _get_socket(response)
+    if sock is None:
+        return
+
+    timeout = deadline - time.monotonic()
+    read_timeout = options.read_timeout()
+    if read_timeout:
+        timeout = min(timeout, read_timeout)
+
+    # A timeout of 0 would make the socket non-blocking.
+    sock.settimeout(max(timeout, 0.001))
+
+
+def _raise_if_deadline_exceeded(
+    response: Response,
+    deadline: float,
+    cause: Optional[Exception] = None,
+) -> None:
+    if time.monotonic() >= deadline:
+        raise _deadline_exceeded(response) from cause
+
+
+def _get_socket(response: Response) -> Optional[socket.socket]:
+    """Return the socket that the body of response is being read from, if
+    it can be found."""
+    raw = getattr(response, "raw", None)
+
+    sock = getattr(getattr(raw, "_connection", None), "sock", None)
+    if sock is not None:
+        return sock
+
+    # If the connection will not be reused, http.client detaches the socket
+    # from the connection but the response still reads from it. Once the
+    # body is complete neither is available, so a connection which has been
+    # returned to the pool is never changed.
+    try:
+        return raw._fp.fp.raw._sock
+    except AttributeError:
+        return None
+
+
+def _deadline_exceeded(response: Response) -> ResponseDeadlineExceeded:
+    return ResponseDeadlineExceeded(
+        f"Response from '{response.url}' was not received in time."
+    )
+
+
+def _too_large(response: Response, max_bytes: int) -> ResponseTooLarge:
+    return ResponseTooLarge(
+        f"Response from '{response.url}' is larger than {max_bytes} bytes."
+    )
+
+
+def _get_codec(response: Response) -> str:
+    encoding = response.encoding or "utf-8"
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return "utf-8"
+
+
+def _create_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=options.http_pool_connections(),
+        pool_maxsize=options.http_pool_maxsize(),
+        pool_block=True,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get(url: str, stream: bool = False) -> Response:
+    """`http_get` without recording the result in `HostHealth`."""
+    return get_session().get(
         url,
         headers=HTTP_HEADERS,
-        timeout=HTTP_TIMEOUT_SECONDS,
+        timeout=_get_timeout(),
+        stream=stream,
     )
 
 
-def http_post(url: str, data: dict) -> Response:
-    return requests.post(
+def _head(url: str) -> Response:
+    return get_session().head(
+        url,
+        headers=HTTP_HEADERS,
+        timeout=_get_timeout(),
+        allow_redirects=True,
+    )
+
+
+def _post(url: str, data: dict) -> Response:
+    return get_session().post(
         url,
         data=data,
         headers=HTTP_HEADERS,
-        timeout=HTTP_TIMEOUT_SECONDS,
+        timeout=_get_timeout(),
     )
+
+
+def _monitor(url: str):
+    # Imported here to avoid a circular import with mentions.models.
+    from mentions.host_health import monitor
+
+    return monitor(url)
+
+
+def _get_timeout() -> Tuple[float, float]:
+    return options.connect_timeout(), options.read_timeout()
@@ -1,15 +1,25 @@
 from collections import namedtuple
-from urllib.parse import urlsplit
+from typing import Iterable
+from urllib.parse import urlsplit, urlunsplit
 
 from django.core.validators import URLValidator
 
+from mentions.util import compatibility
+
 __all__ = [
+    "domain_in_set",
     "get_base_url",
     "get_domain",
     "get_urlpath",
     "get_url_validator",
+    "normalize_url",
 ]
 
+_DEFAULT_PORTS = {
+    "http": 80,
+    "https": 443,
+}
+
 UrlParts = namedtuple("UrlParts", ["scheme", "domain", "path", "query", "fragment"])
 
 
@@ -32,7 +42,50 @@ def get_domain(url: str) -> str:
     return split_url(url).domain
 
 
+def domain_in_set(domain: str, domains: Iterable[str]) -> bool:
+    """Check if the given domain matches any of `domains`, allowing for wildcard `*.` prefix."""
+    for d in domains:
+        if d == domain:
+            return True
+
+        if d.startswith("*."):
+            root_domain = compatibility.removeprefix(d, "*.")
+            remaining_prefix = compatibility.removesuffix(domain, root_domain)
+            if remaining_prefix == "" or remaining_prefix.endswith("."):
+                return True
+
+    return False
+
+
 def get_urlpath(url: str) -> str:
     """Return the path component of the given URL."""
 
     return split_url(url).path
+
+
+def normalize_url(url: str) -> str:
+    """Return a canonical form of the given absolute URL for comparison.
+
+    The scheme and host are lowercased, default ports are removed, an empty
+    path becomes `/` and any fragment is discarded. The path and query are
+    case-sensitive so they are left unchanged.
+
+    URLs which cannot be parsed, or which include credentials, are returned
+    unchanged."""
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+
+    if parts.username or parts.password:
+        return url
+
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if ":" in netloc:  # IPv6
+        netloc = f"[{netloc}]"
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
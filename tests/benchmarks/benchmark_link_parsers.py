@@ -0,0 +1,66 @@
+"""Compare the speed of the available link parsers for outgoing webmentions.
+
+Usage:
+    python -m tests.benchmarks.benchmark_link_parsers [--links N] [--repeat N]
+"""
+import os
+import timeit
+from argparse import ArgumentParser
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.config.settings")
+django.setup()
+
+from mentions.tasks.outgoing.local import get_target_link_fingerprints  # noqa: E402
+from mentions.util.html import LINK_PARSERS  # noqa: E402
+
+
+def build_html(link_count: int) -> str:
+    paragraphs = "\n".join(
+        f"""<p class="h-auto text-lg">Paragraph {n} with some <em>formatted</em> text
+        and <a href="https://example-{n % 20}.org/article/{n}/" class="u-in-reply-to">a link</a>
+        plus an <a href="#anchor-{n}">anchor</a>.</p>"""
+        for n in range(link_count)
+    )
+    return f"""<!DOCTYPE html>
+    <html><head><title>Benchmark</title></head>
+    <body><article class="h-entry"><div class="e-content">{paragraphs}</div></article></body>
+    </html>"""
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--links", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from django.conf import settings
+
+    html = build_html(args.links)
+    expected = None
+
+    print(f"{len(html)} bytes, {args.links} links, {args.repeat} repeats")
+
+    for link_parser in sorted(LINK_PARSERS):
+        settings.WEBMENTIONS_LINK_PARSER = link_parser
+
+        def run():
+            return get_target_link_fingerprints(html, "/benchmark/")
+
+        try:
+            links = run()
+        except Exception as e:
+            print(f"{link_parser:>12}: unavailable ({e})")
+            continue
+
+        if expected is None:
+            expected = set(links)
+        matches = "ok" if set(links) == expected else "DIFFERENT RESULTS"
+
+        seconds = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        print(f"{link_parser:>12}: {seconds * 1000:8.2f}ms  [{matches}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,97 @@
+from io import StringIO
 from unittest.mock import patch
 
 from django.core.management import call_command
 
+from mentions.models import PendingIncomingWebmention
+from mentions.tasks.scheduling import handle_pending_webmentions
+from tests.tests.util import testfunc
 from tests.tests.util.testcase import WebmentionTestCase
 
 
+def _patch_command_task():
+    """Make sure the command uses the real task.
+
+    The command module may have been imported while the task was patched by
+    another test, in which case it keeps a reference to that mock."""
+    return patch(
+        "mentions.management.commands.mentions_pending.handle_pending_webmentions",
+        handle_pending_webmentions,
+    )
+
+
 class MentionsPendingTests(WebmentionTestCase):
     def test_mentions_pending_calls_task(self):
         with patch("mentions.tasks.scheduling.handle_pending_webmentions") as task:
             call_command("mentions_pending")
             self.assertTrue(task.called)
 
+    def test_mentions_pending_options(self):
+        with patch(
+            "mentions.management.commands.mentions_pending.handle_pending_webmentions"
+        ) as task:
+            call_command(
+                "mentions_pending",
+                "--incoming-only",
+                "--workers=4",
+                "--batch-size=10",
+                "--max-seconds=30",
+                stdout=StringIO(),
+            )
+
+            kwargs = task.call_args.kwargs
+            self.assertTrue(kwargs["incoming"])
+            self.assertFalse(kwargs["outgoing"])
+            self.assertEqual(4, kwargs["workers"])
+            self.assertEqual(10, kwargs["batch_size"])
+            self.assertEqual(30, kwargs["max_seconds"])
+
+    def test_mentions_pending_outgoing_only(self):
+        with patch(
+            "mentions.management.commands.mentions_pending.handle_pending_webmentions"
+        ) as task:
+            call_command("mentions_pending", "--outgoing-only", stdout=StringIO())
+
+            self.assertFalse(task.call_args.kwargs["incoming"])
+            self.assertTrue(task.call_args.kwargs["outgoing"])
+
+    def test_mentions_pending_writes_summary(self):
+        PendingIncomingWebmention.objects.create(
+            source_url=testfunc.random_url(),
+            target_url=testfunc.get_absolute_url_for_object(),
+            sent_by="localhost",
+        )
+        stdout = StringIO()
+
+        with _patch_command_task(), patch(
+            "mentions.tasks.scheduling.process_incoming_webmention"
+        ), patch(
+            "mentions.tasks.scheduling._maybe_reschedule_handle_pending_webmentions"
+        ):
+            call_command("mentions_pending", "incoming", stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertIn("Processed 1 item(s)", output)
+        self.assertIn("- incoming: 1 item(s)", output)
+
+    def test_mentions_pending_max_seconds(self):
+        PendingIncomingWebmention.objects.create(
+            source_url=testfunc.random_url(),
+            target_url=testfunc.get_absolute_url_for_object(),
+            sent_by="localhost",
+        )
+        stdout = StringIO()
+
+        with _patch_command_task(), patch(
+            "mentions.tasks.scheduling.process_incoming_webmention"
+        ) as process, patch(
+            "mentions.tasks.scheduling._maybe_reschedule_handle_pending_webmentions"
+        ):
+            call_command("mentions_pending", "--max-seconds=0", stdout=stdout)
+            self.assertFalse(process.called)
+
+        self.assertIn("Time limit reached", stdout.getvalue())
+
 
 class DeprecatedMentionsPendingTests(WebmentionTestCase):
     def test_deprecated_pending_mentions_still_works(self):
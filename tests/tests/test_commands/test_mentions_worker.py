@@ -0,0 +1,124 @@
+import signal
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from mentions import config
+from mentions.models import OutgoingWebmentionStatus, PendingIncomingWebmention
+from mentions.tasks.scheduling import PendingStats
+from mentions.tasks.worker import PollInterval, run_worker
+from tests.tests.util import snippets, testfunc
+from tests.tests.util.mocking import patch_http_get
+from tests.tests.util.testcase import OptionsTestCase
+
+
+class PollIntervalTests(OptionsTestCase):
+    def test_interval_increases_while_idle(self):
+        interval = PollInterval(1, 5)
+
+        self.assertListEqual(
+            [2, 4, 5, 5],
+            [interval.update(found_work=False) for _ in range(4)],
+        )
+
+    def test_interval_reset_when_work_found(self):
+        interval = PollInterval(1, 5)
+        interval.update(found_work=False)
+
+        self.assertEqual(1, interval.update(found_work=True))
+
+
+class RunWorkerTests(OptionsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.enable_celery(False)
+
+    def test_worker_processes_pending_until_stopped(self):
+        PendingIncomingWebmention.objects.create(
+            source_url=testfunc.random_url(),
+            target_url=testfunc.get_absolute_url_for_object(),
+            sent_by="localhost",
+        )
+        stop = threading.Event()
+        reported = []
+
+        def on_stats(stats: PendingStats):
+            reported.append(stats.total_count)
+            stop.set()
+
+        with patch("mentions.tasks.scheduling.process_incoming_webmention") as process:
+            run_worker(stop, poll_interval=0, on_stats=on_stats)
+            self.assertEqual(1, process.call_count)
+
+        self.assertListEqual([1], reported)
+
+    def test_worker_backs_off_after_unresolvable_work(self):
+        """Pending objects that can never succeed are resolved, so they do
+        not keep the worker busy."""
+        self.set_incoming_target_model_required(True)
+        PendingIncomingWebmention.objects.create(
+            source_url=testfunc.random_url(),
+            target_url=config.build_url("/not-a-mentionable-page/"),
+            sent_by="localhost",
+        )
+        OutgoingWebmentionStatus.objects.create(
+            source_url="/some-path/",
+            target_url=testfunc.random_url(),
+        )
+
+        intervals = []
+
+        class Stop(threading.Event):
+            def wait(self, timeout=None):
+                intervals.append(timeout)
+                if len(intervals) == 3:
+                    self.set()
+
+        with patch_http_get(text=snippets.build_html()):
+            run_worker(Stop(), poll_interval=1, max_poll_interval=8)
+
+        self.assertListEqual([1, 2, 4], intervals)
+        self.assertFalse(PendingIncomingWebmention.objects.exists())
+        self.assertFalse(
+            OutgoingWebmentionStatus.objects.filter(is_awaiting_retry=True).exists()
+        )
+
+    def test_worker_does_not_start_work_after_stop(self):
+        stop = threading.Event()
+        stop.set()
+
+        with patch("mentions.tasks.worker.handle_pending_webmentions") as task:
+            run_worker(stop)
+            self.assertFalse(task.called)
+
+    def test_worker_passes_stop_event(self):
+        stop = threading.Event()
+
+        with patch(
+            "mentions.tasks.worker.handle_pending_webmentions",
+            side_effect=lambda **kwargs: stop.set(),
+        ) as task:
+            run_worker(stop, workers=3, batch_size=7)
+
+            kwargs = task.call_args.kwargs
+            self.assertIs(stop, kwargs["stop"])
+            self.assertEqual(3, kwargs["workers"])
+            self.assertEqual(7, kwargs["batch_size"])
+
+
+class MentionsWorkerCommandTests(OptionsTestCase):
+    def test_sigterm_stops_worker(self):
+        with patch("signal.signal") as signal_func, patch(
+            "mentions.management.commands.mentions_worker.run_worker"
+        ) as worker:
+            call_command("mentions_worker", "--workers=2", stdout=StringIO())
+
+        stop = worker.call_args.args[0]
+        self.assertEqual(2, worker.call_args.kwargs["workers"])
+
+        handlers = {call.args[0]: call.args[1] for call in signal_func.call_args_list}
+        self.assertFalse(stop.is_set())
+        handlers[signal.SIGTERM](signal.SIGTERM, None)
+        self.assertTrue(stop.is_set())
@@ -1,5 +1,9 @@
+from unittest.mock import patch
+
+from django.conf import settings
 from django.utils import timezone
 
+from mentions import options
 from mentions.models import PendingIncomingWebmention
 from mentions.models.mixins import RetryableMixin
 from tests.tests.util import testfunc
@@ -77,3 +81,146 @@ class RetryableMixinTests(OptionsTestCase):
         obj.mark_processing_successful()
         self.assertFalse(obj.can_retry(now=T_TOO_SOON))
         self.assertFalse(obj.can_retry(now=T_CAN_RETRY))
+
+
+class RetryableQuerySetTests(OptionsTestCase):
+    """MODELS: RetryableQuerySet tests"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.set_max_retries(MAX_RETRIES)
+        self.set_retry_interval(RETRY_INTERVAL)
+        self.now = timezone.now()
+
+    def _create_failed_obj(self, seconds_ago: int) -> RetryableMixin:
+        obj = _create_obj()
+        obj.mark_processing_failed(
+            now=self.now - timezone.timedelta(seconds=seconds_ago)
+        )
+        obj.save()
+        return obj
+
+    def test_filter_due_for_retry(self):
+        """Only objects that can be retried are selected, ordered by due time."""
+        new = _create_obj()
+        new.save()
+        due_later = self._create_failed_obj(seconds_ago=RETRY_INTERVAL + 5)
+        due_earlier = self._create_failed_obj(seconds_ago=RETRY_INTERVAL + 60)
+        not_due = self._create_failed_obj(seconds_ago=RETRY_INTERVAL - 5)
+
+        successful = _create_obj()
+        successful.mark_processing_successful(save=True)
+
+        exhausted = _create_obj()
+        for _ in range(MAX_RETRIES):
+            exhausted.mark_processing_failed()
+        exhausted.save()
+
+        self.assertListEqual(
+            [new, due_earlier, due_later],
+            list(PendingIncomingWebmention.objects.filter_due_for_retry(now=self.now)),
+        )
+        self.assertFalse(not_due.can_retry(now=self.now))
+
+    def test_reset_retries_makes_object_due(self):
+        obj = self._create_failed_obj(seconds_ago=0)
+        self.assertFalse(
+            PendingIncomingWebmention.objects.filter_due_for_retry(
+                now=self.now
+            ).exists()
+        )
+
+        obj.reset_retries()
+
+        self.assertTrue(
+            PendingIncomingWebmention.objects.filter_due_for_retry(
+                now=self.now
+            ).exists()
+        )
+
+    def test_exponential_backoff(self):
+        """next_retry_at moves further away after each failure."""
+        setattr(settings, options.SETTING_RETRY_BACKOFF, "exponential")
+
+        obj = _create_obj()
+        obj.mark_processing_failed(now=T1)
+        self.assertEqual(
+            T1 + timezone.timedelta(seconds=RETRY_INTERVAL), obj.next_retry_at
+        )
+
+        obj.mark_processing_failed(now=T1)
+        self.assertEqual(
+            T1 + timezone.timedelta(seconds=RETRY_INTERVAL * 2), obj.next_retry_at
+        )
+
+    def test_decorrelated_jitter_uses_previous_delay(self):
+        setattr(settings, options.SETTING_RETRY_BACKOFF, "decorrelated_jitter")
+
+        with patch("random.uniform", return_value=RETRY_INTERVAL * 2) as uniform:
+            obj = _create_obj()
+            obj.mark_processing_failed(now=T1)
+            obj.mark_processing_failed(now=T1)
+
+            uniform.assert_called_with(RETRY_INTERVAL, RETRY_INTERVAL * 6)
+
+    def test_deferral_does_not_affect_backoff(self):
+        setattr(settings, options.SETTING_RETRY_BACKOFF, "decorrelated_jitter")
+
+        with patch("random.uniform", return_value=RETRY_INTERVAL * 2) as uniform:
+            obj = _create_obj()
+            obj.mark_processing_failed(now=T1)
+            obj.defer_processing(3600, now=T1 + timezone.timedelta(hours=1))
+            obj.mark_processing_failed(now=T1 + timezone.timedelta(hours=2))
+
+            uniform.assert_called_with(RETRY_INTERVAL, RETRY_INTERVAL * 6)
+
+
+class RetryLeaseTests(OptionsTestCase):
+    """MODELS: RetryableQuerySet.claim_for_retry tests"""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.set_max_retries(MAX_RETRIES)
+        self.set_retry_interval(RETRY_INTERVAL)
+        setattr(settings, options.SETTING_RETRY_LEASE_TIMEOUT, 60)
+
+        self.obj = _create_obj()
+        self.obj.save()
+        self.now = timezone.now()
+
+    def claim(self, now=None):
+        return PendingIncomingWebmention.objects.claim_for_retry(
+            [self.obj.pk],
+            now=now or self.now,
+        )
+
+    def test_claimed_only_once(self):
+        self.assertListEqual([self.obj], self.claim())
+        self.assertListEqual([], self.claim())
+
+    def test_expired_lease_can_be_claimed(self):
+        self.claim()
+
+        self.assertListEqual(
+            [self.obj],
+            self.claim(now=self.now + timezone.timedelta(seconds=61)),
+        )
+
+    def test_not_due_cannot_be_claimed(self):
+        self.obj.mark_processing_failed(save=True, now=self.now)
+
+        self.assertListEqual([], self.claim())
+
+    def test_lease_released_after_processing(self):
+        obj = self.claim()[0]
+        self.assertIsNotNone(obj.lease_expires_at)
+
+        obj.mark_processing_failed(save=True, now=self.now)
+        self.obj.refresh_from_db()
+        self.assertIsNone(self.obj.lease_expires_at)
+
+    def test_release_leases(self):
+        self.claim()
+        PendingIncomingWebmention.objects.all().release_leases()
+
+        self.assertListEqual([self.obj], self.claim())
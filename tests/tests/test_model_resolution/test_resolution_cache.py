@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+from django.conf import settings
+
+from mentions import resolution
+from mentions.exceptions import TargetDoesNotExist
+from tests.tests.util import testfunc
+from tests.tests.util.testcase import OptionsTestCase
+
+
+class ResolutionCacheTests(OptionsTestCase):
+    """INCOMING: Results of get_model_for_url are cached."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.target = testfunc.create_mentionable_object()
+        self.url = self.target.get_absolute_url()
+
+    def assert_resolver_not_called(self):
+        return patch(
+            "mentions.resolution.get_resolver",
+            side_effect=AssertionError("URL resolver should not be used"),
+        )
+
+    def test_resolution_is_cached(self):
+        resolution.get_model_for_url(self.url)
+
+        with self.assert_resolver_not_called(), self.assertNumQueries(1):
+            self.assertEqual(self.target, resolution.get_model_for_url(self.url))
+
+    def test_not_found_is_cached(self):
+        url = "/some/nonexistent/urlpath"
+        with self.assertRaises(TargetDoesNotExist):
+            resolution.get_model_for_url(url)
+
+        with self.assert_resolver_not_called(), self.assertNumQueries(0):
+            with self.assertRaises(TargetDoesNotExist):
+                resolution.get_model_for_url(url)
+
+    def test_saving_mentionable_invalidates_cache(self):
+        resolution.get_model_for_url(self.url)
+        self.target.save()
+
+        with patch(
+            "mentions.resolution.get_resolver", wraps=resolution.get_resolver
+        ) as get_resolver:
+            resolution.get_model_for_url(self.url)
+            self.assertTrue(get_resolver.called)
+
+    def test_deleted_object_is_not_returned(self):
+        resolution.get_model_for_url(self.url)
+        self.target.delete()
+
+        with self.assertRaises(TargetDoesNotExist):
+            resolution.get_model_for_url(self.url)
+
+    def test_cache_disabled(self):
+        settings.WEBMENTIONS_RESOLUTION_CACHE_TTL = 0
+        resolution.get_model_for_url(self.url)
+
+        with patch(
+            "mentions.resolution.get_resolver", wraps=resolution.get_resolver
+        ) as get_resolver:
+            resolution.get_model_for_url(self.url)
+            self.assertTrue(get_resolver.called)
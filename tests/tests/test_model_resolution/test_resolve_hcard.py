@@ -1,6 +1,8 @@
+from django.conf import settings
+
 from mentions.models import HCard
-from mentions.models.hcard import update_or_create_hcard
-from tests.tests.util.testcase import WebmentionTestCase
+from mentions.models.hcard import _recent_hcards, update_or_create_hcard
+from tests.tests.util.testcase import OptionsTestCase, WebmentionTestCase
 
 
 class HCardResolutionTests(WebmentionTestCase):
@@ -86,3 +88,81 @@ class HCardResolutionTests(WebmentionTestCase):
             data="{}",
         ),
         self.assert_exists(HCard, count=6)
+
+
+class HCardCacheTests(OptionsTestCase):
+    """Unchanged h-cards are not written to the database again."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        _recent_hcards.clear()
+        self.hcard_data = dict(
+            homepage="https://beatonma.org",
+            name="Michael Beaton",
+            avatar="https://beatonma.org/static/images/avatar.jpg",
+            data="{}",
+        )
+
+    def tearDown(self) -> None:
+        _recent_hcards.clear()
+        super().tearDown()
+
+    def _update_or_create_hcard(self, **kwargs) -> HCard:
+        with self.captureOnCommitCallbacks(execute=True):
+            return update_or_create_hcard(**{**self.hcard_data, **kwargs})
+
+    def test_unchanged_hcard_is_not_written(self):
+        hcard = self._update_or_create_hcard()
+
+        # Only check that the HCard still exists.
+        with self.assertNumQueries(1):
+            self.assertEqual(hcard, self._update_or_create_hcard())
+
+    def test_changed_hcard_is_written(self):
+        hcard = self._update_or_create_hcard()
+
+        updated = self._update_or_create_hcard(
+            avatar="https://beatonma.org/static/images/new-avatar.jpg"
+        )
+
+        self.assertEqual(hcard, updated)
+        hcard.refresh_from_db()
+        self.assertEqual(
+            "https://beatonma.org/static/images/new-avatar.jpg", hcard.avatar
+        )
+
+    def test_deleted_hcard_is_forgotten(self):
+        self._update_or_create_hcard().delete()
+
+        self._update_or_create_hcard()
+        self.assert_exists(HCard)
+
+    def test_hcard_deleted_by_another_process_is_forgotten(self):
+        hcard = self._update_or_create_hcard()
+
+        # Delete without sending signals, as if from another process.
+        HCard.objects.filter(pk=hcard.pk)._raw_delete(HCard.objects.db)
+
+        recreated = self._update_or_create_hcard()
+        self.assertNotEqual(hcard.pk, recreated.pk)
+        self.assert_exists(HCard, pk=recreated.pk)
+
+    def test_edited_hcard_is_forgotten(self):
+        hcard = self._update_or_create_hcard()
+        hcard.avatar = "https://beatonma.org/edited.jpg"
+        hcard.save()
+
+        self._update_or_create_hcard()
+        hcard.refresh_from_db()
+        self.assertEqual(self.hcard_data["avatar"], hcard.avatar)
+
+    def test_cache_size(self):
+        settings.WEBMENTIONS_HCARD_CACHE_SIZE = 1
+
+        self._update_or_create_hcard()
+        self._update_or_create_hcard(name="Someone else")
+        self.assertEqual(1, len(_recent_hcards))
+
+        settings.WEBMENTIONS_HCARD_CACHE_SIZE = 0
+        self._update_or_create_hcard()
+        self.assertEqual(0, len(_recent_hcards))
@@ -3,11 +3,16 @@ Ensure HCard objects are correctly built from HTML elements with the 'h-card' cl
 """
 import logging
 from typing import Callable, Optional, Union
+from unittest.mock import patch
+
+import mf2py
 
 from mentions.models import HCard
+from mentions.tasks.incoming.parsing import parse_microformats
 from mentions.tasks.incoming.remote import get_metadata_from_source
+from mentions.util import html_parser
 from tests.tests.util import testfunc
-from tests.tests.util.testcase import WebmentionTestCase
+from tests.tests.util.testcase import SimpleTestCase, WebmentionTestCase
 
 log = logging.getLogger(__name__)
 
@@ -386,3 +391,74 @@ class EmbeddedHCardParsingTests(WebmentionTestCase):
         hcard = _hcard_from_soup(html, source_url=source_url)
         self.assertEqual(hcard.avatar, "https://my-hcard.org/photo.jpg")
         self.assertEqual(hcard.homepage, "https://my-hcard.org/")
+
+    def test_relative_urls_are_resolved_before_saving(self):
+        source_url = "https://my-hcard.org/"
+        html = f"""
+        Blah blah blah {MENTION_ANCHOR}
+        <p class="h-card"><a class="p-name u-url" href="/">Jane Bloggs</a></p>
+        """
+
+        first = _hcard_from_soup(html, source_url=source_url)
+        second = _hcard_from_soup(html, source_url=source_url)
+
+        self.assertEqual(first, second)
+        self.assert_exists(HCard, homepage="https://my-hcard.org/")
+
+
+class MicroformatsParseOnceTests(WebmentionTestCase):
+    """PARSING: Microformats are only parsed once per source document."""
+
+    def test_fallback_to_top_level_hcard_parses_once(self):
+        html = f"""
+        <div class="h-card">Top level</div>
+        <div class="h-feed">
+            <article class="h-entry">
+                This entry mentions our link {MENTION_ANCHOR} but neither it
+                nor its feed include an h-card.
+            </article>
+        </div>
+        """
+
+        with patch("mf2py.Parser", wraps=mf2py.Parser) as parser:
+            hcard = _hcard_from_soup(html)
+
+        self.assertEqual(1, parser.call_count)
+        self.assertEqual(hcard.name, "Top level")
+
+
+class ParseMicroformatsTests(SimpleTestCase):
+    """PARSING: Items can be retrieved for the elements they were parsed from."""
+
+    def test_get_item_for_container(self):
+        soup = html_parser("""
+            <div class="h-feed" id="feed">
+                <article class="h-entry"><span class="p-name">First</span></article>
+                <article class="h-entry"><span class="p-name">Second</span></article>
+            </div>
+            """)
+        feed = soup.find(class_="h-feed")
+        first, second = soup.find_all(class_="h-entry")
+
+        microformats = parse_microformats(soup, containers=[feed, first, second])
+
+        self.assertIs(microformats.items[0], microformats.get_item(feed))
+        self.assertEqual(["First"], microformats.get_item(first)["properties"]["name"])
+        self.assertEqual(
+            ["Second"], microformats.get_item(second)["properties"]["name"]
+        )
+        self.assertIsNone(microformats.get_item(soup))
+
+    def test_original_ids_are_restored(self):
+        soup = html_parser(
+            """<div class="h-feed" id="feed"><div class="h-entry">Entry</div></div>"""
+        )
+        feed = soup.find(class_="h-feed")
+        entry = soup.find(class_="h-entry")
+
+        microformats = parse_microformats(soup, containers=[feed, entry])
+
+        self.assertEqual("feed", feed["id"])
+        self.assertFalse(entry.has_attr("id"))
+        self.assertEqual("feed", microformats.get_item(feed)["id"])
+        self.assertNotIn("id", microformats.get_item(entry))
@@ -1,9 +1,19 @@
 from typing import Optional
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 from mentions import config
 from mentions.tasks.outgoing.local import get_target_links_in_html
+from mentions.util import find_links_in_html
 from tests.tests.util.testcase import OptionsTestCase
 
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
 
 def _link(href: str, text: Optional[str] = None):
     return f"""<a href="{href}">{text or ""}</a>"""
@@ -201,3 +211,69 @@ class OutgoingLinksTests(OptionsTestCase):
                 "https://attr.org/allow-by-override",
             },
         )
+
+
+class Html5libOutgoingLinksTests(OutgoingLinksTests):
+    """Test link discovery using each available link parser."""
+
+    link_parser = "html5lib"
+
+    def setUp(self) -> None:
+        super().setUp()
+        settings.WEBMENTIONS_LINK_PARSER = self.link_parser
+
+
+class HtmlParserOutgoingLinksTests(Html5libOutgoingLinksTests):
+    link_parser = "html.parser"
+
+
+class StreamOutgoingLinksTests(Html5libOutgoingLinksTests):
+    link_parser = "stream"
+
+
+@skipUnless(lxml, "lxml is not installed")
+class LxmlOutgoingLinksTests(Html5libOutgoingLinksTests):
+    link_parser = "lxml"
+
+
+class LinkParserTests(OptionsTestCase):
+    def test_parsers_find_same_links(self):
+        html = f"""<html><head><title>Title</title></head><body>
+            <p>Unclosed paragraph {_link("https://example.org/1/", "one")}
+            <p>Entities &amp; <a href="https://example.org/?a=1&amp;b=2">two</a>
+            <ul><li><a href='https://example.org/3/' class=" a  b ">three</a>
+            <li><a href=https://example.org/4/ data-thing>four</a></ul>
+            <a name="no-href">Not a link</a>
+            <a href="">Empty href</a>
+            <img src="https://example.org/image.png"/>
+            <div><a href="https://example.org/5/">five</a></div>
+            </body></html>"""
+
+        def attrs(parser: str):
+            return [link.attrs for link in find_links_in_html(html, parser=parser)]
+
+        expected = attrs("html5lib")
+        self.assertEqual(6, len(expected))
+        self.assertEqual(expected, attrs("html.parser"))
+        self.assertEqual(expected, attrs("stream"))
+
+    def test_stream_link_parent_text(self):
+        html = """<div>Outer <p>Some text with <a href="/a/">a <b>link</b></a> in it.</p>
+            <p>Implicitly <a href="/b/">closes</a> the first paragraph</div>
+            <a href="/c/">Top level</a>"""
+
+        links = find_links_in_html(html, parser="stream")
+
+        self.assertEqual(
+            ["/a/", "/b/", "/c/"],
+            [link["href"] for link in links],
+        )
+        self.assertEqual("Some text with a link in it.", links[0].parent.get_text())
+        self.assertEqual(
+            "Implicitly closes the first paragraph", links[1].parent.get_text()
+        )
+
+    def test_unknown_parser(self):
+        settings.WEBMENTIONS_LINK_PARSER = "nonsense"
+        with self.assertRaises(ImproperlyConfigured):
+            find_links_in_html(_link("https://example.org/"))
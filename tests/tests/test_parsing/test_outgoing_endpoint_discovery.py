@@ -1,9 +1,14 @@
+from unittest.mock import Mock, patch
+from urllib.parse import urljoin
+
+import requests
 from requests.structures import CaseInsensitiveDict
 
+from mentions.exceptions import TargetNotAccessible
 from mentions.tasks.outgoing import remote
 from tests.tests.util import snippets, testfunc
-from tests.tests.util.mocking import MockResponse
-from tests.tests.util.testcase import WebmentionTestCase
+from tests.tests.util.mocking import MockResponse, patch_http_get
+from tests.tests.util.testcase import OptionsTestCase, WebmentionTestCase
 
 OUTGOING_WEBMENTION_HTML_DUPLICATE_LINKS = f"""<html>
 <head><link rel="webmention" href="/webmention/" /></head>
@@ -104,3 +109,159 @@ class EndpointDiscoveryTests(WebmentionTestCase):
             f"{base_url}/already_absolute_path",
             func(response, f"{base_url}/already_absolute_path"),
         )
+
+
+def _chunked(text: str, size: int = 7):
+    return (text[n : n + size] for n in range(0, len(text), size))
+
+
+class StreamingEndpointDiscoveryTests(OptionsTestCase):
+    """OUTGOING: Endpoint discovery from HTML received in chunks."""
+
+    relative_endpoint = testfunc.endpoint_submit_webmention()
+
+    def test_get_endpoint_in_html_stream(self):
+        """Endpoints in HTML <head> or <body> are found when split across chunks."""
+        func = remote.get_endpoint_in_html_stream
+
+        self.assertEqual(
+            self.relative_endpoint, func(_chunked(snippets.html_head_endpoint()))
+        )
+        self.assertEqual(
+            self.relative_endpoint, func(_chunked(snippets.html_body_endpoint()))
+        )
+        self.assertIsNone(func(_chunked(snippets.build_html(body="No endpoint"))))
+
+    def test_stream_matches_full_parser(self):
+        """Results are the same as get_endpoint_in_html."""
+        documents = [
+            snippets.html_head_endpoint(),
+            snippets.html_body_endpoint(),
+            snippets.html_all_endpoints("Lorem ipsum"),
+            snippets.html_with_mentions(testfunc.random_url()),
+            snippets.build_html(body='<a href="/other/" rel="me">Not an endpoint</a>'),
+            '<link rel="stylesheet webmention" href="/implicit-head/">',
+            '<p>Implicit body</p><link rel="webmention" href="/ignored/">'
+            '<a rel="nofollow webmention" href="/body/">',
+        ]
+
+        for html in documents:
+            with self.subTest(html=html):
+                self.assertEqual(
+                    remote.get_endpoint_in_html(html),
+                    remote.get_endpoint_in_html_stream(_chunked(html)),
+                )
+
+    def test_stream_stops_at_first_endpoint(self):
+        """Remaining content is not consumed once an endpoint is found."""
+        consumed = []
+
+        def chunks():
+            for chunk in ["<html><head>", snippets._html_head_link("/wm/"), "</head>"]:
+                consumed.append(chunk)
+                yield chunk
+            raise AssertionError("Stream should not be consumed after endpoint found")
+
+        self.assertEqual("/wm/", remote.get_endpoint_in_html_stream(chunks()))
+        self.assertEqual(2, len(consumed))
+
+    def test_get_absolute_endpoint_respects_max_bytes(self):
+        """Content beyond options.endpoint_discovery_max_bytes is not read."""
+        from django.conf import settings
+
+        padding = "<p>Lorem ipsum</p>" * 100
+        response = MockResponse(
+            url=testfunc.random_url(),
+            text=snippets.build_html(
+                body=f"{padding}{snippets._html_body_link('/webmention/')}"
+            ),
+        )
+
+        settings.WEBMENTIONS_ENDPOINT_DISCOVERY_MAX_BYTES = len(padding)
+        self.assertIsNone(remote._get_absolute_endpoint_from_response(response))
+
+        settings.WEBMENTIONS_ENDPOINT_DISCOVERY_MAX_BYTES = len(response.text)
+        self.assertEqual(
+            urljoin(response.url, "/webmention/"),
+            remote._get_absolute_endpoint_from_response(response),
+        )
+
+
+class HeadEndpointDiscoveryTests(OptionsTestCase):
+    """OUTGOING: Endpoint discovery tries a HEAD request before retrieving content."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.target_url = testfunc.random_url()
+        self.status = remote.get_or_create_outgoing_webmention(
+            "/some-url-path/", self.target_url
+        )
+
+    def test_endpoint_in_head_response(self):
+        """Content is not retrieved if the endpoint is found in HEAD response headers."""
+        with patch_http_get(headers={"Link": snippets.http_link_endpoint()}):
+            endpoint = remote._discover_endpoint(self.status, self.target_url)
+
+            self.assertTrue(requests.Session.head.called)
+            self.assertFalse(requests.Session.get.called)
+
+        self.assertEqual(
+            urljoin(self.target_url, testfunc.endpoint_submit_webmention()), endpoint
+        )
+
+    def test_endpoint_in_content(self):
+        """Content is retrieved if the endpoint is not in HEAD response headers."""
+        with patch_http_get(text=snippets.html_body_endpoint()):
+            endpoint = remote._discover_endpoint(self.status, self.target_url)
+
+            self.assertTrue(requests.Session.head.called)
+            self.assertTrue(requests.Session.get.called)
+
+        self.assertEqual(
+            urljoin(self.target_url, testfunc.endpoint_submit_webmention()), endpoint
+        )
+
+    def test_head_not_allowed(self):
+        """Fall back to GET if the server does not accept HEAD requests."""
+        with patch_http_get(text=snippets.html_head_endpoint()), patch.object(
+            requests.Session,
+            "head",
+            Mock(side_effect=lambda url, **kw: MockResponse(url, status_code=405)),
+        ):
+            endpoint = remote._discover_endpoint(self.status, self.target_url)
+            self.assertTrue(requests.Session.get.called)
+
+        self.assertEqual(
+            urljoin(self.target_url, testfunc.endpoint_submit_webmention()), endpoint
+        )
+
+    def test_head_disabled(self):
+        from django.conf import settings
+
+        settings.WEBMENTIONS_ENDPOINT_DISCOVERY_USE_HEAD = False
+
+        with patch_http_get(headers={"Link": snippets.http_link_endpoint()}):
+            remote._discover_endpoint(self.status, self.target_url)
+
+            self.assertFalse(requests.Session.head.called)
+            self.assertTrue(requests.Session.get.called)
+
+    def test_content_not_read_if_not_html(self):
+        """Content is only searched for an endpoint if it may be HTML."""
+        with patch_http_get(
+            text=snippets.html_body_endpoint(),
+            headers={"content-type": "image/png"},
+        ):
+            self.assertIsNone(remote._discover_endpoint(self.status, self.target_url))
+
+    def test_content_deadline_exceeded(self):
+        """Target is inaccessible if its content is not received in time."""
+        with patch_http_get(text=snippets.html_body_endpoint()), patch(
+            "mentions.tasks.outgoing.remote.get_deadline",
+            return_value=0,
+        ):
+            with self.assertRaises(TargetNotAccessible):
+                remote._discover_endpoint(self.status, self.target_url)
+
+        self.status.refresh_from_db()
+        self.assertTrue(self.status.is_awaiting_retry)
@@ -0,0 +1,126 @@
+"""
+Tests for async versions of network-bound webmention tasks.
+"""
+from urllib.parse import urljoin
+
+from asgiref.sync import async_to_sync
+from requests import Timeout
+
+from mentions.exceptions import SourceNotAccessible, TargetNotAccessible
+from mentions.models import OutgoingWebmentionStatus
+from mentions.models.outgoing_status import get_or_create_outgoing_webmention
+from mentions.tasks.incoming.remote import aget_source_html
+from mentions.tasks.outgoing import atry_send_webmention
+from mentions.tasks.outgoing.remote import _aget_target, _asend_webmention
+from tests.tests.util import snippets, testfunc
+from tests.tests.util.mocking import patch_http_get, patch_http_post
+from tests.tests.util.testcase import OptionsTestCase
+
+
+def throw_timeout(*args, **kwargs):
+    raise Timeout("Mocked timeout.")
+
+
+class AsyncIncomingTests(OptionsTestCase):
+    """INCOMING: async source retrieval."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.source_url = testfunc.random_url()
+
+    def test_aget_source_html(self):
+        html = snippets.build_html(body="Hello async")
+
+        with patch_http_get(text=html):
+            self.assertEqual(html, async_to_sync(aget_source_html)(self.source_url))
+
+    def test_aget_source_html__error_code(self):
+        with patch_http_get(status_code=404):
+            with self.assertRaises(SourceNotAccessible):
+                async_to_sync(aget_source_html)(self.source_url)
+
+    def test_aget_source_html__wrong_content_type(self):
+        with patch_http_get(headers={"content-type": "application/json"}):
+            with self.assertRaises(SourceNotAccessible):
+                async_to_sync(aget_source_html)(self.source_url)
+
+    def test_aget_source_html__unreachable(self):
+        with patch_http_get(response=throw_timeout):
+            with self.assertRaises(SourceNotAccessible):
+                async_to_sync(aget_source_html)(self.source_url)
+
+
+class AsyncOutgoingTests(OptionsTestCase):
+    """OUTGOING: async endpoint discovery and submission."""
+
+    source_urlpath = "/some-url-path/"
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.target_url = testfunc.random_url()
+        self.endpoint = f"{testfunc.random_url()}webmention/"
+
+    def test_asend_webmention(self):
+        with patch_http_post(status_code=202):
+            self.assertEqual(
+                (True, 202),
+                async_to_sync(_asend_webmention)(
+                    self.source_urlpath, self.endpoint, self.target_url
+                ),
+            )
+
+        with patch_http_post(status_code=400):
+            self.assertEqual(
+                (False, 400),
+                async_to_sync(_asend_webmention)(
+                    self.source_urlpath, self.endpoint, self.target_url
+                ),
+            )
+
+    def test_aget_target__error_marks_status_for_retry(self):
+        status = get_or_create_outgoing_webmention(self.source_urlpath, self.target_url)
+
+        with patch_http_get(status_code=500):
+            with self.assertRaises(TargetNotAccessible):
+                async_to_sync(_aget_target)(status, self.target_url)
+
+        status.refresh_from_db()
+        self.assertTrue(status.is_awaiting_retry)
+
+    def test_atry_send_webmention__endpoint_in_headers(self):
+        with patch_http_get(
+            headers={"Link": snippets.http_header_link(self.endpoint, rel="webmention")}
+        ), patch_http_post() as post:
+            self.assertTrue(
+                async_to_sync(atry_send_webmention)(
+                    self.source_urlpath, self.target_url, None
+                )
+            )
+            self.assertEqual(self.endpoint, post.call_args.args[0])
+
+        status = self.assert_exists(OutgoingWebmentionStatus)
+        self.assertTrue(status.successful)
+        self.assertEqual(self.endpoint, status.target_webmention_endpoint)
+
+    def test_atry_send_webmention__endpoint_in_html(self):
+        html = snippets.build_html(head='<link rel="webmention" href="/webmention/">')
+
+        with patch_http_get(text=html), patch_http_post() as post:
+            self.assertTrue(
+                async_to_sync(atry_send_webmention)(
+                    self.source_urlpath, self.target_url, None
+                )
+            )
+            self.assertEqual(
+                urljoin(self.target_url, "/webmention/"),
+                post.call_args.args[0],
+            )
+
+    def test_atry_send_webmention__no_endpoint(self):
+        with patch_http_get(text=snippets.build_html()), patch_http_post() as post:
+            self.assertIsNone(
+                async_to_sync(atry_send_webmention)(
+                    self.source_urlpath, self.target_url, None
+                )
+            )
+            self.assertFalse(post.called)
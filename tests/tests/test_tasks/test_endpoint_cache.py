@@ -0,0 +1,133 @@
+from unittest.mock import Mock
+
+import requests
+from asgiref.sync import async_to_sync
+
+from mentions import config
+from mentions.tasks.outgoing import atry_send_webmention, try_send_webmention
+from mentions.tasks.outgoing.endpoint_cache import (
+    cache_endpoint,
+    forget_endpoint,
+    get_cached_endpoint,
+)
+from tests.tests.util import snippets, testfunc
+from tests.tests.util.mocking import patch_http_get, patch_http_post
+from tests.tests.util.testcase import OptionsTestCase
+
+
+class EndpointCacheTests(OptionsTestCase):
+    """OUTGOING: Results of endpoint discovery are cached."""
+
+    source_urlpath = "/some-url-path/"
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.target_url = testfunc.random_url()
+        self.endpoint = f"{testfunc.random_url()}webmention/"
+
+    def test_cache_endpoint(self):
+        self.assertEqual((False, None), get_cached_endpoint(self.target_url))
+
+        cache_endpoint(self.target_url, self.endpoint)
+        self.assertEqual((True, self.endpoint), get_cached_endpoint(self.target_url))
+
+        forget_endpoint(self.target_url)
+        self.assertEqual((False, None), get_cached_endpoint(self.target_url))
+
+    def test_cache_no_endpoint(self):
+        cache_endpoint(self.target_url, None)
+        self.assertEqual((True, None), get_cached_endpoint(self.target_url))
+
+    def test_cache_disabled(self):
+        from django.conf import settings
+
+        settings.WEBMENTIONS_ENDPOINT_CACHE_TTL = 0
+        settings.WEBMENTIONS_ENDPOINT_CACHE_TTL_NOT_FOUND = 0
+
+        cache_endpoint(self.target_url, self.endpoint)
+        cache_endpoint(f"{self.target_url}other/", None)
+
+        self.assertEqual((False, None), get_cached_endpoint(self.target_url))
+        self.assertEqual((False, None), get_cached_endpoint(f"{self.target_url}other/"))
+
+    def test_discovered_endpoint_is_reused(self):
+        with patch_http_get(
+            headers={"Link": snippets.http_header_link(self.endpoint, rel="webmention")}
+        ), patch_http_post() as post:
+            self.assertTrue(
+                try_send_webmention(self.source_urlpath, self.target_url, None)
+            )
+            self.assertTrue(
+                try_send_webmention(self.source_urlpath, self.target_url, None)
+            )
+
+            self.assertEqual(1, requests.Session.head.call_count)
+            self.assertFalse(requests.Session.get.called)
+            self.assertEqual(2, post.call_count)
+            self.assertEqual(self.endpoint, post.call_args.args[0])
+            self.assertEqual(
+                config.build_url(self.source_urlpath),
+                post.call_args.kwargs["data"]["source"],
+            )
+
+    def test_missing_endpoint_is_reused(self):
+        with patch_http_get(text=snippets.build_html()), patch_http_post() as post:
+            self.assertIsNone(
+                try_send_webmention(self.source_urlpath, self.target_url, None)
+            )
+            self.assertIsNone(
+                try_send_webmention(self.source_urlpath, self.target_url, None)
+            )
+
+            self.assertEqual(1, requests.Session.get.call_count)
+            self.assertFalse(post.called)
+
+    def test_endpoint_forgotten_on_failure(self):
+        cache_endpoint(self.target_url, self.endpoint)
+
+        with patch_http_post(status_code=400):
+            self.assertFalse(
+                try_send_webmention(self.source_urlpath, self.target_url, None)
+            )
+
+        self.assertEqual((False, None), get_cached_endpoint(self.target_url))
+
+    def test_endpoint_forgotten_on_error(self):
+        cache_endpoint(self.target_url, self.endpoint)
+
+        with patch_endpoint_error():
+            self.assertFalse(
+                try_send_webmention(self.source_urlpath, self.target_url, None)
+            )
+
+        self.assertEqual((False, None), get_cached_endpoint(self.target_url))
+
+    def test_endpoint_forgotten_on_failure_async(self):
+        cache_endpoint(self.target_url, self.endpoint)
+
+        with patch_http_post(status_code=400):
+            self.assertFalse(
+                async_to_sync(atry_send_webmention)(
+                    self.source_urlpath, self.target_url, None
+                )
+            )
+
+        self.assertEqual((False, None), get_cached_endpoint(self.target_url))
+
+    def test_endpoint_forgotten_on_error_async(self):
+        cache_endpoint(self.target_url, self.endpoint)
+
+        with patch_endpoint_error():
+            self.assertFalse(
+                async_to_sync(atry_send_webmention)(
+                    self.source_urlpath, self.target_url, None
+                )
+            )
+
+        self.assertEqual((False, None), get_cached_endpoint(self.target_url))
+
+
+def patch_endpoint_error():
+    return patch_http_post(
+        response=Mock(side_effect=requests.ConnectionError("Connection refused"))
+    )
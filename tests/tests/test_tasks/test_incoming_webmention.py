@@ -1,16 +1,25 @@
 """
 Tests for handling webmentions are sent to us from elsewhere.
 """
+
 import logging
+from unittest.mock import patch
+from urllib.parse import urljoin
 
+import requests
 from django.test import override_settings
 
 from mentions import options
 from mentions.exceptions import SourceNotAccessible, TargetWrongDomain
-from mentions.models import Webmention
+from mentions.models import PendingIncomingWebmention, Webmention
 from mentions.models.mixins import IncomingMentionType
 from mentions.tasks import incoming
 from mentions.tasks.incoming import local, remote
+from mentions.tasks.incoming.parsing import (
+    ParsedSource,
+    find_possible_targets,
+    parse_post_type,
+)
 from mentions.util import html_parser
 from tests.tests.util import snippets, testfunc
 from tests.tests.util.mocking import patch_http_get
@@ -104,6 +113,20 @@ class IncomingWebmentionsTests(WebmentionTestCase):
         with self.assertRaises(SourceNotAccessible):
             remote.get_source_html(testfunc.random_url())
 
+    @patch_http_get(text=SOURCE_TEXT_DEFAULT)
+    def test_get_incoming_source_too_large(self):
+        """Source larger than WEBMENTIONS_MAX_RESPONSE_BYTES raises SourceNotAccessible."""
+        with override_settings(WEBMENTIONS_MAX_RESPONSE_BYTES=len(SOURCE_TEXT_DEFAULT)):
+            self.assertEqual(
+                SOURCE_TEXT_DEFAULT, remote.get_source_html(testfunc.random_url())
+            )
+
+        with override_settings(
+            WEBMENTIONS_MAX_RESPONSE_BYTES=len(SOURCE_TEXT_DEFAULT) - 1
+        ):
+            with self.assertRaises(SourceNotAccessible):
+                remote.get_source_html(testfunc.random_url())
+
     @patch_http_get(text=SOURCE_TEXT_DEFAULT)
     def test_process_incoming_webmention(self):
         """process_incoming_webmention targeting a URL creates a validated Webmention object when successful."""
@@ -172,20 +195,167 @@ class IncomingWebmentionsTests(WebmentionTestCase):
         mention = self.assert_exists(Webmention)
         self.assertFalse(mention.validated)
 
+    def test_process_incoming_webmentions_from_source(self):
+        """Source is retrieved once and each target gets its own Webmention."""
+        linked_targets = [
+            testfunc.get_absolute_url_for_object(),
+            testfunc.get_absolute_url_for_object(),
+        ]
+        unlinked_target = testfunc.get_absolute_url_for_object()
+        html = snippets.build_html(
+            body=f"""<a href="{linked_targets[0]}" class="u-like-of">like</a>
+                <a href="{linked_targets[1]}">mention</a>
+                <div class="h-card"><a class="u-url" href="/">Jane</a></div>"""
+        )
+        sent_by = testfunc.random_url()
+
+        with patch_http_get(text=html):
+            mentions = incoming.process_incoming_webmentions_from_source(
+                SOURCE_URL,
+                [(url, sent_by) for url in [*linked_targets, unlinked_target]],
+            )
+            self.assertEqual(1, requests.Session.get.call_count)
+
+        self.assertEqual(3, Webmention.objects.count())
+        self.assertSetEqual({*linked_targets, unlinked_target}, set(mentions.keys()))
+
+        like, mention = [mentions[url] for url in linked_targets]
+        self.assertTrue(like.validated)
+        self.assertEqual("like", like.post_type)
+        self.assertTrue(mention.validated)
+        self.assertEqual(like.hcard, mention.hcard)
+        self.assertEqual(urljoin(SOURCE_URL, "/"), like.hcard.homepage)
+        self.assertFalse(mentions[unlinked_target].validated)
+
+    def test_process_incoming_webmention__wrong_domain(self):
+        """A webmention for another domain is rejected without fetching the source."""
+        target_url = testfunc.random_url()
+        PendingIncomingWebmention.objects.create(
+            source_url=SOURCE_URL,
+            target_url=target_url,
+            sent_by="localhost",
+        )
+
+        with patch_http_get(text=SOURCE_TEXT_DEFAULT):
+            self.assertIsNone(
+                incoming.process_incoming_webmention(SOURCE_URL, target_url, "")
+            )
+            self.assertFalse(requests.Session.get.called)
+
+        self.assert_not_exists(Webmention)
+        self.assert_not_exists(PendingIncomingWebmention)
+
+    def test_process_incoming_webmentions_from_source__wrong_domain(self):
+        """Targets on another domain are rejected, others are processed."""
+        wrong_domain_target = testfunc.random_url()
+        PendingIncomingWebmention.objects.create(
+            source_url=SOURCE_URL,
+            target_url=wrong_domain_target,
+            sent_by="localhost",
+        )
+
+        with patch_http_get(text=SOURCE_TEXT_DEFAULT):
+            mentions = incoming.process_incoming_webmentions_from_source(
+                SOURCE_URL,
+                [(wrong_domain_target, ""), (self.target_url, "")],
+            )
+
+        self.assertIsNone(mentions[wrong_domain_target])
+        self.assertIsNotNone(mentions[self.target_url])
+        self.assert_not_exists(PendingIncomingWebmention)
+
+    def test_process_incoming_webmentions_from_source__inaccessible(self):
+        """Each target is saved for retry if the source cannot be retrieved."""
+        targets = [
+            (testfunc.get_absolute_url_for_object(), testfunc.random_url())
+            for _ in range(2)
+        ]
+
+        with patch_http_get(status_code=404):
+            incoming.process_incoming_webmentions_from_source(SOURCE_URL, targets)
+
+        self.assert_not_exists(Webmention)
+        self.assertEqual(2, PendingIncomingWebmention.objects.count())
+
     def test_parse_link_type(self):
         soup = html_parser(SOURCE_TEXT_LIKE)
         link = soup.find("a", href=TARGET_URL)
 
-        link_type = remote.parse_post_type(link)
+        link_type = parse_post_type(link)
         self.assertEqual(link_type, IncomingMentionType.Like)
 
     def test_parse_link_type_with_hcite_nesting(self):
         soup = html_parser(SOURCE_TEXT_REPLY_IN_HCITE)
         link = soup.find("a", href=TARGET_URL)
 
-        link_type = remote.parse_post_type(link)
+        link_type = parse_post_type(link)
         self.assertEqual(link_type, IncomingMentionType.Reply)
 
+    def test_parsed_source_finds_normalized_links(self):
+        source = ParsedSource(
+            """<a href="HTTPS://Example.org:443/post/#comments">absolute</a>
+            <a href="/relative/">relative</a>""",
+            SOURCE_URL,
+        )
+
+        self.assertIsNotNone(source.find_link("https://example.org/post/"))
+        self.assertIsNotNone(source.find_link(urljoin(SOURCE_URL, "/relative/")))
+        self.assertIsNone(source.find_link("https://example.org/Post/"))
+
+    def test_get_metadata_for_targets_parses_source_once(self):
+        other_target_url = testfunc.random_url()
+        html = f"""{SOURCE_TEXT_DEFAULT}
+        <a href="{other_target_url}" class="u-like-of">another link</a>"""
+
+        with patch(
+            "mentions.tasks.incoming.parsing.source.html_parser",
+            wraps=html_parser,
+        ) as parser:
+            metadata = remote.get_metadata_for_targets(
+                html, [TARGET_URL, other_target_url], SOURCE_URL
+            )
+
+        self.assertEqual(1, parser.call_count)
+        self.assertEqual("repost", metadata[TARGET_URL].post_type)
+        self.assertEqual("like", metadata[other_target_url].post_type)
+        self.assertEqual("Jane", metadata[other_target_url].hcard.name)
+
+    def test_get_metadata_for_targets_skips_parsing_if_not_linked(self):
+        with patch(
+            "mentions.tasks.incoming.parsing.source.html_parser",
+            wraps=html_parser,
+        ) as parser:
+            metadata = remote.get_metadata_for_targets(
+                snippets.build_html(body="No links here"), [TARGET_URL], SOURCE_URL
+            )
+
+        self.assertFalse(parser.called)
+        self.assertEqual({TARGET_URL: None}, metadata)
+
+    def test_find_possible_targets(self):
+        target_url = "https://example.org/article/"
+        source_url = "https://source.org/"
+
+        def assert_possible(html: str, expected: bool = True):
+            self.assertEqual(
+                [target_url] if expected else [],
+                find_possible_targets(html, [target_url], source_url),
+                msg=html,
+            )
+
+        assert_possible('<a href="https://example.org/article/">')
+        assert_possible('<a href="HTTPS://EXAMPLE.ORG:443/article">')
+        assert_possible('<a href="//example.org/article/">')
+        assert_possible('<a href="https:&#x2F;&#x2F;example&period;org&#47;article/">')
+        assert_possible('<a href="https://example.org/">', expected=False)
+        assert_possible('<a href="/article/">', expected=False)
+
+        # Links from the same host may be relative.
+        self.assertEqual(
+            [target_url],
+            find_possible_targets("<a href='../'>", [target_url], target_url),
+        )
+
 
 class IncomingWebmentionOptionTests(OptionsTestCase):
     """INCOMING: Test effects of settings.WEBMENTIONS_TARGET_REQUIRES_OBJECT."""
@@ -1,10 +1,16 @@
 """
 Tests for webmentions that originate on our server, usually pointing somewhere else.
 """
+
 import logging
+from unittest.mock import patch
 
 from mentions import config
 from mentions.models import OutgoingWebmentionStatus
+from mentions.models.outgoing_status import (
+    get_or_create_outgoing_webmention,
+    get_or_create_outgoing_webmentions,
+)
 from mentions.tasks import handle_pending_webmentions
 from mentions.tasks.outgoing import process_outgoing_webmentions, remote
 from tests.tests.util import testfunc
@@ -23,6 +29,13 @@ OUTGOING_WEBMENTION_HTML = f"""<html>
 blah blah</body></html>
 """
 
+OUTGOING_WEBMENTION_HTML_EDITED = f"""<html>
+<head><link rel="webmention" href="/webmention/" /></head>
+<body>blah blah edited
+<a href="https://{TARGET_DOMAIN}/">This is a mentionable link</a> 
+blah blah</body></html>
+"""
+
 OUTGOING_WEBMENTION_HTML_MULTIPLE_LINKS = f"""<html>
 <head><link rel="webmention" href="/webmention/" /></head>
 <body>blah blah 
@@ -125,8 +138,122 @@ class OutgoingWebmentionsTests(OptionsTestCase):
         status.refresh_from_db()
         self.assertEqual(status.retry_attempt_count, 2)
 
-        # Reprocessing raw text reuses same status instance, resetting its retry tracking.
-        process_outgoing_webmentions(self.source_url, OUTGOING_WEBMENTION_HTML)
+        # Reprocessing edited text reuses same status instance, resetting its retry tracking.
+        process_outgoing_webmentions(self.source_url, OUTGOING_WEBMENTION_HTML_EDITED)
 
         status = self.assert_exists(OutgoingWebmentionStatus)
         self.assertEqual(status.retry_attempt_count, 1)
+
+    @patch_http_get(text=OUTGOING_WEBMENTION_HTML)
+    @patch_http_post()
+    def test_process_outgoing_webmentions__skips_unchanged_links(self):
+        """Links are not processed again if the content around them has not changed."""
+        self.assertEqual(
+            1, process_outgoing_webmentions(self.source_url, OUTGOING_WEBMENTION_HTML)
+        )
+        self.assertEqual(
+            0, process_outgoing_webmentions(self.source_url, OUTGOING_WEBMENTION_HTML)
+        )
+        self.assertEqual(
+            1,
+            process_outgoing_webmentions(
+                self.source_url, OUTGOING_WEBMENTION_HTML_EDITED
+            ),
+        )
+
+    @patch_http_get(text=OUTGOING_WEBMENTION_HTML)
+    def test_process_outgoing_webmentions__notifies_removed_links(self):
+        """Targets are notified once when a link to them is removed from the source."""
+        removed_target = f"https://{TARGET_DOMAIN}/some-article/"
+
+        with patch_http_post() as post:
+            process_outgoing_webmentions(
+                self.source_url, OUTGOING_WEBMENTION_HTML_MULTIPLE_LINKS
+            )
+            self.assertEqual(2, post.call_count)
+
+        with patch_http_post() as post:
+            # Edited text around the remaining link means it is also resent.
+            self.assertEqual(
+                2,
+                process_outgoing_webmentions(
+                    self.source_url, OUTGOING_WEBMENTION_HTML_EDITED
+                ),
+            )
+            targets = {call.kwargs["data"]["target"] for call in post.call_args_list}
+            self.assertSetEqual({f"https://{TARGET_DOMAIN}/", removed_target}, targets)
+
+        with patch_http_post() as post:
+            process_outgoing_webmentions(
+                self.source_url, OUTGOING_WEBMENTION_HTML_EDITED + " "
+            )
+            self.assertFalse(post.called)
+
+    def test_process_outgoing_webmentions__concurrent(self):
+        """Links are all processed when outgoing concurrency is enabled."""
+        self.set_outgoing_concurrency(4, 2)
+
+        results = {
+            f"https://{TARGET_DOMAIN}/": True,
+            f"https://{TARGET_DOMAIN}/some-article/": False,
+            f"https://{testfunc.random_domain()}/": None,
+        }
+        html = "".join(f'<a href="{url}">link</a>' for url in results.keys())
+
+        with patch(
+            "mentions.tasks.outgoing.process._process_link",
+            side_effect=lambda source, url, status: results[url],
+        ) as process_link:
+            successful = process_outgoing_webmentions(self.source_url, html)
+
+        self.assertEqual(1, successful)
+        self.assertSetEqual(
+            set(results.keys()),
+            {call.args[1] for call in process_link.call_args_list},
+        )
+
+
+class BulkOutgoingStatusTests(OptionsTestCase):
+    """OUTGOING: OutgoingWebmentionStatus instances are retrieved in bulk."""
+
+    source_urlpath = "/some-url-path/"
+
+    def test_get_or_create_outgoing_webmentions(self):
+        existing = testfunc.create_outgoing_status(source_url=self.source_urlpath)
+        existing.retry_attempt_count = 3
+        existing.save()
+        new_targets = {testfunc.random_url() for _ in range(10)}
+
+        with self.assertNumQueries(3):
+            statuses = get_or_create_outgoing_webmentions(
+                self.source_urlpath,
+                [existing.target_url, *new_targets],
+                reset_retries=True,
+            )
+
+        self.assertSetEqual({existing.target_url, *new_targets}, set(statuses.keys()))
+        self.assertEqual(existing.pk, statuses[existing.target_url].pk)
+        self.assertEqual(11, OutgoingWebmentionStatus.objects.count())
+        for target_url, status in statuses.items():
+            self.assertEqual(target_url, status.target_url)
+            self.assertIsNotNone(status.pk)
+
+        existing.refresh_from_db()
+        self.assertEqual(0, existing.retry_attempt_count)
+
+        with self.assertNumQueries(1):
+            get_or_create_outgoing_webmentions(self.source_urlpath, new_targets)
+
+    def test_get_or_create_outgoing_webmentions__with_duplicates(self):
+        """The same instance is chosen as get_or_create_outgoing_webmention."""
+        target_url = testfunc.random_url()
+        for _ in range(2):
+            testfunc.create_outgoing_status(
+                source_url=self.source_urlpath, target_url=target_url
+            )
+
+        statuses = get_or_create_outgoing_webmentions(self.source_urlpath, [target_url])
+        self.assertEqual(
+            get_or_create_outgoing_webmention(self.source_urlpath, target_url).pk,
+            statuses[target_url].pk,
+        )
@@ -1,11 +1,25 @@
 from unittest.mock import patch
 
-from mentions.models import PendingIncomingWebmention, PendingOutgoingContent
+import requests
+from django.conf import settings
+
+from mentions.models import (
+    PendingIncomingWebmention,
+    PendingOutgoingContent,
+    Webmention,
+)
 from mentions.tasks.scheduling import (
-    _maybe_reschedule_handle_pending_webmentions, _task_handle_incoming,
-    _task_handle_outgoing, handle_incoming_webmention,
-    handle_outgoing_webmentions, handle_pending_webmentions)
-from tests.tests.util import testfunc
+    _maybe_reschedule_handle_pending_webmentions,
+    _task_handle_coalesced_outgoing,
+    _task_handle_incoming,
+    _task_handle_outgoing,
+    _task_handle_scheduled_pending_webmentions,
+    handle_incoming_webmention,
+    handle_outgoing_webmentions,
+    handle_pending_webmentions,
+)
+from tests.tests.util import snippets, testfunc
+from tests.tests.util.mocking import patch_http_get
 from tests.tests.util.testcase import OptionsTestCase, WebmentionTestCase
 
 
@@ -101,6 +115,91 @@ class OutgoingWebmentionDelegationTests(OptionsTestCase):
             self.assertTrue(reschedule.called)
 
 
+class CoalescedOutgoingWebmentionTests(OptionsTestCase):
+    """OUTGOING: Repeated saves of the same content are combined into a single processing run."""
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        obj = testfunc.create_mentionable_object("Content that might mention a URL")
+        self.absolute_url = obj.get_absolute_url()
+        PendingOutgoingContent.objects.all().delete()
+
+    def test_pending_content_uses_latest_text(self):
+        """With celery disabled, PendingOutgoingContent is updated with the latest text."""
+        self.enable_celery(False)
+
+        handle_outgoing_webmentions(self.absolute_url, "first")
+        handle_outgoing_webmentions(self.absolute_url, "second")
+
+        pending = self.assert_exists(PendingOutgoingContent)
+        self.assertEqual(pending.text, "second")
+
+    def test_coalesce_window_schedules_single_task(self):
+        self.enable_celery(True)
+        settings.WEBMENTIONS_OUTGOING_COALESCE_WINDOW = 30
+
+        with patch(
+            "mentions.tasks.scheduling._task_handle_coalesced_outgoing.apply_async"
+        ) as coalesced_task, patch(
+            "mentions.tasks.scheduling._task_handle_outgoing.delay"
+        ) as handle_task:
+            handle_outgoing_webmentions(self.absolute_url, "first")
+            handle_outgoing_webmentions(self.absolute_url, "second")
+            handle_outgoing_webmentions(self.absolute_url, "third")
+
+            coalesced_task.assert_called_once_with(
+                args=[self.absolute_url], countdown=30
+            )
+            self.assertFalse(handle_task.called)
+
+        pending = self.assert_exists(PendingOutgoingContent)
+        self.assertEqual(pending.text, "third")
+
+    def test_coalesced_task_processes_latest_text(self):
+        self.enable_celery(True)
+        PendingOutgoingContent.objects.create(
+            absolute_url=self.absolute_url, text="latest"
+        )
+
+        with patch(
+            "mentions.tasks.scheduling.process_outgoing_webmentions"
+        ) as process, patch(
+            "mentions.tasks.scheduling._maybe_reschedule_handle_pending_webmentions"
+        ):
+            _task_handle_coalesced_outgoing(self.absolute_url)
+            process.assert_called_once_with(self.absolute_url, "latest")
+
+        self.assert_not_exists(PendingOutgoingContent)
+
+    def test_coalesced_task_keeps_content_updated_during_processing(self):
+        self.enable_celery(True)
+        PendingOutgoingContent.objects.create(
+            absolute_url=self.absolute_url, text="first"
+        )
+
+        def save_again(*args, **kwargs):
+            PendingOutgoingContent.objects.filter(
+                absolute_url=self.absolute_url
+            ).update(text="second")
+
+        with patch(
+            "mentions.tasks.scheduling.process_outgoing_webmentions",
+            side_effect=save_again,
+        ), patch(
+            "mentions.tasks.scheduling._maybe_reschedule_handle_pending_webmentions"
+        ):
+            _task_handle_coalesced_outgoing(self.absolute_url)
+
+        pending = self.assert_exists(PendingOutgoingContent)
+        self.assertEqual(pending.text, "second")
+
+    def test_coalesced_task_with_nothing_pending(self):
+        with patch("mentions.tasks.scheduling.process_outgoing_webmentions") as process:
+            _task_handle_coalesced_outgoing(self.absolute_url)
+            self.assertFalse(process.called)
+
+
 class HandlePendingMentionsTests(WebmentionTestCase):
     """PENDING: Check behaviour of scheduling.handle_pending_webmentions."""
 
@@ -146,6 +245,39 @@ class HandlePendingMentionsTests(WebmentionTestCase):
             self.assertTrue(outgoing_task.called)
             self.assertFalse(incoming_task.called)
 
+    def test_handle_pending_incoming_skips_not_due(self):
+        """PendingIncomingWebmentions are not processed before next_retry_at."""
+        PendingIncomingWebmention.objects.get().mark_processing_failed(save=True)
+
+        with patch(
+            "mentions.tasks.scheduling.process_incoming_webmention"
+        ) as incoming_task, patch(
+            "mentions.tasks.scheduling._reschedule_handle_pending_webmentions"
+        ):
+            handle_pending_webmentions(incoming=True, outgoing=False)
+            self.assertFalse(incoming_task.called)
+
+    def test_handle_pending_incoming_skips_leased(self):
+        """PendingIncomingWebmentions claimed by another worker are not processed."""
+        pending = PendingIncomingWebmention.objects.get()
+        PendingIncomingWebmention.objects.claim_for_retry([pending.pk])
+
+        with patch(
+            "mentions.tasks.scheduling.process_incoming_webmention"
+        ) as incoming_task, patch(
+            "mentions.tasks.scheduling._reschedule_handle_pending_webmentions"
+        ):
+            handle_pending_webmentions(incoming=True, outgoing=False)
+            self.assertFalse(incoming_task.called)
+
+    def test_handle_pending_incoming_releases_leases(self):
+        with patch("mentions.tasks.scheduling.process_incoming_webmention"), patch(
+            "mentions.tasks.scheduling._reschedule_handle_pending_webmentions"
+        ):
+            handle_pending_webmentions(incoming=True, outgoing=False)
+
+        self.assertIsNone(PendingIncomingWebmention.objects.get().lease_expires_at)
+
     def test_celery_rescheduled_if_pending(self):
         with patch(
             "mentions.tasks.scheduling._reschedule_handle_pending_webmentions"
@@ -161,3 +293,83 @@ class HandlePendingMentionsTests(WebmentionTestCase):
 
             _maybe_reschedule_handle_pending_webmentions()
             self.assertFalse(reschedule.called)
+
+
+class RescheduleHandlePendingTests(WebmentionTestCase):
+    """PENDING: At most one handle_pending_webmentions task is scheduled at a time."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        PendingIncomingWebmention.objects.create(
+            source_url=testfunc.random_url(),
+            target_url=testfunc.get_absolute_url_for_object(),
+            sent_by="localhost",
+        )
+
+    def test_only_scheduled_once(self):
+        with patch(
+            "mentions.tasks.scheduling._task_handle_scheduled_pending_webmentions.apply_async"
+        ) as apply_async:
+            _maybe_reschedule_handle_pending_webmentions()
+            _maybe_reschedule_handle_pending_webmentions()
+
+            self.assertEqual(1, apply_async.call_count)
+
+    def test_already_scheduled_does_not_query_database(self):
+        with patch(
+            "mentions.tasks.scheduling._task_handle_scheduled_pending_webmentions.apply_async"
+        ):
+            _maybe_reschedule_handle_pending_webmentions()
+
+            with self.assertNumQueries(0):
+                _maybe_reschedule_handle_pending_webmentions()
+
+    def test_scheduled_task_releases_lease(self):
+        with patch(
+            "mentions.tasks.scheduling._task_handle_scheduled_pending_webmentions.apply_async"
+        ) as apply_async, patch(
+            "mentions.tasks.scheduling.handle_pending_webmentions"
+        ) as handle_pending:
+            _maybe_reschedule_handle_pending_webmentions()
+            _task_handle_scheduled_pending_webmentions()
+            self.assertTrue(handle_pending.called)
+
+            _maybe_reschedule_handle_pending_webmentions()
+            self.assertEqual(2, apply_async.call_count)
+
+    def test_lease_released_if_scheduling_fails(self):
+        with patch(
+            "mentions.tasks.scheduling._task_handle_scheduled_pending_webmentions.apply_async",
+            side_effect=ConnectionError,
+        ):
+            with self.assertRaises(ConnectionError):
+                _maybe_reschedule_handle_pending_webmentions()
+
+        with patch(
+            "mentions.tasks.scheduling._task_handle_scheduled_pending_webmentions.apply_async"
+        ) as apply_async:
+            _maybe_reschedule_handle_pending_webmentions()
+            self.assertTrue(apply_async.called)
+
+
+class HandlePendingIncomingBySourceTests(WebmentionTestCase):
+    """PENDING: Pending incoming webmentions are grouped by source."""
+
+    def test_pending_incoming_grouped_by_source(self):
+        source = testfunc.random_url()
+        targets = [testfunc.get_absolute_url_for_object() for _ in range(3)]
+        for target in targets:
+            PendingIncomingWebmention.objects.create(
+                source_url=source,
+                target_url=target,
+                sent_by="localhost",
+            )
+
+        with patch_http_get(text=snippets.html_with_mentions(*targets)), patch(
+            "mentions.tasks.scheduling._reschedule_handle_pending_webmentions"
+        ):
+            handle_pending_webmentions(incoming=True, outgoing=False)
+            self.assertEqual(1, requests.Session.get.call_count)
+
+        self.assertEqual(3, Webmention.objects.filter(validated=True).count())
+        self.assert_not_exists(PendingIncomingWebmention)
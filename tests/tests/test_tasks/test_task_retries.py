@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.utils import timezone
 from requests import Timeout
 
@@ -155,6 +157,7 @@ class RetryOutgoingTests(RetryNoCeleryTests):
         )
 
         self.set_retry_interval(0)
+        self.set_circuit_breaker_threshold(0)
 
         with patch_http_get(response=throw_timeout):
             for n in range(3):
@@ -168,3 +171,87 @@ class RetryOutgoingTests(RetryNoCeleryTests):
         self.assertFalse(
             OutgoingWebmentionStatus.objects.filter(is_awaiting_retry=True).exists()
         )
+
+
+class RetryBatchTests(RetryNoCeleryTests):
+    def test_due_objects_are_claimed_a_page_at_a_time(self):
+        source_url = testfunc.get_absolute_url_for_object()
+        for _ in range(5):
+            OutgoingWebmentionStatus.objects.create(
+                source_url=source_url,
+                target_url=testfunc.random_url(),
+                is_awaiting_retry=True,
+            )
+
+        claim_for_retry = OutgoingWebmentionStatus.objects.claim_for_retry
+        with patch.object(
+            OutgoingWebmentionStatus.objects,
+            "claim_for_retry",
+            side_effect=claim_for_retry,
+        ) as claim:
+            with patch_http_get(text=snippets.html_with_mentions(source_url)):
+                with patch_http_post(status_code=202):
+                    handle_pending_webmentions(
+                        incoming=False, outgoing=True, batch_size=2
+                    )
+
+        self.assertListEqual([2, 2, 1], [len(c.args[0]) for c in claim.call_args_list])
+        self.assertFalse(
+            OutgoingWebmentionStatus.objects.filter(is_awaiting_retry=True).exists()
+        )
+
+
+class AsyncRetryIncomingTests(RetryIncomingTests):
+    """Pending webmentions from each source are processed concurrently."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.set_async_concurrency(4)
+
+    def test_sources_processed_concurrently(self):
+        other_source = testfunc.random_url()
+        PendingIncomingWebmention.objects.create(
+            source_url=other_source,
+            target_url=self.local_target,
+            sent_by=other_source,
+        )
+
+        with patch(
+            "mentions.tasks.scheduling.process_incoming_webmentions_from_source"
+        ) as process_sync:
+            with patch_http_get(text=snippets.html_with_mentions(self.local_target)):
+                self.test_func()
+
+        self.assertFalse(process_sync.called)
+        self.assertEqual(2, Webmention.objects.count())
+        self.assertFalse(PendingIncomingWebmention.objects.exists())
+
+
+class AsyncRetryOutgoingTests(RetryOutgoingTests):
+    """Retries for each batch are sent concurrently."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.set_async_concurrency(4)
+
+    def test_retries_sent_concurrently(self):
+        PendingOutgoingContent.objects.all().delete()
+        targets = [testfunc.random_url() for _ in range(3)]
+        for target_url in targets:
+            OutgoingWebmentionStatus.objects.create(
+                source_url=self.local_source,
+                target_url=target_url,
+                is_awaiting_retry=True,
+            )
+
+        with patch("mentions.tasks.scheduling.try_send_webmention") as send_sync:
+            with patch_http_get(
+                text=snippets.html_with_mentions(self.local_source)
+            ), patch_http_post(status_code=202) as post:
+                self.test_func()
+
+        self.assertFalse(send_sync.called)
+        self.assertEqual(3, post.call_count)
+        self.assertEqual(
+            3, OutgoingWebmentionStatus.objects.filter(is_retry_successful=True).count()
+        )
@@ -0,0 +1,155 @@
+import asyncio
+import time
+from unittest import skipUnless
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from requests import RequestException
+
+from mentions.models import HostHealth
+from mentions.util.async_requests import ahttp_get, ahttp_head, ahttp_post
+from mentions.util.requests import ResponseDeadlineExceeded, ResponseTooLarge
+from tests.tests.util.testcase import OptionsTestCase
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+URL = "https://example.org/some-path/"
+
+
+@skipUnless(httpx, "httpx is not installed")
+class HttpxBackendTests(OptionsTestCase):
+    """Requests made with httpx, if it is installed."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.set_circuit_breaker_threshold(5)
+        self.requests = []
+
+    def patch_transport(self, handler):
+        def _handler(request):
+            self.requests.append(request)
+            return handler(request)
+
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(_handler),
+            follow_redirects=True,
+        )
+        return patch(
+            "mentions.util.async_requests._get_client",
+            return_value=client,
+        )
+
+    def test_ahttp_get(self):
+        with self.patch_transport(
+            lambda request: httpx.Response(
+                200,
+                headers={"content-type": "text/html; charset=utf-8"},
+                text="<html>hello</html>",
+            )
+        ):
+            response = async_to_sync(ahttp_get)(URL)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(URL, response.url)
+        self.assertEqual("text/html; charset=utf-8", response.headers["Content-Type"])
+        self.assertEqual("<html>hello</html>", response.text)
+        self.assertEqual("GET", self.requests[0].method)
+
+    def test_ahttp_get_html_only(self):
+        with self.patch_transport(
+            lambda request: httpx.Response(
+                200,
+                headers={"content-type": "image/jpeg"},
+                content=b"abc",
+            )
+        ):
+            response = async_to_sync(ahttp_get)(URL, html_only=True)
+
+        self.assertEqual(200, response.status_code)
+        self.assertIsNone(response.text)
+
+    def test_ahttp_get_error_status_is_not_read(self):
+        with self.patch_transport(lambda request: httpx.Response(404, text="nope")):
+            response = async_to_sync(ahttp_get)(URL)
+
+        self.assertEqual(404, response.status_code)
+        self.assertIsNone(response.text)
+
+    def test_ahttp_get_truncates(self):
+        with self.patch_transport(
+            lambda request: httpx.Response(
+                200,
+                headers={"content-type": "text/html"},
+                content=b"a" * 100,
+            )
+        ):
+            response = async_to_sync(ahttp_get)(URL, max_bytes=10)
+
+        self.assertEqual("a" * 10, response.text)
+
+    def test_ahttp_get_too_large(self):
+        with self.patch_transport(
+            lambda request: httpx.Response(
+                200,
+                headers={"content-type": "text/html"},
+                content=b"a" * 100,
+            )
+        ):
+            with self.assertRaises(ResponseTooLarge):
+                async_to_sync(ahttp_get)(URL, max_bytes=10, truncate=False)
+
+        health = HostHealth.objects.get(domain="example.org")
+        self.assertEqual(0, health.consecutive_failures)
+
+    def test_ahttp_get_deadline_exceeded(self):
+        async def slow_stream():
+            for _ in range(100):
+                yield b"a"
+                await asyncio.sleep(0.05)
+
+        with self.patch_transport(
+            lambda request: httpx.Response(
+                200,
+                headers={"content-type": "text/html"},
+                content=slow_stream(),
+            )
+        ):
+            start = time.monotonic()
+            with self.assertRaises(ResponseDeadlineExceeded):
+                async_to_sync(ahttp_get)(URL, deadline=start + 0.2)
+
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_network_error(self):
+        def handler(request):
+            raise httpx.ConnectError("Connection refused", request=request)
+
+        with self.patch_transport(handler):
+            with self.assertRaises(RequestException):
+                async_to_sync(ahttp_get)(URL)
+
+        health = HostHealth.objects.get(domain="example.org")
+        self.assertEqual(1, health.consecutive_failures)
+
+    def test_ahttp_head(self):
+        with self.patch_transport(
+            lambda request: httpx.Response(200, headers={"link": "<a>; rel=b"})
+        ):
+            response = async_to_sync(ahttp_head)(URL)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("<a>; rel=b", response.headers["Link"])
+        self.assertIsNone(response.text)
+        self.assertEqual("HEAD", self.requests[0].method)
+
+    def test_ahttp_post(self):
+        with self.patch_transport(lambda request: httpx.Response(202, text="ok")):
+            response = async_to_sync(ahttp_post)(URL, data={"source": "a"})
+
+        self.assertEqual(202, response.status_code)
+        self.assertEqual("ok", response.text)
+        self.assertEqual("POST", self.requests[0].method)
+        self.assertEqual(b"source=a", self.requests[0].content)
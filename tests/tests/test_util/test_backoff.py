@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from mentions.util.backoff import get_retry_delay
+from tests.tests.util.testcase import OptionsTestCase
+
+
+class RetryDelayTests(OptionsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.set_retry_interval(10)
+        settings.WEBMENTIONS_RETRY_INTERVAL_MAX = 100
+
+    def test_fixed(self):
+        settings.WEBMENTIONS_RETRY_BACKOFF = "fixed"
+
+        self.assertListEqual(
+            [10, 10, 10],
+            [get_retry_delay(attempt) for attempt in range(1, 4)],
+        )
+
+    def test_exponential(self):
+        settings.WEBMENTIONS_RETRY_BACKOFF = "exponential"
+
+        self.assertListEqual(
+            [10, 20, 40, 80, 100, 100],
+            [get_retry_delay(attempt) for attempt in range(1, 7)],
+        )
+        self.assertEqual(100, get_retry_delay(1000))
+
+    def test_decorrelated_jitter(self):
+        settings.WEBMENTIONS_RETRY_BACKOFF = "decorrelated_jitter"
+
+        with patch("random.uniform", return_value=25) as uniform:
+            self.assertEqual(25, get_retry_delay(1))
+            uniform.assert_called_with(10, 30)
+
+            get_retry_delay(2, previous_delay=25)
+            uniform.assert_called_with(10, 75)
+
+        for _ in range(20):
+            self.assertTrue(10 <= get_retry_delay(5, previous_delay=90) <= 100)
+
+    def test_interval_max_less_than_interval(self):
+        settings.WEBMENTIONS_RETRY_BACKOFF = "exponential"
+        settings.WEBMENTIONS_RETRY_INTERVAL_MAX = 5
+
+        self.assertEqual(10, get_retry_delay(3))
+
+    def test_unknown_backoff(self):
+        settings.WEBMENTIONS_RETRY_BACKOFF = "unknown"
+
+        with self.assertRaises(ImproperlyConfigured):
+            get_retry_delay(1)
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+
+from mentions.util.concurrency import amap_grouped, map_grouped
+from tests.tests.util.testcase import SimpleTestCase
+
+
+class _ConcurrencyTracker:
+    """Record the peak number of simultaneous calls, overall and per group."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.active_per_group = defaultdict(int)
+        self.peak = 0
+        self.peak_per_group = defaultdict(int)
+        self.threads = set()
+
+    def __call__(self, item: str) -> str:
+        group = item[0]
+        with self.lock:
+            self.threads.add(threading.get_ident())
+            self.active += 1
+            self.active_per_group[group] += 1
+            self.peak = max(self.peak, self.active)
+            self.peak_per_group[group] = max(
+                self.peak_per_group[group], self.active_per_group[group]
+            )
+
+        time.sleep(0.02)
+
+        with self.lock:
+            self.active -= 1
+            self.active_per_group[group] -= 1
+
+        return item.upper()
+
+
+ITEMS = ["a1", "a2", "a3", "b1", "b2", "c1", "a4", "b3"]
+
+
+class MapGroupedTests(SimpleTestCase):
+    """UTIL: map_grouped runs work in parallel with per-group limits."""
+
+    def test_sequential_runs_on_calling_thread(self):
+        tracker = _ConcurrencyTracker()
+
+        results = map_grouped(
+            tracker, ITEMS, key=lambda x: x[0], max_workers=1, max_workers_per_group=4
+        )
+
+        self.assertListEqual([x.upper() for x in ITEMS], results)
+        self.assertEqual(1, tracker.peak)
+        self.assertSetEqual({threading.get_ident()}, tracker.threads)
+
+    def test_results_keep_input_order(self):
+        results = map_grouped(
+            lambda x: x.upper(),
+            ITEMS,
+            key=lambda x: x[0],
+            max_workers=4,
+            max_workers_per_group=2,
+        )
+
+        self.assertListEqual([x.upper() for x in ITEMS], results)
+
+    def test_respects_limit_per_group(self):
+        tracker = _ConcurrencyTracker()
+
+        map_grouped(
+            tracker, ITEMS, key=lambda x: x[0], max_workers=8, max_workers_per_group=1
+        )
+
+        self.assertLessEqual(tracker.peak, 3)
+        for group, peak in tracker.peak_per_group.items():
+            self.assertEqual(1, peak, msg=f"Group {group}")
+
+    def test_respects_global_limit(self):
+        tracker = _ConcurrencyTracker()
+
+        map_grouped(
+            tracker, ITEMS, key=lambda x: x[0], max_workers=2, max_workers_per_group=4
+        )
+
+        self.assertLessEqual(tracker.peak, 2)
+
+    def test_exceptions_are_raised(self):
+        def func(item):
+            if item == "b2":
+                raise ValueError(item)
+            return item
+
+        with self.assertRaises(ValueError):
+            map_grouped(
+                func, ITEMS, key=lambda x: x[0], max_workers=4, max_workers_per_group=2
+            )
+
+
+class _AsyncConcurrencyTracker(_ConcurrencyTracker):
+    async def __call__(self, item: str) -> str:
+        group = item[0]
+        self.active += 1
+        self.active_per_group[group] += 1
+        self.peak = max(self.peak, self.active)
+        self.peak_per_group[group] = max(
+            self.peak_per_group[group], self.active_per_group[group]
+        )
+
+        await asyncio.sleep(0.02)
+
+        self.active -= 1
+        self.active_per_group[group] -= 1
+        return item.upper()
+
+
+class AsyncMapGroupedTests(SimpleTestCase):
+    """UTIL: amap_grouped runs coroutines concurrently with per-group limits."""
+
+    def amap_grouped(self, func, max_concurrency, max_concurrency_per_group):
+        return async_to_sync(amap_grouped)(
+            func,
+            ITEMS,
+            key=lambda x: x[0],
+            max_concurrency=max_concurrency,
+            max_concurrency_per_group=max_concurrency_per_group,
+        )
+
+    def test_results_keep_input_order(self):
+        tracker = _AsyncConcurrencyTracker()
+
+        results = self.amap_grouped(tracker, 4, 2)
+
+        self.assertListEqual([x.upper() for x in ITEMS], results)
+
+    def test_respects_limit_per_group(self):
+        tracker = _AsyncConcurrencyTracker()
+
+        self.amap_grouped(tracker, 8, 1)
+
+        self.assertEqual(3, tracker.peak)
+        for group, peak in tracker.peak_per_group.items():
+            self.assertEqual(1, peak, msg=f"Group {group}")
+
+    def test_respects_global_limit(self):
+        tracker = _AsyncConcurrencyTracker()
+
+        self.amap_grouped(tracker, 2, 4)
+
+        self.assertEqual(2, tracker.peak)
+
+    def test_exceptions_are_raised_after_others_finish(self):
+        finished = []
+
+        async def func(item):
+            if item == "b2":
+                raise ValueError(item)
+            await asyncio.sleep(0.01)
+            finished.append(item)
+
+        with self.assertRaises(ValueError):
+            self.amap_grouped(func, 4, 2)
+
+        self.assertEqual(len(ITEMS) - 1, len(finished))
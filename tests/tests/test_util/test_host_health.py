@@ -0,0 +1,231 @@
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+import requests
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.utils import timezone
+
+from mentions.host_health import (
+    check_host,
+    forget_host,
+    get_host_health,
+    record_result,
+)
+from mentions.models import HostHealth, OutgoingWebmentionStatus
+from mentions.models.outgoing_status import get_or_create_outgoing_webmention
+from mentions.tasks.outgoing import try_send_webmention
+from mentions.util.async_requests import ahttp_get
+from mentions.util.requests import HostUnavailable, ResponseTooLarge, http_get
+from tests.tests.util import testfunc
+from tests.tests.util.mocking import patch_http_get
+from tests.tests.util.testcase import OptionsTestCase
+
+URL = "https://example.org/some-path/"
+
+
+def _fail(url, now=timezone.now):
+    record_result(url, seconds=5, success=False, now=now)
+
+
+def patch_http_post_error():
+    return patch.object(
+        requests.Session,
+        "post",
+        Mock(side_effect=requests.ConnectionError("Connection refused")),
+    )
+
+
+class HostHealthTests(OptionsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.set_circuit_breaker_threshold(2)
+        settings.WEBMENTIONS_CIRCUIT_BREAKER_COOLDOWN = 60
+
+    def test_record_result(self):
+        record_result(URL, seconds=1, success=True)
+        record_result(URL, seconds=2, success=False)
+
+        health = get_host_health(URL)
+        self.assertAlmostEqual(1.2, health.latency)
+        self.assertAlmostEqual(0.2, health.error_rate)
+        self.assertEqual(1, health.consecutive_failures)
+        self.assertIsNotNone(health.last_success)
+        self.assertIsNotNone(health.last_failure)
+        self.assertIsNone(health.circuit_opened_at)
+
+    def test_results_are_saved_occasionally(self):
+        now = timezone.now()
+        record_result(URL, seconds=1, success=True, now=now)
+        self.assertTrue(HostHealth.objects.filter(domain="example.org").exists())
+
+        with self.assertNumQueries(0):
+            record_result(URL, seconds=2, success=True, now=now)
+            check_host(URL, now=now)
+
+        self.assertEqual(1, HostHealth.objects.get(domain="example.org").latency)
+
+        record_result(URL, seconds=2, success=True, now=now + timedelta(seconds=61))
+        self.assertAlmostEqual(
+            1.36, HostHealth.objects.get(domain="example.org").latency
+        )
+
+    def test_circuit_state_is_saved(self):
+        now = timezone.now()
+        _fail(URL, now=now)
+        _fail(URL, now=now)
+
+        health = HostHealth.objects.get(domain="example.org")
+        self.assertEqual(now, health.circuit_opened_at)
+        self.assertEqual(2, health.consecutive_failures)
+
+        # Cached statistics are reloaded from the database.
+        forget_host("example.org")
+        with self.assertRaises(HostUnavailable):
+            check_host(URL, now=now)
+
+        later = now + timedelta(seconds=61)
+        check_host(URL, now=later)
+        record_result(URL, seconds=1, success=True, now=later)
+
+        self.assertIsNone(
+            HostHealth.objects.get(domain="example.org").circuit_opened_at
+        )
+
+    def test_circuit_closed_in_database(self):
+        _fail(URL)
+        _fail(URL)
+
+        HostHealth.objects.filter(domain="example.org").update(circuit_opened_at=None)
+        forget_host("example.org")
+
+        check_host(URL)
+
+    def test_circuit_opens_after_threshold(self):
+        _fail(URL)
+        check_host(URL)
+
+        _fail(URL)
+        with self.assertRaises(HostUnavailable):
+            check_host(URL)
+
+        # Other hosts are not affected.
+        check_host("https://example.com/")
+
+    def test_success_resets_failures(self):
+        _fail(URL)
+        record_result(URL, seconds=1, success=True)
+        _fail(URL)
+
+        check_host(URL)
+
+    def test_request_is_not_made_while_circuit_is_open(self):
+        _fail(URL)
+        _fail(URL)
+
+        with patch_http_get():
+            with self.assertRaises(HostUnavailable):
+                http_get(URL)
+
+            self.assertFalse(requests.Session.get.called)
+
+    def test_requests_are_recorded(self):
+        with patch_http_get(status_code=500):
+            http_get(URL)
+
+        health = HostHealth.objects.get(domain="example.org")
+        self.assertEqual(0, health.consecutive_failures)
+        self.assertIsNotNone(health.last_success)
+
+        with patch_http_get(
+            response=Mock(side_effect=requests.Timeout("Read timed out"))
+        ):
+            with self.assertRaises(requests.Timeout):
+                http_get(URL)
+
+        self.assertEqual(1, get_host_health(URL).consecutive_failures)
+
+    def test_async_content_errors_are_not_recorded(self):
+        """A healthy host serving a large page is not counted as a failure."""
+        with patch_http_get(text="a" * 100):
+            with self.assertRaises(ResponseTooLarge):
+                async_to_sync(ahttp_get)(URL, max_bytes=10, truncate=False)
+
+        health = get_host_health(URL)
+        self.assertEqual(0, health.consecutive_failures)
+        self.assertIsNotNone(health.last_success)
+
+    def test_half_open_after_cooldown(self):
+        opened_at = timezone.now()
+        _fail(URL, now=opened_at)
+        _fail(URL, now=opened_at)
+
+        with self.assertRaises(HostUnavailable):
+            check_host(URL, now=opened_at + timedelta(seconds=59))
+
+        # A single trial request is allowed after the cooldown.
+        later = opened_at + timedelta(seconds=61)
+        check_host(URL, now=later)
+        with self.assertRaises(HostUnavailable):
+            check_host(URL, now=later)
+
+        record_result(URL, seconds=1, success=True, now=later)
+        check_host(URL, now=later)
+
+    def test_failed_trial_reopens_circuit(self):
+        opened_at = timezone.now()
+        _fail(URL, now=opened_at)
+        _fail(URL, now=opened_at)
+
+        later = opened_at + timedelta(seconds=61)
+        check_host(URL, now=later)
+        _fail(URL, now=later)
+
+        with self.assertRaises(HostUnavailable):
+            check_host(URL, now=later + timedelta(seconds=59))
+
+    def test_disabled(self):
+        self.set_circuit_breaker_threshold(0)
+
+        for _ in range(5):
+            _fail(URL)
+
+        check_host(URL)
+        self.assertFalse(HostHealth.objects.exists())
+
+
+class HostUnavailableTaskTests(OptionsTestCase):
+    """Work for an unavailable host is marked as failed without making requests."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.set_circuit_breaker_threshold(1)
+
+    def test_outgoing_marked_as_failed(self):
+        target_url = testfunc.random_url()
+        _fail(target_url)
+
+        status = get_or_create_outgoing_webmention("/some-path/", target_url)
+
+        with patch_http_get():
+            self.assertIsNone(try_send_webmention("/some-path/", target_url, status))
+            self.assertFalse(requests.Session.head.called)
+            self.assertFalse(requests.Session.get.called)
+
+        status = OutgoingWebmentionStatus.objects.get(pk=status.pk)
+        self.assertTrue(status.is_awaiting_retry)
+        self.assertEqual(1, status.retry_attempt_count)
+
+    def test_outgoing_endpoint_error_marked_as_failed(self):
+        target_url = testfunc.random_url()
+        endpoint = testfunc.random_url()
+        status = get_or_create_outgoing_webmention("/some-path/", target_url)
+
+        with patch_http_get(headers={"Link": f'<{endpoint}>; rel="webmention"'}):
+            with patch_http_post_error():
+                self.assertFalse(try_send_webmention("/some-path/", target_url, status))
+
+        status = OutgoingWebmentionStatus.objects.get(pk=status.pk)
+        self.assertTrue(status.is_awaiting_retry)
+        self.assertEqual(1, status.retry_attempt_count)
+        self.assertEqual(1, get_host_health(endpoint).consecutive_failures)
@@ -0,0 +1,141 @@
+import requests
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+from mentions.exceptions import RateLimited
+from mentions.models import OutgoingWebmentionStatus, PendingIncomingWebmention
+from mentions.models.outgoing_status import get_or_create_outgoing_webmention
+from mentions.tasks.incoming import process_incoming_webmention
+from mentions.tasks.outgoing import atry_send_webmention, try_send_webmention
+from mentions.tasks.outgoing.remote import DEFERRED
+from mentions.util.cache import cache_key, get_cache
+from mentions.util.ratelimit import acquire, get_rate_limit, throttle
+from tests.tests.util import testfunc
+from tests.tests.util.mocking import patch_http_get
+from tests.tests.util.testcase import OptionsTestCase
+
+URL = "https://example.org/some-path/"
+
+
+class RateLimitTests(OptionsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        settings.WEBMENTIONS_RATE_LIMIT = 1
+        settings.WEBMENTIONS_RATE_LIMIT_BURST = 2
+
+    def test_disabled_by_default(self):
+        settings.WEBMENTIONS_RATE_LIMIT = 0
+
+        self.assertListEqual([0] * 10, [acquire(URL, now=100) for _ in range(10)])
+
+    def test_burst_then_limited(self):
+        self.assertEqual(0, acquire(URL, now=100))
+        self.assertEqual(0, acquire(URL, now=100))
+        self.assertAlmostEqual(1, acquire(URL, now=100))
+        self.assertAlmostEqual(0.5, acquire(URL, now=100.5))
+
+    def test_tokens_refill(self):
+        acquire(URL, now=100)
+        acquire(URL, now=100)
+
+        self.assertEqual(0, acquire(URL, now=101))
+        self.assertGreater(acquire(URL, now=101), 0)
+
+    def test_hosts_are_limited_separately(self):
+        acquire(URL, now=100)
+        acquire(URL, now=100)
+
+        self.assertEqual(0, acquire("https://example.com/", now=100))
+
+    def test_busy_bucket_is_not_throttled(self):
+        """If another worker holds the lock, tokens are still available."""
+        lock_key = cache_key("ratelimit", "lock", "example.org")
+        get_cache().add(lock_key, True, timeout=60)
+
+        self.assertEqual(0, acquire(URL, now=100))
+        self.assertEqual(0, acquire(URL, now=100))
+        self.assertAlmostEqual(1, acquire(URL, now=100))
+
+        # The lock still belongs to the other worker.
+        self.assertTrue(get_cache().get(lock_key))
+        get_cache().delete(lock_key)
+
+    def test_rate_limit_domains(self):
+        settings.WEBMENTIONS_RATE_LIMIT_DOMAINS = {
+            "*.example.org": 0.5,
+            "fast.example.org": 0,
+        }
+
+        self.assertEqual(0.5, get_rate_limit("example.org"))
+        self.assertEqual(0.5, get_rate_limit("sub.example.org"))
+        self.assertEqual(0, get_rate_limit("fast.example.org"))
+        self.assertEqual(1, get_rate_limit("example.com"))
+
+    def test_throttle(self):
+        throttle(URL)
+        throttle(URL)
+
+        with self.assertRaises(RateLimited) as context:
+            throttle(URL)
+
+        self.assertGreater(context.exception.retry_after, 0)
+
+
+class RateLimitedTaskTests(OptionsTestCase):
+    """Work for a rate limited host is deferred, not dropped."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        settings.WEBMENTIONS_RATE_LIMIT = 0.01
+        settings.WEBMENTIONS_RATE_LIMIT_BURST = 1
+
+    def test_outgoing_deferred(self):
+        target_url = testfunc.random_url()
+        throttle(target_url)
+
+        status = get_or_create_outgoing_webmention("/some-path/", target_url)
+
+        with patch_http_get():
+            self.assertEqual(
+                DEFERRED, try_send_webmention("/some-path/", target_url, status)
+            )
+            self.assertFalse(requests.Session.head.called)
+            self.assertFalse(requests.Session.get.called)
+
+        status = OutgoingWebmentionStatus.objects.get(pk=status.pk)
+        self.assertTrue(status.is_awaiting_retry)
+        self.assertEqual(0, status.retry_attempt_count)
+        self.assertIsNotNone(status.next_retry_at)
+        self.assertFalse(status.can_retry())
+
+    def test_outgoing_deferred_async(self):
+        target_url = testfunc.random_url()
+        throttle(target_url)
+
+        status = get_or_create_outgoing_webmention("/some-path/", target_url)
+
+        with patch_http_get():
+            self.assertEqual(
+                DEFERRED,
+                async_to_sync(atry_send_webmention)("/some-path/", target_url, status),
+            )
+            self.assertFalse(requests.Session.get.called)
+
+        status = OutgoingWebmentionStatus.objects.get(pk=status.pk)
+        self.assertTrue(status.is_awaiting_retry)
+        self.assertEqual(0, status.retry_attempt_count)
+
+    def test_incoming_deferred(self):
+        source_url = testfunc.random_url()
+        target_url = testfunc.get_absolute_url_for_object()
+        throttle(source_url)
+
+        with patch_http_get():
+            process_incoming_webmention(source_url, target_url, "localhost")
+            self.assertFalse(requests.Session.get.called)
+
+        pending = PendingIncomingWebmention.objects.get(
+            source_url=source_url, target_url=target_url
+        )
+        self.assertEqual(0, pending.retry_attempt_count)
+        self.assertFalse(pending.can_retry())
@@ -0,0 +1,155 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from requests import Session
+
+from mentions.util import http_get
+from mentions.util.async_requests import ahttp_get
+from mentions.util.requests import (
+    ResponseDeadlineExceeded,
+    ResponseTooLarge,
+    close_session,
+    get_session,
+    iter_text,
+    read_text,
+)
+from tests.tests.util.mocking import MockResponse, patch_http_get
+from tests.tests.util.testcase import OptionsTestCase
+
+
+class SessionTests(OptionsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        close_session()
+
+    def tearDown(self) -> None:
+        close_session()
+        super().tearDown()
+
+    def test_session_is_reused(self):
+        self.assertIs(get_session(), get_session())
+
+    def test_session_is_recreated_after_fork(self):
+        session = get_session()
+
+        with patch("os.getpid", return_value=-1):
+            self.assertIsNot(session, get_session())
+
+    def test_session_pool_configuration(self):
+        settings.WEBMENTIONS_HTTP_POOL_CONNECTIONS = 3
+        settings.WEBMENTIONS_HTTP_POOL_MAXSIZE = 2
+
+        adapter = get_session().get_adapter("https://example.org/")
+
+        self.assertEqual(3, adapter._pool_connections)
+        self.assertEqual(2, adapter._pool_maxsize)
+        self.assertTrue(adapter._pool_block)
+
+    def test_separate_timeouts(self):
+        settings.WEBMENTIONS_TIMEOUT = 5
+        settings.WEBMENTIONS_CONNECT_TIMEOUT = 2
+
+        with patch_http_get():
+            http_get("https://example.org/")
+            self.assertEqual((2, 5), Session.get.call_args.kwargs["timeout"])
+
+
+class ReadTextTests(OptionsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.response = MockResponse(
+            "https://example.org/",
+            text="0123456789" * 2000,
+            status_code=200,
+        )
+
+    def test_iter_text_truncates(self):
+        self.assertEqual(
+            "0123456789" * 5,
+            "".join(iter_text(self.response, max_bytes=50)),
+        )
+
+    def test_read_text(self):
+        self.assertEqual(
+            self.response.text,
+            read_text(self.response, max_bytes=len(self.response.text)),
+        )
+
+    def test_read_text_too_large(self):
+        with self.assertRaises(ResponseTooLarge):
+            read_text(self.response, max_bytes=len(self.response.text) - 1)
+
+    def test_read_text_content_length_too_large(self):
+        self.response.headers["content-length"] = "20001"
+
+        with patch.object(self.response, "iter_content") as iter_content:
+            with self.assertRaises(ResponseTooLarge):
+                read_text(self.response, max_bytes=20000)
+
+            self.assertFalse(iter_content.called)
+
+    def test_read_text_deadline_exceeded(self):
+        with patch("time.monotonic", return_value=100):
+            with self.assertRaises(ResponseDeadlineExceeded):
+                read_text(self.response, deadline=99)
+
+
+class _TrickleHandler(BaseHTTPRequestHandler):
+    """Send a response body one byte at a time, well within the read timeout."""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("content-type", "text/html")
+        self.end_headers()
+
+        try:
+            for _ in range(100):
+                self.wfile.write(b"a")
+                self.wfile.flush()
+                time.sleep(0.05)
+        except OSError:
+            # Client went away.
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlowResponseTests(OptionsTestCase):
+    """The deadline applies while waiting for data, not only between chunks."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _TrickleHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def test_read_text_trickling_response(self):
+        start = time.monotonic()
+        response = http_get(self.url, stream=True)
+
+        try:
+            with self.assertRaises(ResponseDeadlineExceeded):
+                read_text(response, deadline=start + 0.5)
+        finally:
+            response.close()
+
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_ahttp_get_trickling_response(self):
+        start = time.monotonic()
+
+        with self.assertRaises(ResponseDeadlineExceeded):
+            async_to_sync(ahttp_get)(self.url, deadline=start + 0.5)
+
+        self.assertLess(time.monotonic() - start, 2)
@@ -1,5 +1,6 @@
 from datetime import date
 from unittest import skipIf
+from unittest.mock import patch
 
 from django.test.utils import override_settings
 from django.urls import include, path
@@ -155,3 +156,56 @@ class MiscWagtailTests(WagtailTestCase):
         url = "2022/11/16/"
         with self.assertRaises(OptionalDependency):
             self.assert_resolves_target(url)
+
+
+@skipIf(not wagtail_has_path_decorator, "@path decorator not available until v4")
+class WagtailRouteCacheTests(WagtailTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        # Bypass the cache in mentions.resolution so that routing is always required.
+        patcher = patch("mentions.resolution.get_cached_resolution", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_routed(self, url: str, expected_route_calls: int):
+        from mentions.helpers.thirdparty.wagtail import resolution as wagtail_resolution
+
+        with patch.object(
+            wagtail_resolution, "_route", wraps=wagtail_resolution._route
+        ) as route:
+            result = resolution.get_model_for_url(self.build_url(url))
+            self.assertEqual(expected_route_calls, route.call_count)
+
+        return result
+
+    def test_page_route_is_cached(self):
+        self.assertEqual(self.target, self.assert_routed("such-content/", 1))
+        self.assertEqual(self.target, self.assert_routed("such-content/", 0))
+
+    def test_routable_page_route_is_cached(self):
+        url = "autopage/2022/11/16/"
+        self.assertEqual(self.target, self.assert_routed(url, 1))
+        self.assertEqual(self.target, self.assert_routed(url, 0))
+
+    def test_routable_page_re_path_route_is_cached(self):
+        url = "named/2022/11/such-content/"
+        self.assertEqual(self.target, self.assert_routed(url, 1))
+        self.assertEqual(self.target, self.assert_routed(url, 0))
+
+    def test_routable_page_routes_are_cached_separately(self):
+        self.assert_routed("autopage/2022/11/16/", 1)
+        self.assert_routed("autopage/named/2022/11/such-content/", 1)
+
+        self.assertEqual(self.target, self.assert_routed("autopage/2022/11/16/", 0))
+        self.assertEqual(
+            self.target,
+            self.assert_routed("autopage/named/2022/11/such-content/", 0),
+        )
+
+    def test_unpublish_invalidates_routes(self):
+        self.assert_routed("such-content/", 1)
+        self.target.unpublish()
+
+        with self.assertRaises(TargetDoesNotExist):
+            self.assert_routed("such-content/", 1)
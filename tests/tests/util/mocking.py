@@ -1,4 +1,5 @@
 import logging
+from contextlib import ContextDecorator
 from typing import Callable, Optional
 from unittest.mock import Mock, patch
 
@@ -8,6 +9,31 @@ from requests.structures import CaseInsensitiveDict
 log = logging.getLogger(__name__)
 
 
+class _Patches(ContextDecorator):
+    """Apply several patchers together.
+
+    Entering returns the value of the first patcher, so this can be used in
+    the same way as that patcher on its own."""
+
+    def __init__(self, *patchers):
+        self.patchers = patchers
+
+    def __enter__(self):
+        values = [patcher.start() for patcher in self.patchers]
+        return values[0]
+
+    def __exit__(self, *exc):
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        return False
+
+
+def _use_requests_backend():
+    """Make `mentions.util.async_requests` use `requests` even if httpx is
+    installed, so that async functions also receive the mocked responses."""
+    return patch("mentions.util.async_requests.httpx", None)
+
+
 class MockResponse:
     """Mock of requests.Response."""
 
@@ -27,8 +53,17 @@ class MockResponse:
         self.text = text
         self.status_code = status_code
         self.headers = CaseInsensitiveDict(headers or {"Content-Type": "text/html"})
+        self.encoding = "utf-8"
         log.debug(self)
 
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False):
+        content = (self.text or "").encode(self.encoding)
+        for n in range(0, len(content), chunk_size):
+            yield content[n : n + chunk_size]
+
+    def close(self):
+        pass
+
     def __str__(self):
         return f"[{self.status_code}] {self.url}"
 
@@ -52,10 +87,19 @@ def patch_http_get(
         )
     )
 
-    return patch.object(
-        requests,
-        "get",
-        Mock(side_effect=side_effect),
+    def head_side_effect(url, **kw):
+        response = side_effect(url, **kw)
+        response.text = None
+        return response
+
+    # HEAD requests receive the same response, without content.
+    return _Patches(
+        patch.multiple(
+            requests.Session,
+            get=Mock(side_effect=side_effect),
+            head=Mock(side_effect=head_side_effect),
+        ),
+        _use_requests_backend(),
     )
 
 
@@ -74,8 +118,11 @@ def patch_http_post(
         )
     )
 
-    return patch.object(
-        requests,
-        "post",
-        Mock(side_effect=side_effect),
+    return _Patches(
+        patch.object(
+            requests.Session,
+            "post",
+            Mock(side_effect=side_effect),
+        ),
+        _use_requests_backend(),
     )
@@ -7,6 +7,7 @@ from django.test import TestCase
 from django.urls import reverse
 
 from mentions import options
+from mentions.util.cache import get_cache
 from mentions.views import view_names
 from tests.tests.util import testfunc
 
@@ -14,7 +15,13 @@ M = TypeVar("M", bound=models.Model)
 
 
 class SimpleTestCase(TestCase):
-    pass
+    def setUp(self) -> None:
+        super().setUp()
+        get_cache().clear()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        get_cache().clear()
 
 
 class ClientTestCase(TestCase):
@@ -108,12 +115,26 @@ class OptionsTestCase(WebmentionTestCase):
     def enable_celery(self, enable: bool):
         setattr(settings, options.SETTING_USE_CELERY, enable)
 
+    def set_async_concurrency(self, n: int):
+        setattr(settings, options.SETTING_ASYNC_CONCURRENCY, n)
+
     def set_max_retries(self, n: int):
         setattr(settings, options.SETTING_MAX_RETRIES, n)
 
+    def set_outgoing_concurrency(self, max_workers: int, max_workers_per_host: int):
+        setattr(settings, options.SETTING_OUTGOING_CONCURRENCY, max_workers)
+        setattr(
+            settings,
+            options.SETTING_OUTGOING_CONCURRENCY_PER_HOST,
+            max_workers_per_host,
+        )
+
     def set_retry_interval(self, seconds: int):
         setattr(settings, options.SETTING_RETRY_INTERVAL, seconds)
 
+    def set_circuit_breaker_threshold(self, failures: int):
+        setattr(settings, options.SETTING_CIRCUIT_BREAKER_THRESHOLD, failures)
+
     def set_dashboard_public(self, public: bool):
         setattr(settings, options.SETTING_DASHBOARD_PUBLIC, public)
 
@@ -1,4 +1,5 @@
 """Utility functions used in multiple test files."""
+
 import random
 import uuid
 from typing import Optional
@@ -9,6 +10,7 @@ from django.urls import reverse
 from mentions import config
 from mentions.models import (
     HCard,
+    HostHealth,
     OutgoingWebmentionStatus,
     PendingIncomingWebmention,
     PendingOutgoingContent,
@@ -193,6 +195,7 @@ def mentions_model_classes():
         PendingOutgoingContent,
         HCard,
         SimpleMention,
+        HostHealth,
     ]
 
 